@@ -46,7 +46,9 @@ GEMINI_SETTINGS = {
     "min_confidence": 0.7,  # Minimum confidence score (0.0-1.0) to approve trades
     "verification": {
         "enabled": True,  # Enable pre-trade verification
-        "required": False  # If True, trades won't be placed without Gemini approval
+        "required": False,  # If True, trades won't be placed without Gemini approval
+        "local_pass_confidence": 0.8,  # Skip Gemini and approve when the local score is above this
+        "local_reject_confidence": 0.2  # Skip Gemini and reject when the local score is below this
     },
     "monitoring": {
         "enabled": True,  # Enable trade monitoring
@@ -59,6 +61,7 @@ GEMINI_SETTINGS = {
 TRADING_SETTINGS = {
     "default_currency_pair": get_default_pair(),
     "risk_percentage": 0.02,  # 2% risk per trade
+    "strategy": "sma_crossover",  # Signal generator used by generate_signal (see strategies/signal.py)
     "timeframe": mt5.TIMEFRAME_M5,  # 1-hour timeframe
     "candles_count": 200,  # Number of candles to fetch
     "rsi_period": 14,  # RSI indicator period
@@ -69,16 +72,25 @@ TRADING_SETTINGS = {
     "sma_period_trend": 200,  # Trend SMA period
     "min_sma_separation": 0.0005,  # Minimum separation between SMAs
     "debug_mode": False,  # Debug mode (enables more detailed logging and relaxes some conditions)
+    "log_signal_checks": False,  # Log every condition of each signal check (needs DEBUG level; slower)
     "force_buy": False,  # Force a buy signal (for testing)
     "force_sell": False,  # Force a sell signal (for testing)
     "multi_pair_interval": 60,  # Seconds between trading cycles in multi-pair mode
+    "tick_poll_interval": 0.05,  # Seconds between tick checks in single-pair mode
+    "balance_poll_interval": 15,  # Seconds between account balance checks while monitoring a trade
+    "max_workers": 8,  # Maximum number of pairs processed concurrently in multi-pair mode
+    "symbol_retry_delay": 60,  # Seconds before retrying a symbol that failed to enable
+    "pair_rate_limit": {
+        "rate": 2.0,  # Trading cycles per second allowed for each pair
+        "burst": 2  # Cycles that may run back to back before the rate applies
+    },
     "profit_taking": {
         "enable_rsi_divergence": True,  # Enable RSI divergence detection for profit taking
         "enable_profit_target": True,  # Enable profit target based on entry to 21 SMA distance
         "profit_factor": 2.0,  # Profit target multiplier (2x the distance to 21 SMA)
     },
     "contingency_plan": {
-        "enabled": True,  # Enable contingency plan for trades
+        "enabled": True,  # Enable contingency plan for trades (always on; not modified at runtime)
         "stop_multiplier": 2.0,  # Lot size multiplier for stop orders (2x initial lot size)
         "limit_multiplier": 3.0,  # Lot size multiplier for limit orders (3x initial lot size)
         "cascade_multiplier": 1.0,  # Additional multiplier for each cascade level
@@ -92,6 +104,8 @@ TRADING_SETTINGS = {
 INDICATOR_SETTINGS = {
     "rsi_period": 14,
     "sma_periods": [21, 50, 200],
+    "float32": False,  # Store OHLC and indicator columns as float32 (half the memory)
+    "rsi_method": "sma",  # "sma" (simple average of gains/losses) or "wilder" (Wilder's smoothing)
 }
 
 # Contingency Trade Settings
@@ -1,24 +1,34 @@
 """
 Trade execution module
 """
-import math
+import atexit
+import functools
+import logging
 import time
 import MetaTrader5 as mt5
 import numpy as np
 import os
+import queue
 import sys
-import traceback
+from concurrent.futures import ThreadPoolExecutor
+from collections import namedtuple
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from types import MappingProxyType
 from mario_trader.utils.mt5_handler import (
     fetch_data, get_balance, get_contract_size, open_trade, initialize_mt5, shutdown_mt5,
-    get_current_price, close_trade
+    get_current_price, close_trade, get_last_bar_time, ensure_symbol
 )
 from mario_trader.strategies.signal import generate_signal
 from mario_trader.strategies.monitor import monitor_trade
-from mario_trader.indicators.technical import calculate_indicators, detect_support_resistance, find_nearest_level
+from mario_trader.indicators.technical import (
+    calculate_indicators, calculate_indicators_batch, find_nearest_level, reuse_indicators, SRState
+)
 from mario_trader.config import MT5_SETTINGS, TRADING_SETTINGS, ORDER_SETTINGS, GEMINI_SETTINGS
 from mario_trader.utils.logger import logger, log_trade, log_signal, log_error
-from mario_trader.utils.currency_pairs import load_currency_pairs, validate_currency_pair, get_default_pair
+from mario_trader.utils.currency_pairs import (
+    clear_currency_pairs_cache, load_currency_pairs, validate_currency_pair, get_default_pair
+)
 from mario_trader.utils.gemini_engine import GeminiEngine
 import threading
 
@@ -28,111 +38,441 @@ gemini_engine = GeminiEngine()
 # Dictionary to store last trade time for each currency pair
 last_trade_time = {}
 
-def execute(forex_pair):
+# Guards the per-pair contingency entries in TRADING_SETTINGS, which are
+# written from the worker threads of execute_multiple_pairs
+_contingency_lock = threading.Lock()
+
+# Retry times for symbols that failed to enable (mt5_handler.ensure_symbol
+# remembers the ones that succeeded)
+_disabled_until = {}
+
+# Per-pair locks serializing contingency order placement
+_pair_locks = {}
+
+# Per-symbol rate limiters for MT5 requests (see _get_rate_limiter)
+_RATE_LIMITERS = {}
+_rate_limiters_lock = threading.Lock()
+
+# Trade records waiting to be written by the trade log writer thread
+_trade_queue = queue.Queue()
+_trade_log_files = {}
+_trade_log_thread = None
+_trade_log_lock = threading.Lock()
+
+# Worker threads for sending several SL/TP modifications at once
+_ORDER_SEND_POOL = ThreadPoolExecutor(max_workers=4)
+
+# Trading cycle counter and open positions per pair: (cycle id, positions)
+_cycle_id = 0
+_positions_cache = {}
+
+# Time (ms) of the last tick processed for each pair
+_last_tick_ms = {}
+
+# Incrementally maintained support/resistance levels per pair
+_sr_states = {}
+
+# Last candles with indicators per pair, updated from one cycle to the next
+_indicator_frames = {}
+
+# Market order request templates; the symbol, volume and price are added per trade
+_BUY_ORDER_TMPL = MappingProxyType({
+    "action": mt5.TRADE_ACTION_DEAL,
+    "type": mt5.ORDER_TYPE_BUY,
+    "deviation": 10,  # Allow price deviation in points
+    "magic": 234000,  # Magic number to identify trades
+    "comment": "Mario Trader",
+    "type_time": mt5.ORDER_TIME_GTC,  # Good Till Cancelled
+    "type_filling": mt5.ORDER_FILLING_IOC,
+})
+_SELL_ORDER_TMPL = MappingProxyType({**_BUY_ORDER_TMPL, "type": mt5.ORDER_TYPE_SELL})
+
+# Pending order request templates, built once per currency pair and reused
+_ORDER_TEMPLATES = {}
+
+# Map pending order names to MT5 order types
+_ORDER_TYPE_MAP = {
+    "BUY_LIMIT": mt5.ORDER_TYPE_BUY_LIMIT,
+    "SELL_LIMIT": mt5.ORDER_TYPE_SELL_LIMIT,
+    "BUY_STOP": mt5.ORDER_TYPE_BUY_STOP,
+    "SELL_STOP": mt5.ORDER_TYPE_SELL_STOP,
+}
+
+
+@dataclass
+class Bars:
+    """
+    Column arrays (struct-of-arrays) for the candles of one scan
+    
+    The arrays are views on the DataFrame produced by calculate_indicators,
+    so building a Bars object does not copy the price history. The source
+    DataFrame is kept in `frame` for callers that still need pandas (Gemini).
+    """
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    sma21: np.ndarray
+    sma50: np.ndarray
+    sma200: np.ndarray
+    rsi: np.ndarray
+    frame: object = None
+
+    def __len__(self):
+        return len(self.close)
+
+
+class _TokenBucket:
+    """
+    Token-bucket rate limiter
+    
+    Holds up to `capacity` tokens, refilled at `rate` tokens per second.
+    acquire() blocks until a token is available.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def _get_rate_limiter(forex_pair):
+    """
+    Get the token bucket limiting trading cycles for a currency pair
+    
+    Args:
+        forex_pair: Currency pair symbol
+        
+    Returns:
+        _TokenBucket instance shared by all threads processing the pair
+    """
+    with _rate_limiters_lock:
+        limiter = _RATE_LIMITERS.get(forex_pair)
+        if limiter is None:
+            rate_limit = TRADING_SETTINGS["pair_rate_limit"]
+            limiter = _TokenBucket(rate_limit["rate"], rate_limit["burst"])
+            _RATE_LIMITERS[forex_pair] = limiter
+        return limiter
+
+
+@dataclass
+class SymbolContext:
+    """
+    Symbol information and the latest tick for one currency pair, fetched
+    once per trading cycle and shared by the helpers that need them
+    """
+    symbol_info: object
+    tick: object
+    digits: int
+    point: float
+    volume_min: float
+    volume_step: float
+    volume_max: float
+    account_info: object = None
+
+
+def _build_symbol_context(forex_pair, account_info=None, tick=None):
+    """
+    Fetch symbol info and the latest tick for a currency pair
+    
+    Args:
+        forex_pair: Currency pair symbol
+        account_info: Account info fetched once for the trading cycle (optional)
+        tick: Latest tick if the caller already has it (optional)
+        
+    Returns:
+        SymbolContext object, or None if MT5 did not return the data
+    """
+    symbol_info = mt5.symbol_info(forex_pair)
+    if symbol_info is None:
+        _check_mt5_connection(mt5.last_error())
+        return None
+    
+    if tick is None:
+        tick = mt5.symbol_info_tick(forex_pair)
+    if tick is None:
+        return None
+    
+    return SymbolContext(
+        symbol_info=symbol_info,
+        tick=tick,
+        digits=symbol_info.digits,
+        point=symbol_info.point,
+        volume_min=symbol_info.volume_min,
+        volume_step=symbol_info.volume_step,
+        volume_max=symbol_info.volume_max,
+        account_info=account_info
+    )
+
+
+# Per-pair pip constants, built on first use by _build_pip_info
+PipInfo = namedtuple("PipInfo", ["one_pip_movement", "pip_multiplier", "is_jpy", "min_sl_distance"])
+_PIP_INFO = {}
+
+# (digits, is_jpy) -> (one_pip_movement, pip_multiplier, min_sl_distance)
+# 1 pip = 10 points on 5-digit (3-digit for JPY) brokers, 1 point on 4-digit
+# (2-digit) brokers. Minimum stop loss is 10 pips, or 100 pips for JPY pairs.
+_PIP_TABLE = {
+    (5, False): (0.0001, 0.1, 0.0010),
+    (4, False): (0.0001, 1.0, 0.0010),
+    (3, True): (0.01, 0.1, 0.01),
+    (2, True): (0.01, 1.0, 0.01),
+}
+
+
+def _build_pip_info(forex_pair, symbol_info):
+    """
+    Work out the pip constants for a currency pair and cache them
+    
+    Args:
+        forex_pair: Currency pair symbol
+        symbol_info: MT5 symbol info for the pair
+        
+    Returns:
+        PipInfo for the pair
+    """
+    is_jpy = forex_pair.endswith('JPY')
+    
+    # Other digit counts (e.g. metals) use 1 pip = 1 point
+    one_pip_movement, pip_multiplier, min_sl_distance = _PIP_TABLE.get(
+        (symbol_info.digits, is_jpy), _PIP_TABLE[(2, True) if is_jpy else (4, False)]
+    )
+    
+    pip_info = PipInfo(one_pip_movement, pip_multiplier, is_jpy, min_sl_distance)
+    _PIP_INFO[forex_pair] = pip_info
+    return pip_info
+
+
+# Set once MT5 has been initialized, so helpers don't re-initialize on every call
+_mt5_initialized = False
+
+
+def _ensure_mt5_initialized():
+    """
+    Initialize MT5 on first use
+    
+    Returns:
+        True if MT5 is initialized, False otherwise
+    """
+    global _mt5_initialized
+    if not _mt5_initialized:
+        _mt5_initialized = bool(mt5.initialize())
+    return _mt5_initialized
+
+
+# MT5 error codes meaning the connection to the terminal was lost
+# (send/receive failure, connection failure, IPC timeout)
+_MT5_DISCONNECT_ERRORS = (-10001, -10002, -10004, -10005)
+
+
+def _check_mt5_connection(error):
+    """
+    Forget the MT5 initialization if an error reports a lost connection, so
+    the next helper call initializes again
+    
+    Args:
+        error: Error tuple from mt5.last_error()
+    """
+    global _mt5_initialized
+    if error and error[0] in _MT5_DISCONNECT_ERRORS:
+        logger.warning(f"Lost connection to MT5 terminal: {error}")
+        _mt5_initialized = False
+        clear_currency_pairs_cache()
+
+
+def _to_bars(dfs):
+    """
+    Materialize the OHLC and indicator columns of a DataFrame as NumPy arrays
+    
+    Args:
+        dfs: DataFrame with price data and indicators
+        
+    Returns:
+        Bars object (returned unchanged if one is passed in)
+        
+    Raises:
+        ValueError: If the indicator columns have not been calculated
+    """
+    if isinstance(dfs, Bars):
+        return dfs
+    
+    missing = [column for column in ('21_SMA', '50_SMA', '200_SMA', 'RSI') if column not in dfs.columns]
+    if missing:
+        raise ValueError(f"Indicator columns missing, run calculate_indicators first: {missing}")
+    
+    return Bars(
+        open=dfs['open'].to_numpy(copy=False),
+        high=dfs['high'].to_numpy(copy=False),
+        low=dfs['low'].to_numpy(copy=False),
+        close=dfs['close'].to_numpy(copy=False),
+        sma21=dfs['21_SMA'].to_numpy(copy=False),
+        sma50=dfs['50_SMA'].to_numpy(copy=False),
+        sma200=dfs['200_SMA'].to_numpy(copy=False),
+        rsi=dfs['RSI'].to_numpy(copy=False),
+        frame=dfs
+    )
+
+
+def _engulf_scan(bars):
+    """
+    Scan the last 4 candles for the entry pattern:
+    - BUY: RSI above 50, 3 candles with lower highs and lower lows, then a bullish engulfing candle
+    - SELL: RSI below 50, 3 candles with higher highs and higher lows, then a bearish engulfing candle
+    
+    Args:
+        bars: Bars object
+        
+    Returns:
+        1 for buy, -1 for sell, 0 for no signal
+    """
+    rsi = bars.rsi[-1]
+    # Candle-to-candle changes of the highs (row 0) and lows (row 1) of the
+    # last 4 candles in one pass
+    steps = np.diff(np.stack((bars.high[-4:], bars.low[-4:])), axis=1)
+    current_open, current_close = bars.open[-1], bars.close[-1]
+    previous_open, previous_close = bars.open[-2], bars.close[-2]
+    
+    # Check for BUY signal
+    if rsi > 50:  # RSI above 50%
+        # Check if last 3 candles were bearish (lower highs and lower lows)
+        bearish_candles = bool((steps < 0).all())
+        
+        # Check for bullish engulfing pattern
+        bullish_engulfing = (current_close > previous_open and
+                             current_open < previous_close and
+                             current_close - current_open > previous_open - previous_close)
+        
+        if bearish_candles and bullish_engulfing:
+            return 1
+            
+    # Check for SELL signal
+    elif rsi < 50:  # RSI below 50%
+        # Check if last 3 candles were bullish (higher highs and higher lows)
+        bullish_candles = bool((steps > 0).all())
+        
+        # Check for bearish engulfing pattern
+        bearish_engulfing = (current_close < previous_open and
+                             current_open > previous_close and
+                             current_open - current_close > previous_close - previous_open)
+        
+        if bullish_candles and bearish_engulfing:
+            return -1
+    
+    return 0
+
+@functools.lru_cache(maxsize=64)
+def _load_indicator_data(forex_pair, count, bar_time):
+    """
+    Fetch candles and calculate indicators, cached per (pair, count, bar time)
+    
+    The cache is cleared at the start of every trading cycle, since the close
+    of the current bar keeps moving while the bar is open.
+    """
+    dfs = fetch_data(forex_pair, count=count)
+    if dfs is None:
+        return None
+    return calculate_indicators(dfs)
+
+
+def fetch_indicator_data(forex_pair, count=None):
+    """
+    Get candles with indicators for a currency pair, shared by all callers
+    within a trading cycle
+    
+    The returned DataFrame is shared between callers and must not be modified.
+    
+    Args:
+        forex_pair: Currency pair symbol
+        count: Number of candles (defaults to TRADING_SETTINGS["candles_count"])
+        
+    Returns:
+        DataFrame with price data and indicators, or None on failure
+    """
+    bar_time = get_last_bar_time(forex_pair)
+    if bar_time is None:
+        return None
+    return _load_indicator_data(forex_pair, count or TRADING_SETTINGS["candles_count"], bar_time)
+
+
+def _start_cycle():
+    """
+    Start a new trading cycle, invalidating the per-cycle caches
+    (candles with indicators and open positions)
+    """
+    global _cycle_id
+    _cycle_id += 1
+    _load_indicator_data.cache_clear()
+
+
+def execute(forex_pair, ctx=None, dfs=None):
     """
     Execute trading strategy for a currency pair
     
     Args:
         forex_pair: Currency pair symbol
+        ctx: SymbolContext for this cycle (optional, fetched from MT5 if not provided)
+        dfs: DataFrame with indicators for this cycle (optional, fetched if not provided)
         
     Returns:
         True if a trade was executed, False otherwise
     """
     try:
-        # Always enable contingency plan
-        TRADING_SETTINGS["contingency_plan"]["enabled"] = True
-        
         # Check trade cooldown (minimum 1 hour between trades for the same pair)
         current_time = datetime.now()
         if forex_pair in last_trade_time:
             time_since_last_trade = current_time - last_trade_time[forex_pair]
             if time_since_last_trade < timedelta(hours=1):
-                logger.info(f"Trade cooldown active for {forex_pair}. Time remaining: {timedelta(hours=1) - time_since_last_trade}")
+                logger.info("Trade cooldown active for %s. Time remaining: %s", forex_pair, timedelta(hours=1) - time_since_last_trade)
                 return False
         
         # Get current market data
-        dfs = fetch_data(forex_pair, count=TRADING_SETTINGS["candles_count"])
+        if dfs is None:
+            dfs = fetch_indicator_data(forex_pair)
         if dfs is None:
             logger.error(f"Failed to fetch data for {forex_pair}")
             return False
             
-        # Calculate indicators
-        dfs = calculate_indicators(dfs)
-        latest = dfs.iloc[-1]
+        bars = _to_bars(dfs)
         
-        # Get current market price and indicators
-        current_market_price = latest['close']
-        sma_21 = latest['21_SMA']
-        sma_50 = latest['50_SMA']
-        sma_200 = latest['200_SMA']
-        rsi = latest['RSI']
+        # Get current market price and indicators (as float64 for price arithmetic)
+        current_market_price = float(bars.close[-1])
+        sma_21 = float(bars.sma21[-1])
+        sma_50 = float(bars.sma50[-1])
+        sma_200 = float(bars.sma200[-1])
+        rsi = float(bars.rsi[-1])
         
         # Check if price is above 200 SMA for both buy and sell signals
         if current_market_price <= sma_200:
-            logger.info(f"Price is below 200 SMA for {forex_pair}, no trade")
+            logger.info("Price is below 200 SMA for %s, no trade", forex_pair)
             return False
             
         # Check if 21 and 50 SMA are not too close (at least 10 pips apart)
         sma_distance = abs(sma_21 - sma_50)
         min_sma_distance = 0.0010 if not forex_pair.endswith('JPY') else 0.01
         if sma_distance < min_sma_distance:
-            logger.info(f"21 and 50 SMA are too close for {forex_pair}, no trade")
+            logger.info("21 and 50 SMA are too close for %s, no trade", forex_pair)
             return False
             
         # Check for three consecutive candles in opposite direction
         # and engulfing candle in trade direction
-        signal = 0
-        
-        # Check for BUY signal
-        if rsi > 50:  # RSI above 50%
-            # Check last 4 candles
-            last_4_candles = dfs.iloc[-4:]
-            
-            # Check if last 3 candles were bearish (lower highs and lower lows)
-            bearish_candles = True
-            for i in range(1, 4):
-                if last_4_candles.iloc[-i]['high'] >= last_4_candles.iloc[-(i+1)]['high'] or \
-                   last_4_candles.iloc[-i]['low'] >= last_4_candles.iloc[-(i+1)]['low']:
-                    bearish_candles = False
-                    break
-            
-            # Check for bullish engulfing pattern
-            current_candle = last_4_candles.iloc[-1]
-            previous_candle = last_4_candles.iloc[-2]
-            bullish_engulfing = (current_candle['close'] > previous_candle['open'] and
-                               current_candle['open'] < previous_candle['close'] and
-                               current_candle['close'] - current_candle['open'] > 
-                               previous_candle['open'] - previous_candle['close'])
-            
-            if bearish_candles and bullish_engulfing:
-                signal = 1
-                
-        # Check for SELL signal
-        elif rsi < 50:  # RSI below 50%
-            # Check last 4 candles
-            last_4_candles = dfs.iloc[-4:]
-            
-            # Check if last 3 candles were bullish (higher highs and higher lows)
-            bullish_candles = True
-            for i in range(1, 4):
-                if last_4_candles.iloc[-i]['high'] <= last_4_candles.iloc[-(i+1)]['high'] or \
-                   last_4_candles.iloc[-i]['low'] <= last_4_candles.iloc[-(i+1)]['low']:
-                    bullish_candles = False
-                    break
-            
-            # Check for bearish engulfing pattern
-            current_candle = last_4_candles.iloc[-1]
-            previous_candle = last_4_candles.iloc[-2]
-            bearish_engulfing = (current_candle['close'] < previous_candle['open'] and
-                               current_candle['open'] > previous_candle['close'] and
-                               current_candle['open'] - current_candle['close'] > 
-                               previous_candle['close'] - previous_candle['open'])
-            
-            if bullish_candles and bearish_engulfing:
-                signal = -1
+        signal = _engulf_scan(bars)
         
         if signal == 0:
-            logger.info(f"No trading signal for {forex_pair}")
+            logger.info("No trading signal for %s", forex_pair)
             return False
             
         # Update last trade time
@@ -146,26 +486,39 @@ def execute(forex_pair):
             "RSI": rsi,
         }
         
-        # Use Gemini AI to verify the trade setup
+        # Score the setup locally first and only ask Gemini when the score is ambiguous
         signal_type = "BUY" if signal == 1 else "SELL"
-        gemini_verified, gemini_reason, gemini_confidence = gemini_engine.verify_trade_setup(
-            forex_pair, 
-            signal_type, 
-            dfs, 
-            indicator_data
-        )
+        verification_settings = GEMINI_SETTINGS["verification"]
+        local_confidence = _local_confidence(bars, signal)
+        
+        if not verification_settings["required"] and local_confidence > verification_settings.get("local_pass_confidence", 0.8):
+            gemini_verified, gemini_reason, gemini_confidence = True, "local-pass", local_confidence
+        elif not verification_settings["required"] and local_confidence < verification_settings.get("local_reject_confidence", 0.2):
+            gemini_verified, gemini_reason, gemini_confidence = False, "local-reject", local_confidence
+        else:
+            # Use Gemini AI to verify the trade setup
+            gemini_verified, gemini_reason, gemini_confidence = gemini_engine.verify_trade_setup(
+                forex_pair, 
+                signal_type, 
+                dfs, 
+                indicator_data
+            )
         
         # Check if Gemini verification is required and failed
         if GEMINI_SETTINGS["verification"]["required"] and not gemini_verified:
-            logger.warning(f"Gemini rejected {signal_type} signal for {forex_pair}: {gemini_reason}")
+            logger.warning("Gemini rejected %s signal for %s: %s", signal_type, forex_pair, gemini_reason)
             return False
         
         # Continue with trade execution even if Gemini rejected (but log the warning)
         if not gemini_verified:
-            logger.warning(f"Proceeding with {signal_type} trade for {forex_pair} despite Gemini rejection (not required): {gemini_reason}")
+            logger.warning("Proceeding with %s trade for %s despite Gemini rejection (not required): %s", signal_type, forex_pair, gemini_reason)
             
+        # Distance from entry to the 21 SMA drives lot size, take profit and the contingency orders
+        entry_to_sma = abs(current_market_price - sma_21)
+        levels = _trade_levels(current_market_price, sma_21, signal)
+        
         # Calculate lot size based on risk management
-        lot_size = calculate_lot_size(forex_pair, abs(current_market_price - sma_21))
+        lot_size = calculate_lot_size(forex_pair, entry_to_sma, ctx=ctx)
         if lot_size <= 0:
             logger.error(f"Invalid lot size calculated for {forex_pair}")
             return False
@@ -173,23 +526,22 @@ def execute(forex_pair):
         # Execute trade
         if signal == 1:  # BUY
             # Execute market BUY order at current price
-            trade_result = open_buy_trade_without_sl(forex_pair, lot_size)
+            trade_result = open_buy_trade_without_sl(forex_pair, lot_size, ctx=ctx)
             
             if trade_result:
-                # Calculate take profit at 2× the distance from entry to 21 SMA
-                take_profit_distance = abs(current_market_price - sma_21) * 2
-                take_profit_price = current_market_price + take_profit_distance
+                # Take profit at 2× the distance from entry to 21 SMA
+                take_profit_price = levels["take_profit"]
                 
                 # Set take profit for the main position
                 modify_position_sl_tp(forex_pair, trade_result.order, take_profit=take_profit_price)
                 
                 # Set sell stop at 21 SMA with calculated lot size
                 contingency_lot_size = lot_size * 2
-                logger.info(f"Setting SELL STOP at 21 SMA ({sma_21:.5f}) with {contingency_lot_size:.2f} lots for {forex_pair}")
+                logger.info("Setting SELL STOP at 21 SMA (%.5f) with %.2f lots for %s", sma_21, contingency_lot_size, forex_pair)
                 
-                # Calculate stop loss and take profit for the SELL STOP order
-                stop_loss_price_for_sell_stop = sma_21 + (abs(current_market_price - sma_21) * 3)
-                take_profit_price_for_sell_stop = sma_21 - (abs(current_market_price - sma_21) * 2)
+                # Stop loss and take profit for the SELL STOP order
+                stop_loss_price_for_sell_stop = levels["pending_stop_loss"]
+                take_profit_price_for_sell_stop = levels["pending_take_profit"]
                 
                 set_pending_order(
                     forex_pair, 
@@ -198,43 +550,44 @@ def execute(forex_pair):
                     contingency_lot_size,
                     comment="Contingency SELL STOP",
                     stop_loss=stop_loss_price_for_sell_stop,
-                    take_profit=take_profit_price_for_sell_stop
+                    take_profit=take_profit_price_for_sell_stop,
+                    wait=False
                 )
                 
                 # Store info for contingency plan
-                TRADING_SETTINGS[f"{forex_pair}_contingency"] = {
-                    "type": "BUY",
-                    "initial_entry": current_market_price,
-                    "initial_lot_size": lot_size,
-                    "sma_21": sma_21,
-                    "take_profit": take_profit_price,
-                    "entry_to_sma_distance": abs(current_market_price - sma_21),
-                    "gemini_approval": gemini_verified,
-                    "gemini_confidence": gemini_confidence
-                }
+                with _contingency_lock:
+                    TRADING_SETTINGS[f"{forex_pair}_contingency"] = {
+                        "type": "BUY",
+                        "initial_entry": current_market_price,
+                        "initial_lot_size": lot_size,
+                        "sma_21": sma_21,
+                        "take_profit": take_profit_price,
+                        "entry_to_sma_distance": entry_to_sma,
+                        "gemini_approval": gemini_verified,
+                        "gemini_confidence": gemini_confidence
+                    }
                 
                 log_trade(forex_pair, "BUY", current_market_price, lot_size, None)
                 return True
                 
         elif signal == -1:  # SELL
             # Execute market SELL order at current price
-            trade_result = open_sell_trade_without_sl(forex_pair, lot_size)
+            trade_result = open_sell_trade_without_sl(forex_pair, lot_size, ctx=ctx)
             
             if trade_result:
-                # Calculate take profit at 2× the distance from entry to 21 SMA
-                take_profit_distance = abs(current_market_price - sma_21) * 2
-                take_profit_price = current_market_price - take_profit_distance
+                # Take profit at 2× the distance from entry to 21 SMA
+                take_profit_price = levels["take_profit"]
                 
                 # Set take profit for the main position
                 modify_position_sl_tp(forex_pair, trade_result.order, take_profit=take_profit_price)
                 
                 # Set buy stop at 21 SMA with calculated lot size
                 contingency_lot_size = lot_size * 2
-                logger.info(f"Setting BUY STOP at 21 SMA ({sma_21:.5f}) with {contingency_lot_size:.2f} lots for {forex_pair}")
+                logger.info("Setting BUY STOP at 21 SMA (%.5f) with %.2f lots for %s", sma_21, contingency_lot_size, forex_pair)
                 
-                # Calculate stop loss and take profit for the BUY STOP order
-                stop_loss_price_for_buy_stop = sma_21 - (abs(current_market_price - sma_21) * 3)
-                take_profit_price_for_buy_stop = sma_21 + (abs(current_market_price - sma_21) * 2)
+                # Stop loss and take profit for the BUY STOP order
+                stop_loss_price_for_buy_stop = levels["pending_stop_loss"]
+                take_profit_price_for_buy_stop = levels["pending_take_profit"]
                 
                 set_pending_order(
                     forex_pair, 
@@ -243,35 +596,90 @@ def execute(forex_pair):
                     contingency_lot_size,
                     comment="Contingency BUY STOP",
                     stop_loss=stop_loss_price_for_buy_stop,
-                    take_profit=take_profit_price_for_buy_stop
+                    take_profit=take_profit_price_for_buy_stop,
+                    wait=False
                 )
                 
                 # Store info for contingency plan
-                TRADING_SETTINGS[f"{forex_pair}_contingency"] = {
-                    "type": "SELL",
-                    "initial_entry": current_market_price,
-                    "initial_lot_size": lot_size,
-                    "sma_21": sma_21,
-                    "take_profit": take_profit_price,
-                    "entry_to_sma_distance": abs(current_market_price - sma_21),
-                    "gemini_approval": gemini_verified,
-                    "gemini_confidence": gemini_confidence
-                }
+                with _contingency_lock:
+                    TRADING_SETTINGS[f"{forex_pair}_contingency"] = {
+                        "type": "SELL",
+                        "initial_entry": current_market_price,
+                        "initial_lot_size": lot_size,
+                        "sma_21": sma_21,
+                        "take_profit": take_profit_price,
+                        "entry_to_sma_distance": entry_to_sma,
+                        "gemini_approval": gemini_verified,
+                        "gemini_confidence": gemini_confidence
+                    }
                 
                 log_trade(forex_pair, "SELL", current_market_price, lot_size, None)
                 return True
         
         # If we get here, the trade execution failed
         trade_type = "BUY" if signal == 1 else "SELL"
-        logger.warning(f"Failed to execute {trade_type} trade for {forex_pair}")
+        logger.warning("Failed to execute %s trade for %s", trade_type, forex_pair)
         return False
         
     except Exception as e:
-        logger.error(f"Error executing trading strategy for {forex_pair}: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception("Error executing trading strategy for %s: %s", forex_pair, e)
         return False
 
-def check_exit_conditions(forex_pair, dfs, open_positions, support_resistance_levels=None):
+def _trade_levels(entry_price, sma_21, signal):
+    """
+    Calculate the price levels for a new trade and its contingency stop order
+    
+    Args:
+        entry_price: Entry price of the main trade
+        sma_21: Current 21 SMA value (where the contingency stop order is placed)
+        signal: 1 for buy, -1 for sell
+        
+    Returns:
+        Dictionary with take_profit for the main trade and pending_stop_loss /
+        pending_take_profit for the contingency stop order
+    """
+    entry_to_sma = abs(entry_price - sma_21)
+    take_profit_distance = entry_to_sma * 2
+    
+    # The contingency stop order trades against the signal direction
+    return {
+        "take_profit": entry_price + signal * take_profit_distance,
+        "pending_stop_loss": sma_21 + signal * (entry_to_sma * 3),
+        "pending_take_profit": sma_21 - signal * take_profit_distance,
+    }
+
+def _local_confidence(bars, signal):
+    """
+    Cheap local score of how strongly the indicators agree with a signal
+    
+    Combines the RSI distance from 50 in the signal direction (full score at
+    20 points) with the direction of the 21 and 50 SMA slopes over the last
+    5 candles.
+    
+    Args:
+        bars: Bars object
+        signal: 1 for buy, -1 for sell
+        
+    Returns:
+        Confidence score between 0.0 and 1.0; 0.5 (neutral) with fewer than
+        6 bars, NaN if the latest RSI is NaN (SMAs that are still NaN just
+        count as not agreeing)
+    """
+    if len(bars) < 6:
+        return 0.5
+    
+    # RSI momentum in the signal direction
+    rsi_score = np.clip(signal * (bars.rsi[-1] - 50) / 20, 0.0, 1.0)
+    
+    # SMA slopes agreeing with the signal direction
+    slope_21 = signal * (bars.sma21[-1] - bars.sma21[-6])
+    slope_50 = signal * (bars.sma50[-1] - bars.sma50[-6])
+    slope_score = (int(slope_21 > 0) + int(slope_50 > 0)) / 2
+    
+    return float((rsi_score + slope_score) / 2)
+
+
+def check_exit_conditions(forex_pair, bars, open_positions, support_resistance_levels=None):
     """
     Check if we should exit existing positions based on:
     1. RSI divergence when in profit
@@ -281,7 +689,7 @@ def check_exit_conditions(forex_pair, dfs, open_positions, support_resistance_le
     
     Args:
         forex_pair: Currency pair symbol
-        dfs: DataFrame with price data and indicators
+        bars: Bars object (or DataFrame with price data and indicators)
         open_positions: List of open positions
         support_resistance_levels: Support and resistance levels
         
@@ -291,11 +699,10 @@ def check_exit_conditions(forex_pair, dfs, open_positions, support_resistance_le
     if not open_positions:
         return False, ""
     
-    # Get current price and indicators
-    latest = dfs.iloc[-1]
-    current_price = latest['close']
-    rsi = latest['RSI']
-    sma_21 = latest['21_SMA']
+    bars = _to_bars(bars)
+    
+    # Get current price
+    current_price = bars.close[-1]
     
     # Extract position details from the first open position
     position = open_positions[0]
@@ -315,19 +722,11 @@ def check_exit_conditions(forex_pair, dfs, open_positions, support_resistance_le
         return False, "Position not in profit"
     
     # Calculate trade duration in minutes (roughly based on 5-min candles)
-    candle_count = len(dfs)
+    candle_count = len(bars)
     trade_duration_minutes = min(candle_count * 5, 1440)  # Cap at 24 hours for estimation
-    
-    # Prepare indicator data for Gemini
-    indicator_data = {
-        "200_SMA": latest.get('200_SMA', 0),
-        "50_SMA": latest.get('50_SMA', 0),
-        "21_SMA": sma_21,
-        "RSI": rsi,
-    }
             
     # Check for RSI divergence
-    rsi_divergence = check_rsi_divergence(dfs, position_type)
+    rsi_divergence = check_rsi_divergence(bars, position_type)
     if rsi_divergence:
         return True, f"RSI divergence detected while in profit ({profit_pips:.1f} pips)"
         
@@ -349,13 +748,21 @@ def check_exit_conditions(forex_pair, dfs, open_positions, support_resistance_le
     if GEMINI_SETTINGS["monitoring"]["enabled"]:
         # Only check every X minutes to avoid API overuse
         if candle_count % GEMINI_SETTINGS["monitoring"]["interval"] == 0 or profit_pips > 20:
+            # Latest indicator values for the prompt, only read when Gemini is
+            # actually asked (_to_bars guarantees the indicator columns exist)
+            indicator_data = {
+                "200_SMA": bars.sma200[-1],
+                "50_SMA": bars.sma50[-1],
+                "21_SMA": bars.sma21[-1],
+                "RSI": bars.rsi[-1],
+            }
             gemini_exit, gemini_reason, gemini_confidence = gemini_engine.monitor_trade(
                 forex_pair,
                 position_type,
                 entry_price,
                 current_price,
                 trade_duration_minutes,
-                dfs,
+                bars.frame,
                 indicator_data
             )
             
@@ -364,51 +771,53 @@ def check_exit_conditions(forex_pair, dfs, open_positions, support_resistance_le
                 if GEMINI_SETTINGS["monitoring"]["required"] or gemini_confidence >= GEMINI_SETTINGS["min_confidence"]:
                     return True, f"Gemini recommends exit: {gemini_reason} (Confidence: {gemini_confidence:.2f})"
                 else:
-                    logger.info(f"Gemini suggests exit but confidence too low: {gemini_reason} (Confidence: {gemini_confidence:.2f})")
+                    logger.info("Gemini suggests exit but confidence too low: %s (Confidence: %.2f)", gemini_reason, gemini_confidence)
     
     # No exit conditions met
     return False, ""
 
-def check_rsi_divergence(dfs, position_type):
+def check_rsi_divergence(bars, position_type):
     """
     Check for RSI divergence:
     - For BUY: Price making higher highs but RSI making lower highs
     - For SELL: Price making lower lows but RSI making higher lows
     
     Args:
-        dfs: DataFrame with price data and indicators
+        bars: Bars object (or DataFrame with price data and indicators)
         position_type: "BUY" or "SELL"
         
     Returns:
         True if divergence is detected, False otherwise
     """
+    bars = _to_bars(bars)
+    
     # Need at least 5 candles to detect divergence
-    if len(dfs) < 5:
+    if len(bars) < 5:
         return False 
 
-    # Check last 5 candles for divergence
-    last_candles = dfs.iloc[-5:].copy()
+    # Check last 5 candles for divergence (only the 1st and 3rd most recent are compared)
+    rsi = bars.rsi
     
     if position_type == "BUY":
         # Look for bearish divergence (price higher high, RSI lower high)
         # First, check if price is making higher highs
-        price_higher_high = last_candles['high'].iloc[-1] > last_candles['high'].iloc[-3]
+        price_higher_high = bars.high[-1] > bars.high[-3]
         
         # Now check if RSI is making lower highs
-        rsi_lower_high = last_candles['RSI'].iloc[-1] < last_candles['RSI'].iloc[-3]
+        rsi_lower_high = rsi[-1] < rsi[-3]
         
         # Return True if both conditions are met (bearish divergence)
-        return price_higher_high and rsi_lower_high
+        return bool(price_higher_high and rsi_lower_high)
     else:  # SELL
         # Look for bullish divergence (price lower low, RSI higher low)
         # First, check if price is making lower lows
-        price_lower_low = last_candles['low'].iloc[-1] < last_candles['low'].iloc[-3]
+        price_lower_low = bars.low[-1] < bars.low[-3]
         
         # Now check if RSI is making higher lows
-        rsi_higher_low = last_candles['RSI'].iloc[-1] > last_candles['RSI'].iloc[-3]
+        rsi_higher_low = rsi[-1] > rsi[-3]
         
         # Return True if both conditions are met (bullish divergence)
-        return price_lower_low and rsi_higher_low
+        return bool(price_lower_low and rsi_higher_low)
 
 def apply_contingency_plan(forex_pair, closed_positions, latest_indicators):
     """
@@ -452,16 +861,18 @@ def apply_contingency_plan(forex_pair, closed_positions, latest_indicators):
                 "SELL_STOP", 
                 sma_21, 
                 contingency_lot_size,
-                comment="Contingency SELL STOP"
+                comment="Contingency SELL STOP",
+                wait=False
             )
             
             # Store info for step 2 in settings
-            TRADING_SETTINGS[f"{forex_pair}_contingency"] = {
-                "type": "BUY",
-                "initial_entry": initial_entry_price,
-                "initial_lot_size": initial_lot_size,
-                "step": 1
-            }
+            with _contingency_lock:
+                TRADING_SETTINGS[f"{forex_pair}_contingency"] = {
+                    "type": "BUY",
+                    "initial_entry": initial_entry_price,
+                    "initial_lot_size": initial_lot_size,
+                    "step": 1
+                }
             
         else:  # SELL position
             # Step 1: Set buy stop at 21 SMA with 2x initial lot size
@@ -474,22 +885,72 @@ def apply_contingency_plan(forex_pair, closed_positions, latest_indicators):
                 "BUY_STOP", 
                 sma_21, 
                 contingency_lot_size,
-                comment="Contingency BUY STOP"
+                comment="Contingency BUY STOP",
+                wait=False
             )
             
             # Store info for step 2 in settings
-            TRADING_SETTINGS[f"{forex_pair}_contingency"] = {
-                "type": "SELL",
-                "initial_entry": initial_entry_price,
-                "initial_lot_size": initial_lot_size,
-                "step": 1
-            }
+            with _contingency_lock:
+                TRADING_SETTINGS[f"{forex_pair}_contingency"] = {
+                    "type": "SELL",
+                    "initial_entry": initial_entry_price,
+                    "initial_lot_size": initial_lot_size,
+                    "step": 1
+                }
             
     except Exception as e:
-        logger.error(f"Error applying contingency plan for {forex_pair}: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception("Error applying contingency plan for %s: %s", forex_pair, e)
+
+def _async_send(request, callback=None):
+    """
+    Send an order request without waiting for the broker
+    
+    Args:
+        request: Order request dict
+        callback: Called with the OrderSendResult (or None) once the order
+            has been sent, on the sending thread (optional)
+        
+    Returns:
+        Future resolving to the callback's return value, or to the
+        OrderSendResult if no callback was given
+    """
+    def send():
+        # Nobody may look at the Future, so log errors here
+        try:
+            result = mt5.order_send(request)
+            return callback(result) if callback else result
+        except Exception as e:
+            logger.exception("Error sending order for %s: %s", request.get("symbol"), e)
+            return None
+    
+    return _ORDER_SEND_POOL.submit(send)
+
+
+def _check_pending_order_result(forex_pair, order_type, result):
+    """
+    Log the outcome of a pending order request
+    
+    Args:
+        forex_pair: Currency pair symbol
+        order_type: Order type (BUY_LIMIT, SELL_LIMIT, BUY_STOP, SELL_STOP)
+        result: OrderSendResult from mt5.order_send, or None
+        
+    Returns:
+        The result if the order was placed, None otherwise
+    """
+    if result is None:
+        logger.error(f"Failed to send {order_type} order for {forex_pair}: {mt5.last_error()}")
+        return None
+    if result.retcode != mt5.TRADE_RETCODE_DONE:
+        logger.error(f"Failed to place {order_type} order for {forex_pair}: {result.comment} (code: {result.retcode})")
+        return None
+        
+    logger.info(f"Successfully placed {order_type} order for {forex_pair}, ticket: {result.order}")
+    return result
 
-def set_pending_order(forex_pair, order_type, price, lot_size, comment=None, stop_loss=None, take_profit=None):
+
+def set_pending_order(forex_pair, order_type, price, lot_size, comment=None, stop_loss=None, take_profit=None,
+                      wait=True):
     """
     Set a pending order
     
@@ -501,9 +962,12 @@ def set_pending_order(forex_pair, order_type, price, lot_size, comment=None, sto
         comment: Comment for the order
         stop_loss: Stop loss price
         take_profit: Take profit price
+        wait: If False, send the order in the background and return a Future
+            resolving to the result instead of blocking on the broker
         
     Returns:
-        OrderSendResult object if successful, None otherwise
+        OrderSendResult object if successful, None otherwise (a Future when
+        wait is False)
     """
     try:
         # Add price and stop validation based on instrument type
@@ -513,8 +977,9 @@ def set_pending_order(forex_pair, order_type, price, lot_size, comment=None, sto
             return None
             
         # Adjust stop loss and take profit if provided
+        symbol_info = mt5.symbol_info(forex_pair) if stop_loss is not None or take_profit is not None else None
         if stop_loss is not None:
-            valid_sl, adjusted_sl = validate_and_adjust_price(forex_pair, stop_loss, "STOP_LOSS", price, order_type)
+            valid_sl, adjusted_sl = _adjust_stop_price(forex_pair, stop_loss, "STOP_LOSS", price, order_type, symbol_info)
             if not valid_sl:
                 logger.warning(f"Invalid stop loss for {forex_pair}, removing stop loss")
                 stop_loss = None
@@ -522,33 +987,41 @@ def set_pending_order(forex_pair, order_type, price, lot_size, comment=None, sto
                 stop_loss = adjusted_sl
                 
         if take_profit is not None:
-            valid_tp, adjusted_tp = validate_and_adjust_price(forex_pair, take_profit, "TAKE_PROFIT", price, order_type)
+            valid_tp, adjusted_tp = _adjust_stop_price(forex_pair, take_profit, "TAKE_PROFIT", price, order_type, symbol_info)
             if not valid_tp:
                 logger.warning(f"Invalid take profit for {forex_pair}, removing take profit")
                 take_profit = None
             else:
                 take_profit = adjusted_tp
         
-        # Create and send the order
-        order = create_order_request(
-            action=mt5.TRADE_ACTION_PENDING,
-            symbol=forex_pair,
-            volume=lot_size,
+        # Fill in the per-pair request template and send the order
+        order = _ORDER_TEMPLATES.get(forex_pair)
+        if order is None:
+            order = _ORDER_TEMPLATES[forex_pair] = {
+                "action": mt5.TRADE_ACTION_PENDING,
+                "symbol": forex_pair,
+                "deviation": ORDER_SETTINGS["deviation"],
+                "magic": ORDER_SETTINGS["magic_number"],
+                "type_time": mt5.ORDER_TIME_GTC,
+                "type_filling": mt5.ORDER_FILLING_IOC,
+            }
+        order.update(
+            type=_ORDER_TYPE_MAP[order_type],
+            volume=float(lot_size),
             price=adjusted_price,
-            sl=stop_loss,
-            tp=take_profit,
-            type_time=mt5.ORDER_TIME_GTC,
-            type=get_order_type(order_type),
+            sl=stop_loss or 0.0,
+            tp=take_profit or 0.0,
             comment=comment or f"{order_type} order"
         )
         
-        result = mt5.order_send(order)
-        if result.retcode != mt5.TRADE_RETCODE_DONE:
-            logger.error(f"Failed to place {order_type} order for {forex_pair}: {get_error_message(result.retcode)}")
-            return None
-            
-        logger.info(f"Successfully placed {order_type} order for {forex_pair}, ticket: {result.order}")
-        return result
+        if not wait:
+            # Send a copy, the template is reused by the next order for this pair
+            return _async_send(
+                dict(order),
+                lambda result: _check_pending_order_result(forex_pair, order_type, result)
+            )
+        
+        return _check_pending_order_result(forex_pair, order_type, mt5.order_send(order))
     except Exception as e:
         logger.error(f"Error setting pending order for {forex_pair}: {e}")
         return None
@@ -633,12 +1106,211 @@ def validate_and_adjust_price(forex_pair, price, price_type, base_price=None, or
         logger.error(f"Error validating price for {forex_pair}: {e}")
         return False, price
 
-def check_pending_orders(forex_pair):
+def _adjust_stop_price(forex_pair, price, price_type, base_price, order_type, symbol_info=None):
+    """
+    Round a stop loss or take profit price, falling back to the full
+    validate_and_adjust_price only when it is too close to `base_price`
+    
+    Args:
+        forex_pair: Currency pair symbol
+        price: Stop loss or take profit price
+        price_type: "STOP_LOSS" or "TAKE_PROFIT"
+        base_price: Entry or current price the distance is measured from
+        order_type: Order or position type (e.g. "BUY", "SELL_STOP")
+        symbol_info: MT5 symbol info for the pair (optional, fetched if not provided)
+        
+    Returns:
+        Tuple of (is_valid, adjusted_price)
+    """
+    if symbol_info is None:
+        symbol_info = mt5.symbol_info(forex_pair)
+        if symbol_info is None:
+            return validate_and_adjust_price(forex_pair, price, price_type, base_price, order_type)
+    
+    tick_size = symbol_info.trade_tick_size
+    adjusted_price = round(round(price / tick_size) * tick_size, symbol_info.digits)
+    
+    # Distance on the correct side of the base price (SL below a buy, TP above)
+    distance = base_price - adjusted_price if "BUY" in order_type else adjusted_price - base_price
+    if price_type == "TAKE_PROFIT":
+        distance = -distance
+    
+    if distance >= symbol_info.trade_stops_level * symbol_info.point:
+        return True, adjusted_price
+    return validate_and_adjust_price(forex_pair, price, price_type, base_price, order_type)
+
+
+def _contingency_stop_prices(forex_pair, order_type, initial_entry, entry_to_sma_distance, symbol_info):
+    """
+    Calculate and validate entry, stop loss and take profit for a contingency
+    stop order in one pass
+    
+    Equivalent to calling validate_and_adjust_price on the entry, stop loss
+    and take profit in turn, but rounds and checks all three prices at once.
+    
+    Args:
+        forex_pair: Currency pair symbol
+        order_type: "BUY_STOP" or "SELL_STOP"
+        initial_entry: Entry price of the initial trade
+        entry_to_sma_distance: Distance from the initial entry to the 21 SMA
+        symbol_info: MT5 symbol info for the pair
+        
+    Returns:
+        Tuple of (entry, stop loss, take profit)
+    """
+    direction = 1 if order_type == "BUY_STOP" else -1
+    tick_size = symbol_info.trade_tick_size
+    
+    # Stop loss at 3x and take profit at 2x the entry to 21 SMA distance
+    prices = np.array([
+        initial_entry,
+        initial_entry - direction * (entry_to_sma_distance * 3),
+        initial_entry + direction * (entry_to_sma_distance * 2)
+    ])
+    prices = np.round(prices / tick_size) * tick_size
+    
+    if forex_pair.startswith(('XAU', 'XAG', 'XPD', 'XPT')):
+        # For metals, push SL/TP out to the minimum stop distance (plus a 10% buffer)
+        min_stop_distance = symbol_info.trade_stops_level * symbol_info.point
+        sides = np.array([-direction, direction])
+        too_close = sides * (prices[1:] - prices[0]) < min_stop_distance
+        prices[1:] = np.where(too_close, prices[0] + sides * (min_stop_distance * 1.1), prices[1:])
+        prices = np.round(prices / tick_size) * tick_size
+    else:
+        # JPY pairs typically have 3 decimal places, other pairs 5
+        prices = np.round(prices, 3 if "JPY" in forex_pair else 5)
+    
+    entry, stop_loss, take_profit = prices.tolist()
+    return entry, stop_loss, take_profit
+
+
+def _has_contingency_order(forex_pair, comment):
+    """
+    Check whether a given contingency pending order is already open for a pair
+    
+    Only the order with exactly this comment counts, so e.g. the contingency
+    stop at the 21 SMA placed with the trade does not block the one at the
+    initial entry.
+    
+    Args:
+        forex_pair: Currency pair symbol
+        comment: Comment of the contingency order
+        
+    Returns:
+        True if the order is pending (or the orders could not be read),
+        False otherwise
+    """
+    orders = mt5.orders_get(symbol=forex_pair)
+    if orders is None:
+        error = mt5.last_error()
+        if error[0] != 0:
+            logger.error(f"Failed to get pending orders for {forex_pair}: {error}")
+            return True
+        return False
+    return any(order.comment == comment for order in orders)
+
+
+def _place_contingency_stop(forex_pair, order_type, contingency_info, entry_to_sma_distance, symbol_info):
+    """
+    Place a contingency stop order at the initial entry of a trade
+    
+    The pending-order check, placement and trade count update run under a
+    per-pair lock, so concurrent cycles cannot place the same order twice.
+    
+    Args:
+        forex_pair: Currency pair symbol
+        order_type: "BUY_STOP" or "SELL_STOP"
+        contingency_info: The pair's contingency info dict from TRADING_SETTINGS
+            (updated in place)
+        entry_to_sma_distance: Distance from the initial entry to the 21 SMA
+        symbol_info: MT5 symbol info for the pair
+        
+    Returns:
+        True if the order was placed, False otherwise
+    """
+    # Cheapest check first, before asking the broker
+    initial_entry = contingency_info.get("initial_entry", None)
+    if not initial_entry:
+        return False
+    
+    label = order_type.replace("_", " ")
+    comment = f"Contingency {label} @entry"
+    with _pair_locks.setdefault(forex_pair, threading.Lock()):
+        if _has_contingency_order(forex_pair, comment):
+            logger.debug("Contingency order already pending for %s", forex_pair)
+            return False
+        
+        lot_size = contingency_info.get("initial_lot_size", 0.01) * 2
+        
+        logger.info("Setting %s at initial entry (%.5f) with %.2f lots for %s", label, initial_entry, lot_size, forex_pair)
+        
+        # Calculate and validate entry, stop loss and take profit
+        adjusted_price, adjusted_sl, adjusted_tp = _contingency_stop_prices(
+            forex_pair, order_type, initial_entry, entry_to_sma_distance, symbol_info
+        )
+        
+        # Place the order
+        result = set_pending_order(
+            forex_pair,
+            order_type,
+            adjusted_price,
+            lot_size,
+            comment=comment,
+            stop_loss=adjusted_sl,
+            take_profit=adjusted_tp
+        )
+        
+        if result:
+            # Update contingency info with total trades
+            with _contingency_lock:
+                contingency_info["total_trades"] = contingency_info.get("total_trades", 1) + 1
+        
+        return bool(result)
+
+
+def _get_sr_state(forex_pair, dfs):
+    """
+    Get the support/resistance state for a currency pair, brought up to
+    date with the last two candles of dfs
+    
+    Args:
+        forex_pair: Currency pair symbol
+        dfs: DataFrame with price data indexed by bar time
+        
+    Returns:
+        SRState with the levels of the candles in dfs
+    """
+    state = _sr_states.get(forex_pair)
+    if state is None or state.max_bars != len(dfs) or not state.update_from_frame(dfs.iloc[-2:]):
+        # First call, a different history length, or missed bars
+        state = SRState.from_frame(dfs)
+        _sr_states[forex_pair] = state
+    return state
+
+
+def _get_sr_levels(forex_pair, dfs):
+    """
+    Get the support and resistance levels for a currency pair
+    
+    Args:
+        forex_pair: Currency pair symbol
+        dfs: DataFrame with price data indexed by bar time
+        
+    Returns:
+        Tuple of (support levels, resistance levels) as ascending NumPy arrays
+    """
+    state = _get_sr_state(forex_pair, dfs)
+    return state.support, state.resistance
+
+
+def check_pending_orders(forex_pair, ctx=None, dfs=None):
     """
     Check and manage pending orders
     
     Args:
         forex_pair: Currency pair symbol
+        ctx: SymbolContext for this cycle (optional, fetched from MT5 if not provided)
+        dfs: DataFrame with indicators for this cycle (optional, fetched if not provided)
         
     Returns:
         True if a contingency plan was executed, False otherwise
@@ -656,59 +1328,47 @@ def check_pending_orders(forex_pair):
         position_type = "BUY" if position.type == 0 else "SELL"
         
         # Check if we have contingency info for this pair
-        if contingency_key in TRADING_SETTINGS:
-            contingency_info = TRADING_SETTINGS[contingency_key]
+        contingency_info = TRADING_SETTINGS.get(contingency_key)
+        if contingency_info is not None:
             
             # Calculate entry to SMA distance
             entry_to_sma_distance = contingency_info.get("entry_to_sma_distance", 0)
             
+            # Symbol info for validating contingency order prices
+            symbol_info = ctx.symbol_info if ctx else mt5.symbol_info(forex_pair)
+            if symbol_info is None:
+                logger.error(f"Failed to get symbol info for {forex_pair}")
+                return False
+            
             # If this is a BUY position
             if position_type == "BUY":
                 # Get current market price
-                current_price = mt5.symbol_info_tick(forex_pair).bid
+                current_price = (ctx.tick if ctx else mt5.symbol_info_tick(forex_pair)).bid
                 
-                # Get latest 21 SMA
-                dfs = fetch_data(forex_pair, count=TRADING_SETTINGS["candles_count"])
+                # Candles for the support/resistance levels
+                if dfs is None:
+                    dfs = fetch_indicator_data(forex_pair)
                 if dfs is None:
                     return False
-                    
-                dfs = calculate_indicators(dfs)
-                latest = dfs.iloc[-1]
-                sma_21 = latest['21_SMA']
                 
-                # If we have a BUY position, check for resistance levels
-                resistance_levels = find_resistance_levels(dfs, current_price)
-                nearest_resistance = None
-                
-                if resistance_levels and len(resistance_levels) > 0:
-                    # Find the nearest resistance above current price
-                    for level in resistance_levels:
-                        if level > current_price:
-                            nearest_resistance = level
-                            break
-                
-                # Calculate stop loss - use the nearest support level
-                support_levels = find_support_levels(dfs, current_price)
-                stop_loss = None
+                support_levels, resistance_levels = _get_sr_levels(forex_pair, dfs)
                 
-                if support_levels and len(support_levels) > 0:
-                    # Find the nearest support below current price
-                    for level in support_levels:
-                        if level < current_price:
-                            stop_loss = level
-                            break
+                # Calculate stop loss - use the nearest support level below current price
+                idx = np.searchsorted(support_levels, current_price) - 1
+                stop_loss = support_levels[idx] if idx >= 0 else None
                 
                 # If no support level found, use a default
                 if stop_loss is None:
                     stop_loss = position.price_open - entry_to_sma_distance
                 
                 # Ensure stop loss is valid
-                valid_sl, adjusted_sl = validate_and_adjust_price(
+                valid_sl, adjusted_sl = _adjust_stop_price(
                     forex_pair, 
                     stop_loss, 
                     "STOP_LOSS", 
                     current_price, 
-                    "BUY"
+                    "BUY",
+                    symbol_info
                 )
                 
                 if valid_sl:
@@ -721,89 +1381,44 @@ def check_pending_orders(forex_pair):
                     )
                     
                     if result:
-                        logger.info(f"Modified BUY position {position.ticket}: SL={adjusted_sl:.5f}, TP={position.tp:.5f}")
+                        logger.info("Modified BUY position %s: SL=%.5f, TP=%.5f", position.ticket, adjusted_sl, position.tp)
                     else:
                         logger.error(f"Failed to modify position {position.ticket} for {forex_pair}")
                 
                 # Set up a SELL STOP at the initial entry
-                initial_entry = contingency_info.get("initial_entry", None)
-                if initial_entry:
-                    lot_size = contingency_info.get("initial_lot_size", 0.01) * 2
-                    
-                    logger.info(f"Setting SELL STOP at initial entry ({initial_entry:.5f}) with {lot_size:.2f} lots for {forex_pair}")
-                    
-                    # Calculate take profit and stop loss for SELL STOP
-                    stop_loss_for_sell = initial_entry + (entry_to_sma_distance * 3)
-                    take_profit_for_sell = initial_entry - (entry_to_sma_distance * 2)
-                    
-                    # Validate prices
-                    _, adjusted_price = validate_and_adjust_price(forex_pair, initial_entry, "ENTRY")
-                    _, adjusted_sl = validate_and_adjust_price(forex_pair, stop_loss_for_sell, "STOP_LOSS", adjusted_price, "SELL_STOP")
-                    _, adjusted_tp = validate_and_adjust_price(forex_pair, take_profit_for_sell, "TAKE_PROFIT", adjusted_price, "SELL_STOP")
-                    
-                    # Place the order
-                    result = set_pending_order(
-                        forex_pair,
-                        "SELL_STOP",
-                        adjusted_price,
-                        lot_size,
-                        comment="Contingency SELL STOP",
-                        stop_loss=adjusted_sl,
-                        take_profit=adjusted_tp
-                    )
-                    
-                    if result:
-                        # Update contingency info with total trades
-                        total_trades = contingency_info.get("total_trades", 1) + 1
-                        TRADING_SETTINGS[contingency_key]["total_trades"] = total_trades
+                _place_contingency_stop(
+                    forex_pair, "SELL_STOP", contingency_info, entry_to_sma_distance, symbol_info
+                )
                         
             # If this is a SELL position
             elif position_type == "SELL":
                 # Get current market price
-                current_price = mt5.symbol_info_tick(forex_pair).ask
+                current_price = (ctx.tick if ctx else mt5.symbol_info_tick(forex_pair)).ask
                 
-                # Get latest 21 SMA
-                dfs = fetch_data(forex_pair, count=TRADING_SETTINGS["candles_count"])
+                # Candles for the support/resistance levels
+                if dfs is None:
+                    dfs = fetch_indicator_data(forex_pair)
                 if dfs is None:
                     return False
-                    
-                dfs = calculate_indicators(dfs)
-                latest = dfs.iloc[-1]
-                sma_21 = latest['21_SMA']
                 
-                # If we have a SELL position, check for support levels
-                support_levels = find_support_levels(dfs, current_price)
-                nearest_support = None
-                
-                if support_levels and len(support_levels) > 0:
-                    # Find the nearest support below current price
-                    for level in support_levels:
-                        if level < current_price:
-                            nearest_support = level
-                            break
-                
-                # Calculate stop loss - use the nearest resistance level
-                resistance_levels = find_resistance_levels(dfs, current_price)
-                stop_loss = None
+                support_levels, resistance_levels = _get_sr_levels(forex_pair, dfs)
                 
-                if resistance_levels and len(resistance_levels) > 0:
-                    # Find the nearest resistance above current price
-                    for level in resistance_levels:
-                        if level > current_price:
-                            stop_loss = level
-                            break
+                # Calculate stop loss - use the nearest resistance level above current price
+                idx = np.searchsorted(resistance_levels, current_price, side='right')
+                stop_loss = resistance_levels[idx] if idx < len(resistance_levels) else None
                 
                 # If no resistance level found, use a default
                 if stop_loss is None:
                     stop_loss = position.price_open + entry_to_sma_distance
                 
                 # Ensure stop loss is valid
-                valid_sl, adjusted_sl = validate_and_adjust_price(
+                valid_sl, adjusted_sl = _adjust_stop_price(
                     forex_pair, 
                     stop_loss, 
                     "STOP_LOSS", 
                     current_price, 
-                    "SELL"
+                    "SELL",
+                    symbol_info
                 )
                 
                 if valid_sl:
@@ -816,47 +1431,138 @@ def check_pending_orders(forex_pair):
                     )
                     
                     if result:
-                        logger.info(f"Modified SELL position {position.ticket}: SL={adjusted_sl:.5f}, TP={position.tp:.5f}")
+                        logger.info("Modified SELL position %s: SL=%.5f, TP=%.5f", position.ticket, adjusted_sl, position.tp)
                     else:
                         logger.error(f"Failed to modify position {position.ticket} for {forex_pair}")
                 
                 # Set up a BUY STOP at the initial entry
-                initial_entry = contingency_info.get("initial_entry", None)
-                if initial_entry:
-                    lot_size = contingency_info.get("initial_lot_size", 0.01) * 2
-                    
-                    logger.info(f"Setting BUY STOP at initial entry ({initial_entry:.5f}) with {lot_size:.2f} lots for {forex_pair}")
-                    
-                    # Calculate take profit and stop loss for BUY STOP
-                    stop_loss_for_buy = initial_entry - (entry_to_sma_distance * 3)
-                    take_profit_for_buy = initial_entry + (entry_to_sma_distance * 2)
-                    
-                    # Validate prices
-                    _, adjusted_price = validate_and_adjust_price(forex_pair, initial_entry, "ENTRY")
-                    _, adjusted_sl = validate_and_adjust_price(forex_pair, stop_loss_for_buy, "STOP_LOSS", adjusted_price, "BUY_STOP")
-                    _, adjusted_tp = validate_and_adjust_price(forex_pair, take_profit_for_buy, "TAKE_PROFIT", adjusted_price, "BUY_STOP")
-                    
-                    # Place the order
-                    result = set_pending_order(
-                        forex_pair,
-                        "BUY_STOP",
-                        adjusted_price,
-                        lot_size,
-                        comment="Contingency BUY STOP",
-                        stop_loss=adjusted_sl,
-                        take_profit=adjusted_tp
-                    )
-                    
-                    if result:
-                        # Update contingency info with total trades
-                        total_trades = contingency_info.get("total_trades", 1) + 1
-                        TRADING_SETTINGS[contingency_key]["total_trades"] = total_trades
+                _place_contingency_stop(
+                    forex_pair, "BUY_STOP", contingency_info, entry_to_sma_distance, symbol_info
+                )
                         
         return True
     except Exception as e:
         logger.error(f"Error checking pending orders for {forex_pair}: {e}")
         return False
 
+def _prepare_pair(forex_pair, account_info=None):
+    """
+    First half of a pair's trading cycle: take a rate-limiter token, skip
+    the pair if its price hasn't moved, and fetch its symbol info and candles
+    
+    Args:
+        forex_pair: Currency pair symbol
+        account_info: Account info fetched once for the trading cycle (optional)
+    
+    Returns:
+        Tuple of (SymbolContext, DataFrame of candles without indicators),
+        or None if the pair should be skipped this cycle
+    """
+    try:
+        _get_rate_limiter(forex_pair).acquire()
+        
+        # Skip the pair entirely while its price hasn't moved
+        tick = mt5.symbol_info_tick(forex_pair)
+        if tick is not None:
+            if _last_tick_ms.get(forex_pair) == tick.time_msc:
+                return None
+            _last_tick_ms[forex_pair] = tick.time_msc
+        
+        logger.info("Processing %s", forex_pair)
+        
+        # Fetch symbol info once for everything below, reusing the tick
+        ctx = _build_symbol_context(forex_pair, account_info, tick=tick)
+        
+        # Get market data once for all the steps of the cycle
+        return ctx, fetch_data(forex_pair, count=TRADING_SETTINGS["candles_count"])
+        
+    except Exception as e:
+        logger.exception("Error processing %s: %s", forex_pair, e)
+        return None
+
+
+def _run_pair(forex_pair, ctx, dfs):
+    """
+    Second half of a pair's trading cycle: exits, pending orders and entries
+    
+    Args:
+        forex_pair: Currency pair symbol
+        ctx: SymbolContext from _prepare_pair
+        dfs: DataFrame with price data and indicators (None if the fetch failed)
+    
+    Returns:
+        None
+    """
+    try:
+        # Get open positions for this pair
+        positions = get_open_positions(forex_pair)
+        
+        # If we have open positions, check exit conditions
+        if positions and dfs is not None:
+            # Get support/resistance levels
+            sr_levels = _get_sr_state(forex_pair, dfs).levels()
+            
+            # Check exit conditions
+            check_exit_conditions(forex_pair, _to_bars(dfs), positions, sr_levels)
+        
+        # Check for existing positions and manage them
+        check_pending_orders(forex_pair, ctx=ctx, dfs=dfs)
+        
+        # Execute trading strategy
+        execute(forex_pair, ctx=ctx, dfs=dfs)
+        
+    except Exception as e:
+        logger.exception("Error processing %s: %s", forex_pair, e)
+
+
+def _calculate_cycle_indicators(items):
+    """
+    Calculate the indicators of the candles fetched in a trading cycle
+    
+    Pairs whose candles only moved on by the current bar since the previous
+    cycle reuse their indicator columns and only recalculate the newest
+    rows; the rest are calculated together in one batch.
+    
+    Args:
+        items: List of (forex_pair, DataFrame) tuples (None frames are skipped)
+    """
+    for forex_pair, dfs in items:
+        if dfs is not None:
+            reuse_indicators(dfs, _indicator_frames.get(forex_pair))
+    calculate_indicators_batch([dfs for _, dfs in items])
+    for forex_pair, dfs in items:
+        if dfs is not None:
+            _indicator_frames[forex_pair] = dfs
+
+
+def _tradable_pairs(pairs, now):
+    """
+    Keep the pairs whose symbols are available in MT5
+    
+    Symbols that fail to enable are skipped until symbol_retry_delay has
+    passed, instead of being retried every cycle.
+    
+    Args:
+        pairs: Currency pair symbols
+        now: Current time in seconds since the epoch
+        
+    Returns:
+        List of the usable pairs, in their original order
+    """
+    valid_pairs = []
+    for pair in pairs:
+        # Don't retry a symbol that failed recently
+        if _disabled_until.get(pair, 0) > now:
+            continue
+        
+        if not ensure_symbol(pair):
+            _disabled_until[pair] = now + TRADING_SETTINGS["symbol_retry_delay"]
+            continue
+        
+        valid_pairs.append(pair)
+    return valid_pairs
+
+
 def execute_multiple_pairs(login=None, password=None, server=None, interval=1):
     """
     Execute trading strategy for multiple pairs in a continuous loop
@@ -870,6 +1576,7 @@ def execute_multiple_pairs(login=None, password=None, server=None, interval=1):
     Returns:
         None
     """
+    executor = None
     try:
         # Initialize MT5 if login credentials provided
         if login is not None:
@@ -879,70 +1586,79 @@ def execute_multiple_pairs(login=None, password=None, server=None, interval=1):
         
         logger.info(f"Starting continuous trading with minimal delay between cycles")
         
+        # Threads are only started as needed, so at most min(pairs, max_workers) run
+        executor = ThreadPoolExecutor(max_workers=TRADING_SETTINGS["max_workers"])
+        
         while True:  # Continuous loop
             try:
                 # Get pairs list
                 pairs_list = load_currency_pairs()
                 
                 # Filter out unsupported/disabled symbols
-                valid_pairs = []
-                for pair in pairs_list:
-                    # Check if symbol is enabled in MT5
-                    if not mt5.symbol_select(pair, True):
-                        logger.error(f"ERROR: Failed to enable symbol {pair}")
-                        continue
-                        
-                    valid_pairs.append(pair)
+                valid_pairs = _tradable_pairs(pairs_list, time.time())
                     
                 if not valid_pairs:
                     logger.error("No valid pairs to trade!")
                     time.sleep(1)  # Brief pause before retrying
                     continue
                     
-                for forex_pair in valid_pairs:
-                    try:
-                        logger.info(f"Processing {forex_pair}")
-                        
-                        # Get open positions for this pair
-                        positions = get_open_positions(forex_pair)
-                        
-                        # If we have open positions, check exit conditions
-                        if positions:
-                            # Get market data
-                            dfs = fetch_data(forex_pair, count=TRADING_SETTINGS["candles_count"])
-                            if dfs is not None:
-                                # Calculate indicators
-                                dfs = calculate_indicators(dfs)
-                                
-                                # Get support/resistance levels
-                                sr_levels = detect_support_resistance(dfs)
-                                
-                                # Check exit conditions
-                                check_exit_conditions(forex_pair, dfs, positions, sr_levels)
-                        
-                        # Check for existing positions and manage them
-                        check_pending_orders(forex_pair)
-                        
-                        # Execute trading strategy
-                        execute(forex_pair)
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing {forex_pair}: {e}")
-                        logger.error(traceback.format_exc())
+                # Data cached during the previous cycle is stale now
+                _start_cycle()
+                
+                # Account info is shared by all pairs in this cycle
+                account_info = mt5.account_info()
+                
+                # Fetch all pairs concurrently; list() waits for every pair
+                prepared = list(executor.map(_prepare_pair, valid_pairs, [account_info] * len(valid_pairs)))
+                ready = [(pair, item) for pair, item in zip(valid_pairs, prepared) if item is not None]
+                
+                # Indicators for every fetched pair in one batch of NumPy calls
+                _calculate_cycle_indicators([(pair, dfs) for pair, (_, dfs) in ready])
+                
+                # Then trade all pairs concurrently
+                list(executor.map(lambda item: _run_pair(item[0], *item[1]), ready))
                 
                 # Very brief pause between cycles to prevent system overload
                 time.sleep(0.1)
                 
             except Exception as e:
-                logger.error(f"Error in trading cycle: {e}")
-                logger.error(traceback.format_exc())
+                logger.exception("Error in trading cycle: %s", e)
                 time.sleep(1)  # Brief pause before retrying on error
                 
     except KeyboardInterrupt:
         logger.info("Trading bot stopped by user")
     except Exception as e:
-        logger.error(f"Error executing multiple pairs: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception("Error executing multiple pairs: %s", e)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+def _watch_ticks(forex_pair, tick_event, stop_event, interval=None):
+    """
+    Set `tick_event` whenever the latest tick of a currency pair changes
+    
+    The MT5 Python API has no tick callbacks, so this polls the (cheap)
+    latest tick in a background thread and lets the trading loop sleep
+    until the price actually moves.
+    
+    Args:
+        forex_pair: Currency pair symbol
+        tick_event: Event set on every new tick
+        stop_event: Event that stops the watcher when set
+        interval: Seconds between tick checks (defaults to TRADING_SETTINGS["tick_poll_interval"])
+    """
+    interval = interval or TRADING_SETTINGS["tick_poll_interval"]
+    last_tick_ms = None
+    while not stop_event.wait(interval):
+        try:
+            tick = mt5.symbol_info_tick(forex_pair)
+            if tick is not None and tick.time_msc != last_tick_ms:
+                last_tick_ms = tick.time_msc
+                tick_event.set()
+        except Exception as e:
+            logger.exception("Error watching ticks for %s: %s", forex_pair, e)
+
 
 def start_trading(login=None, password=None, server=None, currency_pair=None):
     """
@@ -975,22 +1691,38 @@ def start_trading(login=None, password=None, server=None, currency_pair=None):
         log_error("Failed to initialize MT5")
         return
 
+    # Wake the loop on new ticks (polled by _watch_ticks; the MT5 API has no callbacks)
+    tick_event = threading.Event()
+    stop_event = threading.Event()
+    watcher = threading.Thread(
+        target=_watch_ticks,
+        args=(currency_pair, tick_event, stop_event),
+        name=f"tick-watcher-{currency_pair}",
+        daemon=True
+    )
+    watcher.start()
+
     try:
         logger.info("Trading bot started")
         while True:
+            # Data cached during the previous cycle is stale now
+            _start_cycle()
+            
             # Check pending orders and manage contingency plan
             check_pending_orders(currency_pair)
             
             # Execute trading strategy
             execute(currency_pair)
             
-            # Sleep for a short period to avoid excessive CPU usage
-            time.sleep(10)
+            # Wait for the next tick (at most 10 seconds)
+            tick_event.wait(timeout=10)
+            tick_event.clear()
     except KeyboardInterrupt:
         logger.info("Trading bot stopped by user")
     except Exception as e:
         log_error("Unexpected error in trading bot", e)
     finally:
+        stop_event.set()
         logger.info("Shutting down MT5 connection")
         shutdown_mt5()
 
@@ -1019,18 +1751,24 @@ def get_open_positions(forex_pair):
     """
     Get all open positions for a currency pair
     
+    Inside a trading loop, positions are fetched once per cycle and shared by
+    later calls for the same pair within that cycle.
+    
     Args:
         forex_pair: Currency pair symbol
         
     Returns:
-        List of open positions or empty list if none
+        Tuple of open positions, empty if none
     """
     try:
-        import MetaTrader5 as mt5
+        # Cycle 0 means no trading loop is running, so always fetch
+        cached = _positions_cache.get(forex_pair)
+        if _cycle_id and cached is not None and cached[0] == _cycle_id:
+            return cached[1]
         
-        if not mt5.initialize():
+        if not _ensure_mt5_initialized():
             logger.error(f"Failed to initialize MT5: {mt5.last_error()}")
-            return []
+            return ()
         
         # Get all open positions
         positions = mt5.positions_get(symbol=forex_pair)
@@ -1038,19 +1776,19 @@ def get_open_positions(forex_pair):
             error = mt5.last_error()
             if error[0] != 0:
                 logger.error(f"Failed to get positions for {forex_pair}: {error}")
-            return []
+                _check_mt5_connection(error)
+            return ()
         
-        # Convert to list if needed
-        positions_list = list(positions)
-        logger.debug(f"Found {len(positions_list)} open positions for {forex_pair}")
-        return positions_list
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Found %s open positions for %s", len(positions), forex_pair)
+        _positions_cache[forex_pair] = (_cycle_id, positions)
+        return positions
         
     except Exception as e:
-        logger.error(f"Error getting open positions for {forex_pair}: {e}")
-        logger.error(traceback.format_exc())
-        return []
+        logger.exception("Error getting open positions for %s: %s", forex_pair, e)
+        return ()
 
-def calculate_lot_size(forex_pair, stop_loss_distance_points):
+def calculate_lot_size(forex_pair, stop_loss_distance_points, ctx=None):
     """
     Calculate proper lot size based on risk management
     
@@ -1060,30 +1798,29 @@ def calculate_lot_size(forex_pair, stop_loss_distance_points):
     Args:
         forex_pair: Currency pair symbol
         stop_loss_distance_points: Distance from entry to stop loss in price points
+        ctx: SymbolContext for this cycle (optional, fetched from MT5 if not provided)
         
     Returns:
         Lot size based on risk management
     """
     try:
-        import MetaTrader5 as mt5
-        
-        if not mt5.initialize():
+        if not _ensure_mt5_initialized():
             logger.error(f"Failed to initialize MT5: {mt5.last_error()}")
             return 0.01  # Default minimum lot size
         
         # Get account info and symbol info
-        account_info = mt5.account_info()
+        account_info = ctx.account_info if ctx and ctx.account_info else mt5.account_info()
         if account_info is None:
             logger.error(f"Failed to get account info: {mt5.last_error()}")
             return 0.01
         
-        symbol_info = mt5.symbol_info(forex_pair)
+        symbol_info = ctx.symbol_info if ctx else mt5.symbol_info(forex_pair)
         if symbol_info is None:
             logger.error(f"Failed to get symbol info for {forex_pair}: {mt5.last_error()}")
             return 0.01
         
         # Get current price (average of bid/ask)
-        symbol_tick = mt5.symbol_info_tick(forex_pair)
+        symbol_tick = ctx.tick if ctx else mt5.symbol_info_tick(forex_pair)
         if symbol_tick is None:
             logger.error(f"Failed to get symbol tick for {forex_pair}: {mt5.last_error()}")
             return 0.01
@@ -1096,35 +1833,27 @@ def calculate_lot_size(forex_pair, stop_loss_distance_points):
         # Calculate account risk amount
         account_balance = account_info.balance
         account_risk_amount = account_balance * risk_percentage
-        logger.debug(f"Account balance: {account_balance}, Risk amount: {account_risk_amount}")
+        logger.debug("Account balance: %s, Risk amount: %s", account_balance, account_risk_amount)
+        
+        pip_info = _PIP_INFO.get(forex_pair) or _build_pip_info(forex_pair, symbol_info)
         
         # Apply a minimum stop loss distance to prevent excessive lot sizes
-        # Typically 10 pips (0.0010) for most pairs, 100 pips (0.01) for JPY pairs
-        min_stop_loss_distance = 0.0010
-        if forex_pair.endswith('JPY'):
-            min_stop_loss_distance = 0.01
+        min_stop_loss_distance = pip_info.min_sl_distance
         
         # Apply the minimum stop loss distance if the current distance is too small
         if stop_loss_distance_points < min_stop_loss_distance:
-            logger.warning(f"Stop loss distance ({stop_loss_distance_points:.5f}) is too small, using minimum ({min_stop_loss_distance:.5f})")
+            logger.warning("Stop loss distance (%.5f) is too small, using minimum (%.5f)", stop_loss_distance_points, min_stop_loss_distance)
             stop_loss_distance_points = min_stop_loss_distance
         
         # Determine pip value based on currency pair
-        one_pip_movement = 0.01 if forex_pair.endswith('JPY') else 0.0001
+        one_pip_movement = pip_info.one_pip_movement
         
         # Convert point distance to pip distance
-        if not forex_pair.endswith('JPY') and symbol_info.digits == 5:  # 5-digit broker for non-JPY pairs
-            pip_multiplier = 0.1  # 1 pip = 10 points
-        elif forex_pair.endswith('JPY') and symbol_info.digits == 3:  # 3-digit broker for JPY pairs
-            pip_multiplier = 0.1  # 1 pip = 10 points
-        else:
-            pip_multiplier = 1.0  # 1 pip = 1 point (standard 4-digit broker)
-        
-        stop_loss_in_pips = stop_loss_distance_points / pip_multiplier
+        stop_loss_in_pips = stop_loss_distance_points / pip_info.pip_multiplier
         
         # Ensure stop_loss_in_pips is not zero to avoid division by zero
         if stop_loss_in_pips <= 0:
-            logger.warning(f"Stop loss in pips is {stop_loss_in_pips}, using minimum 10 pips")
+            logger.warning("Stop loss in pips is %s, using minimum 10 pips", stop_loss_in_pips)
             stop_loss_in_pips = 10.0
         
         # Calculate pip value (monetary value of 1 pip for 1 standard lot)
@@ -1175,34 +1904,32 @@ def calculate_lot_size(forex_pair, stop_loss_distance_points):
         lot_step = symbol_info.volume_step
         lot_size = round(lot_size / lot_step) * lot_step
         
-        logger.info(f"Calculated lot size: {lot_size:.2f}, Stop loss distance: {stop_loss_in_pips:.1f} pips")
+        logger.info("Calculated lot size: %.2f, Stop loss distance: %.1f pips", lot_size, stop_loss_in_pips)
         return lot_size
         
     except Exception as e:
-        logger.error(f"Error calculating lot size for {forex_pair}: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception("Error calculating lot size for %s: %s", forex_pair, e)
         return 0.01  # Default to minimum lot size
 
-def open_buy_trade_without_sl(forex_pair, lot_size):
+def open_buy_trade_without_sl(forex_pair, lot_size, ctx=None):
     """
     Open a BUY trade without a stop loss
     
     Args:
         forex_pair: Currency pair symbol
         lot_size: Lot size for the trade
+        ctx: SymbolContext for this cycle (optional, fetched from MT5 if not provided)
         
     Returns:
         Order result if trade was successfully opened, False otherwise
     """
     try:
-        import MetaTrader5 as mt5
-        
-        if not mt5.initialize():
+        if not _ensure_mt5_initialized():
             logger.error(f"Failed to initialize MT5: {mt5.last_error()}")
             return False
         
         # Get symbol info
-        symbol_info = mt5.symbol_info(forex_pair)
+        symbol_info = ctx.symbol_info if ctx else mt5.symbol_info(forex_pair)
         if symbol_info is None:
             logger.error(f"Failed to get symbol info for {forex_pair}")
             return False
@@ -1215,23 +1942,17 @@ def open_buy_trade_without_sl(forex_pair, lot_size):
                 return False
         
         # Get current price
-        symbol_tick = mt5.symbol_info_tick(forex_pair)
+        symbol_tick = ctx.tick if ctx else mt5.symbol_info_tick(forex_pair)
         if symbol_tick is None:
             logger.error(f"Failed to get symbol tick for {forex_pair}")
             return False
         
         # Define trade request
         request = {
-            "action": mt5.TRADE_ACTION_DEAL,
+            **_BUY_ORDER_TMPL,
             "symbol": forex_pair,
             "volume": lot_size,
-            "type": mt5.ORDER_TYPE_BUY,
             "price": symbol_tick.ask,  # Buy at ask price
-            "deviation": 10,  # Allow price deviation in points
-            "magic": 234000,  # Magic number to identify trades
-            "comment": "Mario Trader",
-            "type_time": mt5.ORDER_TIME_GTC,  # Good Till Cancelled
-            "type_filling": mt5.ORDER_FILLING_IOC,
         }
         
         # Send the order
@@ -1244,30 +1965,28 @@ def open_buy_trade_without_sl(forex_pair, lot_size):
         return result
         
     except Exception as e:
-        logger.error(f"Error opening BUY trade for {forex_pair}: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception("Error opening BUY trade for %s: %s", forex_pair, e)
         return False
 
-def open_sell_trade_without_sl(forex_pair, lot_size):
+def open_sell_trade_without_sl(forex_pair, lot_size, ctx=None):
     """
     Open a SELL trade without a stop loss
     
     Args:
         forex_pair: Currency pair symbol
         lot_size: Lot size for the trade
+        ctx: SymbolContext for this cycle (optional, fetched from MT5 if not provided)
         
     Returns:
         Order result if trade was successfully opened, False otherwise
     """
     try:
-        import MetaTrader5 as mt5
-        
-        if not mt5.initialize():
+        if not _ensure_mt5_initialized():
             logger.error(f"Failed to initialize MT5: {mt5.last_error()}")
             return False
         
         # Get symbol info
-        symbol_info = mt5.symbol_info(forex_pair)
+        symbol_info = ctx.symbol_info if ctx else mt5.symbol_info(forex_pair)
         if symbol_info is None:
             logger.error(f"Failed to get symbol info for {forex_pair}")
             return False
@@ -1280,23 +1999,17 @@ def open_sell_trade_without_sl(forex_pair, lot_size):
                 return False
         
         # Get current price
-        symbol_tick = mt5.symbol_info_tick(forex_pair)
+        symbol_tick = ctx.tick if ctx else mt5.symbol_info_tick(forex_pair)
         if symbol_tick is None:
             logger.error(f"Failed to get symbol tick for {forex_pair}")
             return False
         
         # Define trade request
         request = {
-            "action": mt5.TRADE_ACTION_DEAL,
+            **_SELL_ORDER_TMPL,
             "symbol": forex_pair,
             "volume": lot_size,
-            "type": mt5.ORDER_TYPE_SELL,
             "price": symbol_tick.bid,  # Sell at bid price
-            "deviation": 10,  # Allow price deviation in points
-            "magic": 234000,  # Magic number to identify trades
-            "comment": "Mario Trader",
-            "type_time": mt5.ORDER_TIME_GTC,  # Good Till Cancelled
-            "type_filling": mt5.ORDER_FILLING_IOC,
         }
         
         # Send the order
@@ -1309,14 +2022,64 @@ def open_sell_trade_without_sl(forex_pair, lot_size):
         return result
         
     except Exception as e:
-        logger.error(f"Error opening SELL trade for {forex_pair}: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception("Error opening SELL trade for %s: %s", forex_pair, e)
         return False
 
+def _trade_log_writer():
+    """
+    Write queued trade records to the per-pair trade CSV files
+    
+    Runs in a daemon thread. One file handle is kept open per pair and all
+    handles are flushed whenever the queue has been drained.
+    """
+    # Create trades directory if it doesn't exist
+    trades_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs", "trades")
+    os.makedirs(trades_dir, exist_ok=True)
+    
+    while True:
+        forex_pair, current_time, action, price, lot_size, stop_loss = _trade_queue.get()
+        try:
+            f = _trade_log_files.get(forex_pair)
+            if f is None:
+                # Create or append to the trades log file
+                trades_file = os.path.join(trades_dir, f"{forex_pair}_trades.csv")
+                file_exists = os.path.isfile(trades_file)
+                f = open(trades_file, "a")
+                if not file_exists:
+                    # Write the header row
+                    f.write("Time,Pair,Action,Price,LotSize,StopLoss\n")
+                _trade_log_files[forex_pair] = f
+            
+            # Write the trade record
+            f.write(f"{current_time},{forex_pair},{action},{price},{lot_size},{stop_loss}\n")
+            
+            if _trade_queue.empty():
+                for handle in _trade_log_files.values():
+                    handle.flush()
+        except Exception as e:
+            logger.exception("Error writing trade log for %s: %s", forex_pair, e)
+        finally:
+            _trade_queue.task_done()
+
+
+def _start_trade_log_writer():
+    """Start the trade log writer thread if it is not running yet"""
+    global _trade_log_thread
+    with _trade_log_lock:
+        if _trade_log_thread is None:
+            _trade_log_thread = threading.Thread(target=_trade_log_writer, name="trade-log-writer", daemon=True)
+            _trade_log_thread.start()
+            # Let queued records reach the disk before the interpreter exits
+            atexit.register(_trade_queue.join)
+
+
 def log_trade(forex_pair, action, price, lot_size, stop_loss):
     """
     Log a trade for record keeping
     
+    The record is queued and written to logs/trades/{pair}_trades.csv by a
+    background thread, so the trading thread never waits on the disk.
+    
     Args:
         forex_pair: Currency pair symbol
         action: BUY or SELL
@@ -1327,27 +2090,13 @@ def log_trade(forex_pair, action, price, lot_size, stop_loss):
     try:
         current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
-        # Create trades directory if it doesn't exist
-        trades_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs", "trades")
-        os.makedirs(trades_dir, exist_ok=True)
-        
-        # Create or append to the trades log file
-        trades_file = os.path.join(trades_dir, f"{forex_pair}_trades.csv")
-        file_exists = os.path.isfile(trades_file)
-        
-        with open(trades_file, "a") as f:
-            if not file_exists:
-                # Write the header row
-                f.write("Time,Pair,Action,Price,LotSize,StopLoss\n")
-            
-            # Write the trade record
-            f.write(f"{current_time},{forex_pair},{action},{price},{lot_size},{stop_loss}\n")
+        _start_trade_log_writer()
+        _trade_queue.put((forex_pair, current_time, action, price, lot_size, stop_loss))
         
         logger.info(f"Trade logged: {action} {forex_pair} at {price}, Lot: {lot_size}, SL: {stop_loss}")
     
     except Exception as e:
-        logger.error(f"Error logging trade: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception("Error logging trade: %s", e)
 
 def modify_position_sl_tp(forex_pair, position_ticket, stop_loss=None, take_profit=None):
     """
@@ -1362,48 +2111,76 @@ def modify_position_sl_tp(forex_pair, position_ticket, stop_loss=None, take_prof
     Returns:
         True if modification was successful, False otherwise
     """
-    try:
-        import MetaTrader5 as mt5
+    return modify_positions_sl_tp(forex_pair, [(position_ticket, stop_loss, take_profit)])[0]
+
+
+def modify_positions_sl_tp(forex_pair, modifications):
+    """
+    Modify stop loss and take profit of several positions at once
+    
+    The open positions are looked up with a single positions_get call and the
+    TRADE_ACTION_SLTP requests are sent concurrently.
+    
+    Args:
+        forex_pair: Currency pair symbol
+        modifications: List of (ticket, stop_loss, take_profit) tuples; None
+            leaves the stop loss or take profit unchanged
         
-        if not mt5.initialize():
+    Returns:
+        List of booleans, one per modification in the same order
+    """
+    results = [False] * len(modifications)
+    try:
+        if not _ensure_mt5_initialized():
             logger.error(f"Failed to initialize MT5: {mt5.last_error()}")
-            return False
-        
-        # Get the position details
-        position = mt5.positions_get(ticket=position_ticket)
-        if position is None or len(position) == 0:
-            logger.error(f"Failed to get position {position_ticket} for {forex_pair}")
-            return False
-        
-        # Get current position details
-        position = position[0]
-        
-        # Prepare modification request
-        request = {
-            "action": mt5.TRADE_ACTION_SLTP,
-            "symbol": forex_pair,
-            "position": position_ticket,
-            "magic": position.magic
-        }
-        
-        # Set stop loss if provided
-        if stop_loss is not None:
-            request["sl"] = stop_loss
-        
-        # Set take profit if provided
-        if take_profit is not None:
-            request["tp"] = take_profit
+            return results
+        
+        # Look up all positions for the pair once
+        positions = mt5.positions_get(symbol=forex_pair) or ()
+        magic_by_ticket = {position.ticket: position.magic for position in positions}
+        
+        # Prepare the modification requests
+        requests = []
+        for i, (ticket, stop_loss, take_profit) in enumerate(modifications):
+            if ticket not in magic_by_ticket:
+                logger.error(f"Failed to get position {ticket} for {forex_pair}")
+                continue
+            
+            request = {
+                "action": mt5.TRADE_ACTION_SLTP,
+                "symbol": forex_pair,
+                "position": ticket,
+                "magic": magic_by_ticket[ticket]
+            }
+            
+            # Set stop loss if provided
+            if stop_loss is not None:
+                request["sl"] = stop_loss
+            
+            # Set take profit if provided
+            if take_profit is not None:
+                request["tp"] = take_profit
+            
+            requests.append((i, request))
         
-        # Send the modification request
-        result = mt5.order_send(request)
-        if result.retcode != mt5.TRADE_RETCODE_DONE:
-            logger.error(f"Failed to modify position {position_ticket} for {forex_pair}: {result.comment}")
-            return False
+        # Send the modification requests
+        if len(requests) == 1:
+            sent = [mt5.order_send(requests[0][1])]
+        else:
+            sent = list(_ORDER_SEND_POOL.map(mt5.order_send, [request for _, request in requests]))
+        
+        for (i, _), result in zip(requests, sent):
+            ticket, stop_loss, take_profit = modifications[i]
+            if result is None or result.retcode != mt5.TRADE_RETCODE_DONE:
+                comment = result.comment if result is not None else mt5.last_error()
+                logger.error(f"Failed to modify position {ticket} for {forex_pair}: {comment}")
+                continue
+            
+            logger.info(f"Successfully modified position {ticket} for {forex_pair}: SL={stop_loss}, TP={take_profit}")
+            results[i] = True
         
-        logger.info(f"Successfully modified position {position_ticket} for {forex_pair}: SL={stop_loss}, TP={take_profit}")
-        return True
+        return results
         
     except Exception as e:
-        logger.error(f"Error modifying position for {forex_pair}: {e}")
-        logger.error(traceback.format_exc())
-        return False 
\ No newline at end of file
+        logger.exception("Error modifying positions for %s: %s", forex_pair, e)
+        return results
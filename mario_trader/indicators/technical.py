@@ -1,8 +1,18 @@
 """
 Technical indicators for trading analysis
 """
+import bisect
+from collections import deque
+
 import pandas as pd
 import numpy as np
+from mario_trader.config import INDICATOR_SETTINGS
+
+# Optional: bottleneck's moving max/min are faster than pandas rolling windows
+try:
+    import bottleneck as bn
+except ImportError:
+    bn = None
 
 
 def calculate_rsi(df, period=14):
@@ -16,14 +26,83 @@ def calculate_rsi(df, period=14):
     Returns:
         Series with RSI values
     """
-    delta = df['close'].diff()
-    gain = (delta.where(delta > 0, 0)).fillna(0)
-    loss = (-delta.where(delta < 0, 0)).fillna(0)
-    avg_gain = gain.rolling(window=period, min_periods=1).mean()
-    avg_loss = loss.rolling(window=period, min_periods=1).mean()
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+    return pd.Series(_rsi_array(df['close'].to_numpy(dtype=np.float64), period),
+                     index=df.index, name='RSI')
+
+
+def _prefix_sum(values):
+    """Cumulative sum along the last axis with a leading zero, so window sums are csum[j] - csum[i]"""
+    csum = np.zeros(values.shape[:-1] + (values.shape[-1] + 1,))
+    np.cumsum(values, axis=-1, out=csum[..., 1:])
+    return csum
+
+
+def _rolling_mean(close, window):
+    """Mean of each full `window` of closes (along the last axis) from a running (cumulative) sum"""
+    csum = _prefix_sum(close)
+    means = np.full(close.shape, np.nan)
+    if close.shape[-1] >= window:
+        means[..., window - 1:] = (csum[..., window:] - csum[..., :-window]) / window
+    return means
+
+
+def _crossed_200(close, sma_200):
+    """
+    Mark the candles that closed on the other side of the 200 SMA than the
+    candle before them (along the last axis, oldest first)
+    """
+    above = close > sma_200
+    below = close < sma_200
+    crossed = np.zeros(np.shape(close), dtype=bool)
+    crossed[..., 1:] = (below[..., :-1] & above[..., 1:]) | (above[..., :-1] & below[..., 1:])
+    return crossed
+
+
+def _rsi_array(close, period=14, method=None):
+    """
+    RSI of a close array, or of each row of a 2-D array of closes
+    
+    With the default "sma" method the gains/losses are simple averages of
+    the last `period` bars (partial windows at the start); with "wilder"
+    they are Wilder's smoothed averages (an EMA with alpha = 1/period).
+    """
+    method = method or INDICATOR_SETTINGS["rsi_method"]
+    n = close.shape[-1]
+    
+    # Bar-to-bar changes (the first bar has none) split into gains and losses
+    delta = np.zeros(close.shape)
+    np.subtract(close[..., 1:], close[..., :-1], out=delta[..., 1:])
+    gain = np.maximum(delta, 0.0)
+    loss = np.subtract(gain, delta, out=delta)  # max(-d, 0) == max(d, 0) - d, exactly
+    
+    if method == "wilder":
+        alpha = 1.0 / period
+        avg_gain = _ewm(gain, alpha)
+        avg_loss = _ewm(loss, alpha)
+    else:
+        # Sum of the last `period` values: the cumulative sum minus the
+        # cumulative sum `period` bars earlier (nothing to subtract at the start)
+        count = np.minimum(np.arange(1, n + 1), period)
+        gain_sum = _prefix_sum(gain)
+        loss_sum = _prefix_sum(loss)
+        avg_gain = gain_sum[..., 1:]
+        avg_loss = loss_sum[..., 1:]
+        if n > period:
+            avg_gain[..., period:] -= gain_sum[..., 1:n + 1 - period]
+            avg_loss[..., period:] -= loss_sum[..., 1:n + 1 - period]
+        avg_gain /= count
+        avg_loss /= count
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = avg_gain / avg_loss
+    return 100 - (100 / (1 + rs))
+
+
+def _ewm(values, alpha):
+    """Exponential moving average (adjust=False) along the last axis"""
+    rows = np.atleast_2d(values)
+    smoothed = pd.DataFrame(rows.T).ewm(alpha=alpha, adjust=False).mean().to_numpy().T
+    return smoothed.reshape(values.shape)
 
 
 def calculate_indicators(df):
@@ -36,17 +115,167 @@ def calculate_indicators(df):
     Returns:
         DataFrame with added indicators
     """
-    df['200_SMA'] = df['close'].rolling(window=200).mean()
-    df['21_SMA'] = df['close'].rolling(window=21).mean()
-    df['50_SMA'] = df['close'].rolling(window=50).mean()
-    df['RSI'] = calculate_rsi(df, 14)
+    calculate_indicators_batch([df])
     return df
 
 
+def calculate_indicators_batch(frames):
+    """
+    Calculate the indicators of several DataFrames (e.g. one per currency
+    pair) together
+    
+    Frames of the same length are stacked into one 2-D close array, so the
+    SMAs and RSI of all of them come from one set of NumPy calls instead of
+    one per frame. Columns are added to each frame in place, exactly as
+    calculate_indicators does. Besides the SMAs and RSI, '200_SMA_cross'
+    marks the candles that crossed the 200 SMA, so signal checks can read
+    recent crosses instead of rescanning the closes.
+    
+    Args:
+        frames: List of DataFrames with price data (None entries are skipped)
+        
+    Returns:
+        The same list of frames
+    """
+    dtype = _indicator_dtype()
+    by_length = {}
+    for df in frames:
+        if df is None:
+            continue
+        _cast_prices(df, dtype)
+        
+        # Callers further down the pipeline recompute on frames that already
+        # carry the columns; skip the work if the candles have not changed
+        if df.attrs.get('indicators_key') == _indicator_key(df) and '200_SMA' in df.columns:
+            continue
+        by_length.setdefault(len(df), []).append(df)
+    
+    for group in by_length.values():
+        # Work on raw close arrays: one cumulative sum per indicator instead
+        # of a chain of intermediate rolling Series
+        closes = np.stack([df['close'].to_numpy(dtype=np.float64) for df in group])
+        sma200 = _rolling_mean(closes, 200)
+        sma21 = _rolling_mean(closes, 21)
+        sma50 = _rolling_mean(closes, 50)
+        rsi = _rsi_array(closes, 14)
+        # 200 SMA crosses, compared at the stored precision (closes are
+        # already in `dtype`)
+        crossed = _crossed_200(closes, sma200.astype(dtype))
+        for row, df in enumerate(group):
+            df['200_SMA'] = sma200[row].astype(dtype)
+            df['21_SMA'] = sma21[row].astype(dtype)
+            df['50_SMA'] = sma50[row].astype(dtype)
+            df['RSI'] = rsi[row].astype(dtype)
+            df['200_SMA_cross'] = crossed[row]
+            df.attrs['indicators_key'] = _indicator_key(df)
+    return frames
+
+
+def reuse_indicators(df, previous):
+    """
+    Fill the indicator columns of `df` from `previous`, the same window of
+    candles with indicators calculated earlier in this bar or the last one
+    
+    While a bar is open only its close moves, and when a new bar opens the
+    window slides by one candle, so every indicator value is unchanged
+    except for the last one or two rows, which are recalculated from the
+    closes they cover.
+    
+    Args:
+        df: DataFrame with price data
+        previous: DataFrame from an earlier calculate_indicators call (or None)
+        
+    Returns:
+        True if the indicators were filled in, False if they need a full calculation
+    """
+    if (previous is None or df.empty or len(df) != len(previous)
+            or previous.attrs.get('indicators_key') != _indicator_key(previous)
+            or '200_SMA' not in previous.columns
+            or INDICATOR_SETTINGS["rsi_method"] == "wilder"):
+        return False
+    
+    # Bars the window moved by since `previous`: none (same bar) or one (new bar)
+    if previous.index[-1] == df.index[-1]:
+        shift = 0
+    elif len(df) > 1 and previous.index[-1] == df.index[-2]:
+        shift = 1
+    else:
+        return False
+    if previous.index[shift] != df.index[0]:
+        return False
+    
+    dtype = _indicator_dtype()
+    _cast_prices(df, dtype)
+    close = df['close'].to_numpy(dtype=np.float64)
+    
+    # Candles that were already closed must not have changed
+    keep = len(df) - 1 - shift
+    previous_close = previous['close'].to_numpy(dtype=np.float64)
+    if not np.array_equal(close[:keep], previous_close[shift:shift + keep]):
+        return False
+    
+    for period in (200, 21, 50):
+        column = f'{period}_SMA'
+        values = np.empty(len(df), dtype=dtype)
+        values[:keep] = previous[column].to_numpy()[shift:shift + keep]
+        for row in range(keep, len(df)):
+            values[row] = close[row + 1 - period:row + 1].mean() if row + 1 >= period else np.nan
+        if shift:
+            # The first full window now ends one row later
+            values[:period - 1] = np.nan
+        df[column] = values
+    rsi = np.empty(len(df), dtype=dtype)
+    rsi[:keep] = previous['RSI'].to_numpy()[shift:shift + keep]
+    for row in range(keep, len(df)):
+        # The last 14 changes (fewer at the start) end at this row
+        rsi[row] = _rsi_array(close[max(row - 14, 0):row + 1], 14)[-1]
+    if shift:
+        # The first 14 rows average fewer changes and depend on where the
+        # window starts
+        rsi[:14] = _rsi_array(close[:14], 14)
+    df['RSI'] = rsi
+    df['200_SMA_cross'] = _crossed_200(close, df['200_SMA'].to_numpy())
+    df.attrs['indicators_key'] = _indicator_key(df)
+    return True
+
+
+def _indicator_dtype():
+    """Float type of the price and indicator columns"""
+    return np.float32 if INDICATOR_SETTINGS["float32"] else np.float64
+
+
+def _cast_prices(df, dtype):
+    """Store the OHLC columns as `dtype` (no-op for float64)"""
+    if dtype is np.float32:
+        # Prices and indicators in 32-bit floats (about 7 significant digits)
+        for column in ('open', 'high', 'low', 'close'):
+            if df[column].dtype != dtype:
+                df[column] = df[column].astype(dtype)
+
+
+def _indicator_key(df):
+    """Identify the candles indicators were computed from (length, last bar, last close)"""
+    if df.empty:
+        return None
+    return (len(df), df.index[-1], float(df['close'].iat[-1]),
+            INDICATOR_SETTINGS["float32"], INDICATOR_SETTINGS["rsi_method"])
+
+
+def _rsi_from_averages(avg_gain, avg_loss):
+    """RSI value from average gain and loss (NaN when both are zero)"""
+    if avg_loss == 0:
+        return np.nan if avg_gain == 0 else 100.0
+    return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
 def detect_rsi_divergence(df, period=14):
     """
     Detect RSI divergence
     
+    Only closed bars are compared (the forming bar is ignored), so the
+    result only changes when a new bar opens and callers polling within a
+    bar can compute it once per bar.
+    
     Args:
         df: DataFrame with price data
         period: Period for divergence detection
@@ -54,20 +283,287 @@ def detect_rsi_divergence(df, period=14):
     Returns:
         1 for bullish divergence, -1 for bearish divergence, 0 for no divergence
     """
-    df = calculate_indicators(df)
-    rsi = df['RSI']
+    close = df['close'].to_numpy(dtype=np.float64)
+    if 'RSI' in df.columns and df.attrs.get('indicators_key') == _indicator_key(df):
+        rsi = df['RSI'].to_numpy()
+    elif INDICATOR_SETTINGS["rsi_method"] == "wilder":
+        # Smoothed averages depend on the whole history
+        rsi = _rsi_array(close, 14)
+    else:
+        # Only the last `period` RSI values are compared, and each of those
+        # needs the 14 closes before it
+        close = close[-(period + 14):]
+        rsi = _rsi_array(close, 14)
 
-    if (df['close'].iloc[-2] > df['close'].iloc[-period] and
-            rsi.iloc[-3] < rsi.iloc[-period]):
+    if close[-2] > close[-period] and rsi[-3] < rsi[-period]:
         return 1
 
-    if (df['close'].iloc[-2] < df['close'].iloc[-period] and
-            rsi.iloc[-3] > rsi.iloc[-period]):
+    if close[-2] < close[-period] and rsi[-3] > rsi[-period]:
         return -1
 
     return 0
 
 
+class RSIState:
+    """
+    Wilder-smoothed RSI updated one close at a time
+    
+    Holds the smoothed average gain and loss, so each new close costs a
+    couple of multiplications; matches _rsi_array(..., method="wilder") over
+    the same closes.
+    """
+
+    __slots__ = ('period', 'avg_gain', 'avg_loss', 'last_close', 'n', '_previous')
+
+    def __init__(self, period=14):
+        self.period = period
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.last_close = None
+        self.n = 0
+        self._previous = None
+
+    def update(self, close):
+        """
+        Add the close of a new bar
+        
+        Args:
+            close: Bar close
+            
+        Returns:
+            RSI after the update
+        """
+        delta = 0.0 if self.last_close is None else close - self.last_close
+        self._previous = (self.avg_gain, self.avg_loss, self.last_close)
+        alpha = 1.0 / self.period
+        self.avg_gain += alpha * (max(delta, 0.0) - self.avg_gain)
+        self.avg_loss += alpha * (max(-delta, 0.0) - self.avg_loss)
+        self.last_close = close
+        self.n += 1
+        return self.value
+
+    def replace_last(self, close):
+        """
+        Replace the close of the latest bar (e.g. a new tick in the forming bar)
+        
+        Args:
+            close: New close of the latest bar
+            
+        Returns:
+            RSI after the update
+        """
+        self.avg_gain, self.avg_loss, self.last_close = self._previous
+        self.n -= 1
+        return self.update(close)
+
+    @property
+    def value(self):
+        """Current RSI value"""
+        return _rsi_from_averages(self.avg_gain, self.avg_loss)
+
+
+class IndicatorState:
+    """
+    Incrementally updated SMAs, RSI and RSI divergence for one price series
+    
+    Gives the same values as calculate_indicators/detect_rsi_divergence on
+    the full history, but each update costs O(1) instead of recomputing the
+    rolling windows over every candle. Feed it bar closes with update():
+    a close for the current bar replaces the previous one, a close for a
+    newer bar appends.
+    """
+
+    def __init__(self, rsi_period=14, sma_periods=(21, 50, 200), divergence_period=14,
+                 rsi_method=None):
+        self.rsi_period = rsi_period
+        self.rsi_method = rsi_method or INDICATOR_SETTINGS["rsi_method"]
+        self._wilder = RSIState(rsi_period) if self.rsi_method == "wilder" else None
+        self.sma_periods = tuple(sma_periods)
+        self.divergence_period = divergence_period
+        self.bar_time = None
+        self.closes = deque(maxlen=max(max(self.sma_periods), divergence_period))
+        self.gains = deque(maxlen=rsi_period)
+        self.losses = deque(maxlen=rsi_period)
+        self.rsi_values = deque(maxlen=divergence_period)
+        self._sums = dict.fromkeys(self.sma_periods, 0.0)
+
+    @classmethod
+    def from_frame(cls, df, **kwargs):
+        """
+        Build the state from a DataFrame of candles indexed by bar time
+        
+        Args:
+            df: DataFrame with a 'close' column
+            **kwargs: Periods passed to IndicatorState()
+            
+        Returns:
+            IndicatorState seeded with every candle in df
+        """
+        state = cls(**kwargs)
+        for bar_time, close in zip(df.index, df['close'].to_numpy(dtype=float)):
+            state.update(bar_time, close)
+        return state
+
+    def update(self, bar_time, close):
+        """
+        Add the close of a bar, replacing the last close if the bar is the same
+        
+        Args:
+            bar_time: Open time of the bar
+            close: Close (latest price) of the bar
+        """
+        close = float(close)
+        if self.closes and bar_time == self.bar_time:
+            self._replace_last(close)
+        else:
+            self._append(close)
+        self.bar_time = bar_time
+
+    def update_from_frame(self, df):
+        """
+        Apply the latest candles (e.g. the last two bars) to the state
+        
+        Args:
+            df: DataFrame with a 'close' column indexed by bar time
+            
+        Returns:
+            True if the candles continue the state, False if bars were
+            missed and the state has to be rebuilt with from_frame
+        """
+        if self.bar_time is None or df.index[0] > self.bar_time:
+            return False
+        for bar_time, close in zip(df.index, df['close'].to_numpy(dtype=float)):
+            if bar_time >= self.bar_time:
+                self.update(bar_time, close)
+        return True
+
+    def _append(self, close):
+        if self._wilder is None:
+            delta = close - self.closes[-1] if self.closes else 0.0
+            self.gains.append(max(delta, 0.0))
+            self.losses.append(max(-delta, 0.0))
+        
+        # Slide each SMA window: drop the close that leaves it, add the new one
+        for period in self.sma_periods:
+            if len(self.closes) >= period:
+                self._sums[period] -= self.closes[-period]
+            self._sums[period] += close
+        
+        self.closes.append(close)
+        self.rsi_values.append(self._calculate_rsi())
+
+    def _replace_last(self, close):
+        delta = close - self.closes[-1]
+        for period in self.sma_periods:
+            self._sums[period] += delta
+        self.closes[-1] = close
+        
+        if self._wilder is not None:
+            self.rsi_values[-1] = self._wilder.replace_last(close)
+            return
+        change = close - self.closes[-2] if len(self.closes) > 1 else 0.0
+        self.gains[-1] = max(change, 0.0)
+        self.losses[-1] = max(-change, 0.0)
+        self.rsi_values[-1] = self._calculate_rsi()
+
+    def _calculate_rsi(self):
+        if self._wilder is not None:
+            return self._wilder.update(self.closes[-1])
+        # Same definition as calculate_rsi: simple mean of gains/losses
+        return _rsi_from_averages(sum(self.gains) / len(self.gains),
+                                  sum(self.losses) / len(self.losses))
+
+    @property
+    def rsi(self):
+        """Latest RSI value"""
+        return self.rsi_values[-1]
+
+    def sma(self, period):
+        """
+        Latest simple moving average
+        
+        Args:
+            period: One of the configured SMA periods
+            
+        Returns:
+            SMA value, or NaN if there are fewer than `period` closes
+        """
+        if len(self.closes) < period:
+            return np.nan
+        return self._sums[period] / period
+
+    def rsi_divergence(self):
+        """
+        Detect RSI divergence, as detect_rsi_divergence does on a DataFrame
+        
+        Returns:
+            1 for bullish divergence, -1 for bearish divergence, 0 for no divergence
+        """
+        period = self.divergence_period
+        if len(self.rsi_values) < period:
+            return 0
+        
+        closes, rsi = self.closes, self.rsi_values
+        if closes[-2] > closes[-period] and rsi[-3] < rsi[-period]:
+            return 1
+        if closes[-2] < closes[-period] and rsi[-3] > rsi[-period]:
+            return -1
+        return 0
+
+
+def _local_extrema(high, low, window):
+    """
+    Find the local maxima of `high` and minima of `low`
+    
+    A bar is an extremum when it equals the max/min of the 2*window+1 bars
+    centred on it, so the first and last `window` bars are never extrema.
+    
+    Args:
+        high: Array of high prices
+        low: Array of low prices
+        window: Window size on each side of the bar
+        
+    Returns:
+        Tuple of (resistance prices, support prices) in bar order
+    """
+    # Centred rolling max/min (O(N)); the edge windows are NaN
+    span = 2 * window + 1
+    if bn is not None and len(high) >= span:
+        rolling_max = _centre(bn.move_max(high, span, min_count=span), window)
+        rolling_min = _centre(bn.move_min(low, span, min_count=span), window)
+    else:
+        rolling_max = pd.Series(high).rolling(span, center=True, min_periods=span).max().to_numpy()
+        rolling_min = pd.Series(low).rolling(span, center=True, min_periods=span).min().to_numpy()
+    return high[high == rolling_max], low[low == rolling_min]
+
+
+def _centre(trailing, window):
+    """Shift a trailing moving-window result so each value sits on the window's centre bar"""
+    centred = np.full(len(trailing), np.nan)
+    centred[:len(trailing) - window] = trailing[window:]
+    return centred
+
+
+def _group_levels(prices, tolerance):
+    """
+    Merge sorted prices that lie within `tolerance` of their neighbour
+    
+    Args:
+        prices: Array of prices
+        tolerance: Maximum gap between neighbouring prices in one group
+        
+    Returns:
+        Array with the average price of each group, sorted ascending
+    """
+    if len(prices) == 0:
+        return np.empty(0)
+    
+    # A gap larger than the tolerance starts a new group
+    prices = np.sort(prices)
+    group_ids = np.concatenate(([0], np.cumsum(np.diff(prices) > tolerance)))
+    return np.bincount(group_ids, weights=prices) / np.bincount(group_ids)
+
+
 def detect_support_resistance(df, window=20, tolerance=0.0002):
     """
     Detect support and resistance levels from price data
@@ -78,72 +574,18 @@ def detect_support_resistance(df, window=20, tolerance=0.0002):
         tolerance: Tolerance for grouping similar levels
         
     Returns:
-        Dictionary with support and resistance levels
+        Dictionary with support and resistance levels as NumPy arrays
+        sorted from highest to lowest
     """
-    # Make a copy to avoid modifying the original
-    df_copy = df.copy()
-    
-    # Get the highs and lows
-    highs = df_copy['high'].values
-    lows = df_copy['low'].values
+    high = df['high'].to_numpy(dtype=float)
+    low = df['low'].to_numpy(dtype=float)
     
     # Detect local maxima and minima
-    resistance_points = []
-    support_points = []
-    
-    # Loop through the data
-    for i in range(window, len(df_copy) - window):
-        # Check if this point is a local maximum
-        if highs[i] == max(highs[i-window:i+window+1]):
-            resistance_points.append((i, highs[i]))
-            
-        # Check if this point is a local minimum
-        if lows[i] == min(lows[i-window:i+window+1]):
-            support_points.append((i, lows[i]))
-    
-    # Group similar levels
-    def group_levels(levels, tolerance):
-        if not levels:
-            return []
-        
-        # Sort levels by price
-        sorted_levels = sorted(levels, key=lambda x: x[1])
-        
-        # Group nearby levels
-        grouped = []
-        current_group = [sorted_levels[0]]
-        
-        for i in range(1, len(sorted_levels)):
-            current_level = sorted_levels[i]
-            prev_level = current_group[-1]
-            
-            # If levels are close, add to current group
-            if abs(current_level[1] - prev_level[1]) <= tolerance:
-                current_group.append(current_level)
-            else:
-                # Calculate average price of current group
-                avg_price = sum(level[1] for level in current_group) / len(current_group)
-                avg_index = sum(level[0] for level in current_group) // len(current_group)
-                grouped.append((avg_index, avg_price))
-                
-                # Start a new group
-                current_group = [current_level]
-        
-        # Add the last group
-        if current_group:
-            avg_price = sum(level[1] for level in current_group) / len(current_group)
-            avg_index = sum(level[0] for level in current_group) // len(current_group)
-            grouped.append((avg_index, avg_price))
-            
-        return grouped
+    resistance_points, support_points = _local_extrema(high, low, window)
     
-    # Group and sort the levels
-    resistance_levels = [price for _, price in group_levels(resistance_points, tolerance)]
-    support_levels = [price for _, price in group_levels(support_points, tolerance)]
-    
-    # Sort from highest to lowest
-    resistance_levels = sorted(resistance_levels, reverse=True)
-    support_levels = sorted(support_levels, reverse=True)
+    # Group similar levels and sort from highest to lowest
+    resistance_levels = _group_levels(resistance_points, tolerance)[::-1]
+    support_levels = _group_levels(support_points, tolerance)[::-1]
     
     return {
         'resistance': resistance_levels,
@@ -157,7 +599,8 @@ def find_nearest_level(price, levels, direction="BUY"):
     
     Args:
         price: Current price
-        levels: Dictionary with support and resistance levels
+        levels: Dictionary with support and resistance levels sorted from
+            highest to lowest, as returned by detect_support_resistance
         direction: "BUY" or "SELL"
         
     Returns:
@@ -166,15 +609,249 @@ def find_nearest_level(price, levels, direction="BUY"):
     if not levels:
         return None
     
+    # Binary search on the ascending view of the levels
     if direction == "BUY":
         # For BUY, find nearest support level below current price
-        support_levels = [level for level in levels['support'] if level < price]
-        if support_levels:
-            return max(support_levels)  # Highest support below price
+        support_levels = np.asarray(levels['support'], dtype=float)[::-1]
+        i = np.searchsorted(support_levels, price, side='left')
+        if i > 0:
+            return float(support_levels[i - 1])  # Highest support below price
     else:  # SELL
         # For SELL, find nearest resistance level above current price
-        resistance_levels = [level for level in levels['resistance'] if level > price]
-        if resistance_levels:
-            return min(resistance_levels)  # Lowest resistance above price
+        resistance_levels = np.asarray(levels['resistance'], dtype=float)[::-1]
+        i = np.searchsorted(resistance_levels, price, side='right')
+        if i < len(resistance_levels):
+            return float(resistance_levels[i])  # Lowest resistance above price
     
-    return None 
\ No newline at end of file
+    return None 
+
+
+def find_support_levels(df, window=20, tolerance=0.0002):
+    """
+    Find the support levels for a price series
+    
+    Args:
+        df: DataFrame with price data
+        window: Window size for detecting local extrema
+        tolerance: Tolerance for grouping similar levels
+        
+    Returns:
+        NumPy array of support levels sorted ascending
+    """
+    high = df['high'].to_numpy(dtype=float)
+    low = df['low'].to_numpy(dtype=float)
+    _, support_points = _local_extrema(high, low, window)
+    return _group_levels(support_points, tolerance)
+
+
+def find_resistance_levels(df, window=20, tolerance=0.0002):
+    """
+    Find the resistance levels for a price series
+    
+    Args:
+        df: DataFrame with price data
+        window: Window size for detecting local extrema
+        tolerance: Tolerance for grouping similar levels
+        
+    Returns:
+        NumPy array of resistance levels sorted ascending
+    """
+    high = df['high'].to_numpy(dtype=float)
+    low = df['low'].to_numpy(dtype=float)
+    resistance_points, _ = _local_extrema(high, low, window)
+    return _group_levels(resistance_points, tolerance)
+
+
+class SRState:
+    """
+    Support and resistance levels maintained bar by bar
+    
+    Gives the same levels as detect_support_resistance on the last
+    `max_bars` bars, but each new bar costs O(1) amortized: monotonic
+    deques track the max/min of the 2*window+1 bars ending at the new bar,
+    which confirms (or not) the bar `window` places back as an extremum.
+    Levels are only regrouped when an extremum is added or drops out.
+    A high/low for the current bar replaces the previous one, a newer bar
+    appends, as with IndicatorState.
+    """
+
+    def __init__(self, window=20, tolerance=0.0002, max_bars=None):
+        self.window = window
+        self.tolerance = tolerance
+        self.max_bars = max_bars
+        self.span = 2 * window + 1
+        self.bar_time = None
+        self.count = 0
+        self._highs = deque(maxlen=self.span)
+        self._lows = deque(maxlen=self.span)
+        self._max = deque()  # (bar index, high), highs decreasing
+        self._min = deque()  # (bar index, low), lows increasing
+        self._resistance_points = deque()  # (bar index, price) in bar order
+        self._support_points = deque()
+        self._resistance_sorted = []
+        self._support_sorted = []
+        self._levels = None
+
+    @classmethod
+    def from_frame(cls, df, window=20, tolerance=0.0002, max_bars=None):
+        """
+        Build the state from a DataFrame of candles indexed by bar time
+        
+        Args:
+            df: DataFrame with 'high' and 'low' columns
+            window: Window size for detecting local extrema
+            tolerance: Tolerance for grouping similar levels
+            max_bars: Number of most recent bars the levels are taken from
+                (defaults to the length of df)
+            
+        Returns:
+            SRState seeded with every candle in df
+        """
+        state = cls(window, tolerance, max_bars or len(df))
+        highs = df['high'].to_numpy(dtype=float)
+        lows = df['low'].to_numpy(dtype=float)
+        for bar_time, high, low in zip(df.index, highs, lows):
+            state.update(bar_time, high, low)
+        return state
+
+    def update(self, bar_time, high, low):
+        """
+        Add the high/low of a bar, replacing the last bar if it is the same
+        
+        Args:
+            bar_time: Open time of the bar
+            high: High of the bar
+            low: Low of the bar
+        """
+        high, low = float(high), float(low)
+        if self.count and bar_time == self.bar_time:
+            if high != self._highs[-1] or low != self._lows[-1]:
+                self._replace_last(high, low)
+        else:
+            self._append(high, low)
+        self.bar_time = bar_time
+
+    def update_from_frame(self, df):
+        """
+        Apply the latest candles (e.g. the last two bars) to the state
+        
+        Args:
+            df: DataFrame with 'high' and 'low' columns indexed by bar time
+            
+        Returns:
+            True if the candles continue the state, False if bars were
+            missed and the state has to be rebuilt with from_frame
+        """
+        if self.bar_time is None or df.index[0] > self.bar_time:
+            return False
+        highs = df['high'].to_numpy(dtype=float)
+        lows = df['low'].to_numpy(dtype=float)
+        for bar_time, high, low in zip(df.index, highs, lows):
+            if bar_time >= self.bar_time:
+                self.update(bar_time, high, low)
+        return True
+
+    def _append(self, high, low):
+        i = self.count
+        self.count += 1
+        self._highs.append(high)
+        self._lows.append(low)
+        self._push(i, high, low)
+        self._confirm(i)
+        
+        # Drop extrema that fall out of the last max_bars bars (a bar also
+        # needs `window` bars before it inside them to qualify)
+        if self.max_bars:
+            oldest = i - self.max_bars + 1 + self.window
+            self._expire(self._resistance_points, self._resistance_sorted, oldest)
+            self._expire(self._support_points, self._support_sorted, oldest)
+
+    def _replace_last(self, high, low):
+        i = self.count - 1
+        self._unconfirm(i)
+        self._highs[-1] = high
+        self._lows[-1] = low
+        
+        # Values popped by the old high/low are gone; rebuild the deques
+        # from the bars in the window
+        self._max.clear()
+        self._min.clear()
+        first = i - len(self._highs) + 1
+        for offset, (bar_high, bar_low) in enumerate(zip(self._highs, self._lows)):
+            self._push(first + offset, bar_high, bar_low)
+        self._confirm(i)
+
+    def _push(self, i, high, low):
+        while self._max and self._max[-1][1] <= high:
+            self._max.pop()
+        self._max.append((i, high))
+        if self._max[0][0] <= i - self.span:
+            self._max.popleft()
+        
+        while self._min and self._min[-1][1] >= low:
+            self._min.pop()
+        self._min.append((i, low))
+        if self._min[0][0] <= i - self.span:
+            self._min.popleft()
+
+    def _confirm(self, i):
+        # The bar at the centre of the last full window is an extremum when
+        # it equals the window's max/min
+        if len(self._highs) < self.span:
+            return
+        centre = i - self.window
+        high = self._highs[self.window]
+        low = self._lows[self.window]
+        if high == self._max[0][1]:
+            self._resistance_points.append((centre, high))
+            bisect.insort(self._resistance_sorted, high)
+            self._levels = None
+        if low == self._min[0][1]:
+            self._support_points.append((centre, low))
+            bisect.insort(self._support_sorted, low)
+            self._levels = None
+
+    def _unconfirm(self, i):
+        centre = i - self.window
+        for points, prices in ((self._resistance_points, self._resistance_sorted),
+                               (self._support_points, self._support_sorted)):
+            if points and points[-1][0] == centre:
+                _, price = points.pop()
+                del prices[bisect.bisect_left(prices, price)]
+                self._levels = None
+
+    def _expire(self, points, prices, oldest):
+        while points and points[0][0] < oldest:
+            _, price = points.popleft()
+            del prices[bisect.bisect_left(prices, price)]
+            self._levels = None
+
+    def _grouped(self):
+        if self._levels is None:
+            self._levels = (_group_levels(np.array(self._support_sorted), self.tolerance),
+                            _group_levels(np.array(self._resistance_sorted), self.tolerance))
+        return self._levels
+
+    @property
+    def support(self):
+        """Support levels as a NumPy array sorted ascending"""
+        return self._grouped()[0]
+
+    @property
+    def resistance(self):
+        """Resistance levels as a NumPy array sorted ascending"""
+        return self._grouped()[1]
+
+    def levels(self):
+        """
+        Support and resistance levels in the format of detect_support_resistance
+        
+        Returns:
+            Dictionary with support and resistance levels as NumPy arrays
+            sorted from highest to lowest
+        """
+        support, resistance = self._grouped()
+        return {
+            'resistance': resistance[::-1],
+            'support': support[::-1]
+        }
@@ -1,15 +1,24 @@
 """
 Trade monitoring and management
 """
-import math
+import operator
+import queue
+import threading
 import time
+import numpy as np
+import pandas as pd
 import MetaTrader5 as mt5
-from mario_trader.utils.mt5_handler import get_current_price, fetch_data, close_trade, get_balance, open_trade
-from mario_trader.indicators.technical import detect_rsi_divergence, calculate_indicators
-from mario_trader.config import CONTINGENCY_TRADE_SETTINGS
+from mario_trader.utils.mt5_handler import ensure_symbol, fetch_data, close_trades, get_balance, open_trade
+from mario_trader.indicators.technical import IndicatorState
+from mario_trader.config import CONTINGENCY_TRADE_SETTINGS, TRADING_SETTINGS
 from mario_trader.utils.logger import logger, log_trade, log_error
 
 
+# Price comparison that means a level was reached, per trade type
+_TAKE_PROFIT_REACHED = {'buy': operator.lt, 'sell': operator.gt}
+_STOP_LOSS_REACHED = {'buy': operator.gt, 'sell': operator.lt}
+
+
 def check_take_profit(current_price, take_profit, trade_type):
     """
     Check if take profit level is reached
@@ -22,15 +31,10 @@ def check_take_profit(current_price, take_profit, trade_type):
     Returns:
         True if take profit is reached, False otherwise
     """
-    if trade_type == 'buy':
-        if current_price < take_profit:
-            logger.debug(f"Take profit reached: {current_price} < {take_profit}")
-            return True
-    elif trade_type == 'sell':
-        if current_price > take_profit:
-            logger.debug(f"Take profit reached: {current_price} > {take_profit}")
-            return True
-
+    reached = _TAKE_PROFIT_REACHED.get(trade_type)
+    if reached is not None and reached(current_price, take_profit):
+        logger.debug("Take profit reached (%s): %s vs %s", trade_type, current_price, take_profit)
+        return True
     return False
 
 
@@ -46,17 +50,245 @@ def check_stop_loss(current_price, stop_loss, trade_type):
     Returns:
         True if stop loss is reached, False otherwise
     """
-    if trade_type == 'buy':
-        if current_price > stop_loss:
-            logger.debug(f"Stop loss reached: {current_price} > {stop_loss}")
-            return True
+    reached = _STOP_LOSS_REACHED.get(trade_type)
+    if reached is not None and reached(current_price, stop_loss):
+        logger.debug("Stop loss reached (%s): %s vs %s", trade_type, current_price, stop_loss)
+        return True
+    return False
 
-    elif trade_type == 'sell':
-        if current_price < stop_loss:
-            logger.debug(f"Stop loss reached: {current_price} < {stop_loss}")
-            return True
 
-    return False
+# Most contingency trades monitor_trade will open for one position
+MAX_CONTINGENCY_TRADES = 10
+
+
+class _TickFeed:
+    """
+    Latest ticks of every symbol being monitored, fanned out to queues
+    
+    The MT5 Python API has no tick callbacks, so one background thread polls
+    the latest tick of each subscribed symbol and hands every subscriber only
+    the ticks that actually changed. Any number of monitored trades share
+    that one thread and one symbol_info_tick call per symbol.
+    """
+
+    def __init__(self, interval=None):
+        """
+        Args:
+            interval: Seconds between tick checks (defaults to TRADING_SETTINGS["tick_poll_interval"])
+        """
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._last_tick_ms = {}
+        self._thread = None
+
+    def subscribe(self, symbol):
+        """
+        Start receiving the ticks of a symbol
+        
+        Args:
+            symbol: Currency pair symbol
+            
+        Returns:
+            Queue receiving the new ticks
+        """
+        tick_queue = queue.Queue()
+        with self._lock:
+            self._subscribers.setdefault(symbol, []).append(tick_queue)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="monitor-ticks", daemon=True)
+                self._thread.start()
+        return tick_queue
+
+    def unsubscribe(self, symbol, tick_queue):
+        """Stop filling a queue returned by subscribe"""
+        with self._lock:
+            queues = self._subscribers.get(symbol, [])
+            if tick_queue in queues:
+                queues.remove(tick_queue)
+            if not queues:
+                self._subscribers.pop(symbol, None)
+                self._last_tick_ms.pop(symbol, None)
+
+    def _run(self):
+        interval = self.interval or TRADING_SETTINGS["tick_poll_interval"]
+        while True:
+            with self._lock:
+                if not self._subscribers:
+                    # Nothing left to watch; the next subscribe starts a new thread
+                    self._thread = None
+                    return
+                subscribers = [(symbol, list(queues)) for symbol, queues in self._subscribers.items()]
+            
+            for symbol, queues in subscribers:
+                try:
+                    tick = mt5.symbol_info_tick(symbol)
+                    if tick is not None and tick.time_msc != self._last_tick_ms.get(symbol):
+                        self._last_tick_ms[symbol] = tick.time_msc
+                        for tick_queue in queues:
+                            tick_queue.put(tick)
+                except Exception as e:
+                    logger.exception("Error watching ticks for %s: %s", symbol, e)
+            time.sleep(interval)
+
+
+_tick_feed = _TickFeed()
+
+
+def _next_tick(tick_queue, timeout=1):
+    """
+    Wait for the next tick, skipping any that queued up in the meantime
+    
+    Args:
+        tick_queue: Queue returned by _TickFeed.subscribe
+        timeout: Seconds to wait for a tick
+        
+    Returns:
+        The latest tick, or None if the price did not move within `timeout`
+    """
+    try:
+        tick = tick_queue.get(timeout=timeout)
+    except queue.Empty:
+        return None
+    while True:
+        try:
+            tick = tick_queue.get_nowait()
+        except queue.Empty:
+            return tick
+
+
+def _refresh_state(forex_pair, state, tick, bar_period):
+    """
+    Bring the indicator state of a monitored trade up to date with a tick
+    
+    Within a bar the tick's bid becomes the close of the current bar. When a
+    new bar opens, the last two candles (the one that just closed and the
+    new one) are fetched, rebuilding from the full history if bars were missed.
+    
+    Args:
+        forex_pair: Currency pair symbol
+        state: IndicatorState of the pair
+        tick: Latest tick
+        bar_period: Timedelta between bars
+        
+    Returns:
+        Tuple of (state, new_bar): the up-to-date state (a new object if it
+        had to be rebuilt) and whether a new bar opened
+    """
+    if pd.Timestamp(tick.time, unit='s') >= state.bar_time + bar_period:
+        recent = fetch_data(forex_pair, count=2)
+        if recent is not None and not state.update_from_frame(recent):
+            state = IndicatorState.from_frame(fetch_data(forex_pair))
+        return state, True
+    
+    # Candle closes are bid prices
+    state.update(state.bar_time, tick.bid)
+    return state, False
+
+
+# Account balance shared by every monitored trade: (value, time.monotonic() of the read)
+_balance_cache = {"value": None, "read_at": 0.0}
+_balance_lock = threading.Lock()
+
+
+def _shared_balance(max_age, fallback):
+    """
+    Account balance, read from MT5 at most once every `max_age` seconds no
+    matter how many trades are being monitored
+    
+    The balance only moves when deals close, so a few seconds of staleness
+    does not matter for the drawdown check.
+    
+    Args:
+        max_age: Seconds a balance read stays valid
+        fallback: Balance to use if MT5 has not returned one yet
+        
+    Returns:
+        Account balance
+    """
+    with _balance_lock:
+        now = time.monotonic()
+        if _balance_cache["value"] is None or now - _balance_cache["read_at"] >= max_age:
+            balance = get_balance()
+            # get_balance returns 0 when MT5 fails; keep the last good value
+            # rather than mistaking a failed read for a wiped account
+            if balance:
+                _balance_cache["value"] = balance
+            _balance_cache["read_at"] = now
+        return _balance_cache["value"] if _balance_cache["value"] is not None else fallback
+
+
+# Longest pause (seconds) after repeated errors in the monitoring loops
+MAX_ERROR_BACKOFF = 30
+
+
+def _error_backoff(error_streak):
+    """
+    Seconds to wait after the `error_streak`-th consecutive error: short for a
+    one-off failure, doubling while MT5 keeps failing, capped at MAX_ERROR_BACKOFF
+    """
+    return min(MAX_ERROR_BACKOFF, 0.5 * 2 ** error_streak)
+
+
+class _ContingencyTrades:
+    """
+    Contingency trades of one monitored position as parallel arrays
+    
+    Tickets, sides (+1 buy, -1 sell), volumes and entry prices live in
+    fixed-size numpy arrays indexed by the order the trades were opened, so
+    the monitoring loops can test every trade for activation with one
+    vectorized compare.
+    """
+
+    def __init__(self, capacity=MAX_CONTINGENCY_TRADES):
+        self.count = 0
+        self.ticket_ids = np.zeros(capacity, dtype=np.int64)
+        self.sides = np.zeros(capacity, dtype=np.int8)
+        self.volumes = np.zeros(capacity, dtype=np.float64)
+        self.entry_prices = np.zeros(capacity, dtype=np.float64)
+
+    def __len__(self):
+        return self.count
+
+    def add(self, ticket_id, trade_type, volume, entry_price):
+        """
+        Record a contingency trade
+        
+        Returns:
+            False if the ladder is already full, True otherwise
+        """
+        if self.count >= len(self.ticket_ids):
+            return False
+        i = self.count
+        self.ticket_ids[i] = ticket_id
+        self.sides[i] = 1 if trade_type == "buy" else -1
+        self.volumes[i] = volume
+        self.entry_prices[i] = entry_price
+        self.count += 1
+        return True
+
+    def activated(self, current_price):
+        """
+        Indexes of trades whose entry price has been reached
+        
+        Returns:
+            Array of indexes into the trade arrays
+        """
+        n = self.count
+        # Buys activate at or above their entry, sells at or below: the
+        # signed distance past the entry is non-negative for both
+        return np.flatnonzero(self.sides[:n] * (current_price - self.entry_prices[:n]) >= 0)
+
+    def close_all(self, *position_ids):
+        """
+        Close every recorded contingency trade, together with any other
+        positions given, in one concurrent batch
+        
+        Args:
+            *position_ids: Additional positions to close (e.g. the monitored trade)
+        """
+        tickets = self.ticket_ids[:self.count]
+        close_trades(list(position_ids) + tickets[tickets != 0].tolist())
 
 
 def monitor_trade(order_id, position, volume, order_type, stop_loss, current_market_price, forex_pair):
@@ -72,8 +304,14 @@ def monitor_trade(order_id, position, volume, order_type, stop_loss, current_mar
         current_market_price: Current market price
         forex_pair: Currency pair symbol
     """
+    # Price checks wake up on new ticks instead of polling once a second
+    tick_queue = _tick_feed.subscribe(forex_pair)
+    
     try:
-        logger.info(f"Monitoring trade {order_id} for {forex_pair}")
+        logger.info("Monitoring trade %s for %s", order_id, forex_pair)
+        
+        # Select the symbol once up front; ticks, candles and orders reuse it
+        ensure_symbol(forex_pair)
         
         # Get initial account balance
         initial_balance = get_balance()
@@ -81,78 +319,87 @@ def monitor_trade(order_id, position, volume, order_type, stop_loss, current_mar
         
         # Calculate the distance from entry point to 21 SMA
         df = fetch_data(forex_pair)
-        df = calculate_indicators(df)
-        latest = df.iloc[-1]
-        distance_to_21_sma = abs(entry_price - latest['21_SMA'])
+        state = IndicatorState.from_frame(df)
+        distance_to_21_sma = abs(entry_price - state.sma(21))
+        bar_period = df.index.to_series().diff().min()
+        divergence_signal = state.rsi_divergence()
+        divergence_reported = False
         
-        # Initialize contingency trades dictionary
-        contingency_trades = []
+        # Initialize contingency trade arrays
+        contingency_trades = _ContingencyTrades()
         contingency_status = False
-        num_contingency_trades = 0
+        
+        # Everything the loop compares against is fixed for the life of the
+        # trade, so pick the comparison direction for the order type once
+        is_buy = order_type == "buy"
+        balance_floor = initial_balance * 0.8
+        profit_distance = 2 * distance_to_21_sma
+        profit_target = entry_price + profit_distance if is_buy else entry_price - profit_distance
+        target_reached = operator.ge if is_buy else operator.le
+        beyond_entry = operator.gt if is_buy else operator.lt
+        stop_hit = _STOP_LOSS_REACHED['buy' if is_buy else 'sell']
+        
+        # Price comes from the tick and indicators only change per bar; the
+        # balance is the one remaining round trip, refreshed every few
+        # seconds for all monitored trades together
+        balance_interval = TRADING_SETTINGS["balance_poll_interval"]
         
         # Main monitoring loop
+        error_streak = 0
         while True:
             try:
-                current_price = get_current_price(forex_pair)
-                df = fetch_data(forex_pair)
-                df = calculate_indicators(df)
-                latest = df.iloc[-1]
+                tick = _next_tick(tick_queue)
+                if tick is None:
+                    # Price unchanged, nothing to re-check
+                    continue
+                current_price = (tick.bid + tick.ask) / 2
+                
+                state, new_bar = _refresh_state(forex_pair, state, tick, bar_period)
+                if new_bar:
+                    # Divergence only looks at closed bars, so it only changes here
+                    divergence_signal = state.rsi_divergence()
+                    divergence_reported = False
                 
                 # Check if account is down 20%
-                current_balance = get_balance()
-                balance_change_percent = ((current_balance - initial_balance) / initial_balance) * 100
-                if balance_change_percent <= -20:
-                    logger.warning(f"Account down 20% ({balance_change_percent:.2f}%). Closing all trades.")
-                    close_trade(order_id)
-                    for contingency_trade in contingency_trades:
-                        if contingency_trade["ticket_id"]:
-                            close_trade(contingency_trade["ticket_id"])
+                current_balance = _shared_balance(balance_interval, initial_balance)
+                if current_balance <= balance_floor:
+                    balance_change_percent = ((current_balance - initial_balance) / initial_balance) * 100
+                    logger.warning("Account down 20%% (%.2f%%). Closing all trades.", balance_change_percent)
+                    contingency_trades.close_all(order_id)
                     log_trade("CLOSE_ALL", forex_pair, current_price, volume, "ACCOUNT_DOWN", None)
                     break
                 
                 # Check if account is up 2x of the pips from entry to 21 SMA
-                profit_distance = 2 * distance_to_21_sma
-                if (order_type == "buy" and current_price >= entry_price + profit_distance) or \
-                   (order_type == "sell" and current_price <= entry_price - profit_distance):
-                    logger.info(f"Account up 2x of pips from entry to 21 SMA. Taking profit.")
-                    close_trade(order_id)
-                    for contingency_trade in contingency_trades:
-                        if contingency_trade["ticket_id"]:
-                            close_trade(contingency_trade["ticket_id"])
+                if target_reached(current_price, profit_target):
+                    logger.info("Account up 2x of pips from entry to 21 SMA. Taking profit.")
+                    contingency_trades.close_all(order_id)
                     log_trade("CLOSE_ALL", forex_pair, current_price, volume, "PROFIT_TARGET", None)
                     break
                 
-                # Check for RSI divergence
-                divergence_signal = detect_rsi_divergence(df)
-                
                 # Only close on RSI divergence if in profit
                 if divergence_signal != 0:
-                    is_in_profit = (order_type == "buy" and current_price > entry_price) or \
-                                  (order_type == "sell" and current_price < entry_price)
-                    
-                    if is_in_profit:
-                        logger.info(f"RSI divergence detected while in profit: {divergence_signal}")
-                        close_trade(order_id)
-                        for contingency_trade in contingency_trades:
-                            if contingency_trade["ticket_id"]:
-                                close_trade(contingency_trade["ticket_id"])
+                    if beyond_entry(current_price, entry_price):
+                        logger.info("RSI divergence detected while in profit: %s", divergence_signal)
+                        contingency_trades.close_all(order_id)
                         log_trade("CLOSE_ALL", forex_pair, current_price, volume, "RSI_DIVERGENCE", None)
                         break
-                    else:
-                        logger.info(f"RSI divergence detected but trade is in loss. Not closing.")
+                    elif not divergence_reported:
+                        # The signal only changes once per bar; say so once per bar
+                        logger.info("RSI divergence detected but trade is in loss. Not closing.")
+                        divergence_reported = True
                 
                 # Check stop loss
-                if check_stop_loss(current_price, stop_loss, order_type):
-                    logger.info(f"Stop loss triggered at {current_price}")
+                if stop_hit(current_price, stop_loss):
+                    logger.info("Stop loss triggered at %s", current_price)
                     contingency_status = True
                     break
                 
-                # Sleep to avoid excessive API calls
-                time.sleep(1)
+                error_streak = 0
                 
             except Exception as e:
                 log_error(f"Error in monitoring loop: {str(e)}")
-                time.sleep(5)  # Wait a bit longer on error
+                error_streak += 1
+                time.sleep(_error_backoff(error_streak))
         
         # If no contingency needed, exit
         if not contingency_status:
@@ -162,141 +409,85 @@ def monitor_trade(order_id, position, volume, order_type, stop_loss, current_mar
         # Setup for contingency trading
         logger.info("Starting contingency trading")
         
-        # For buy signals
-        if order_type == "buy":
-            # Step 1: Set a sell stop at the 21 moving average with lot size of (initial lot size x 2)
-            sell_stop_volume = volume * 2
-            sell_stop_price = latest['21_SMA']
-            logger.info(f"Setting sell stop at 21 SMA ({sell_stop_price}) with volume {sell_stop_volume}")
+        # The buy and sell ladders mirror each other: resolve the direction
+        # once here instead of keeping two copies of the same steps
+        if order_type in ("buy", "sell"):
+            counter_type = "sell" if is_buy else "buy"
+            counter_type_upper = counter_type.upper()
+            order_type_upper = order_type.upper()
+            stop_activated = operator.le if is_buy else operator.ge
             
-            # Open the sell stop order
-            sell_stop_response = open_trade(forex_pair, sell_stop_volume, stop_loss, 'sell')
-            if sell_stop_response:
-                contingency_trades.append({
-                    "ticket_id": sell_stop_response.order,
-                    "trade_type": "sell",
-                    "volume": sell_stop_volume,
-                    "entry_price": sell_stop_price
-                })
-                num_contingency_trades += 1
-                log_trade("CONTINGENCY", forex_pair, sell_stop_price, sell_stop_volume, "SELL", sell_stop_response.order)
-                
-                # Step 2: If sell stop is activated, set a buy limit at the entry point with lot size of (initial lot size x 3)
-                buy_limit_volume = volume * 3
-                buy_limit_price = entry_price
-                logger.info(f"Setting buy limit at entry point ({buy_limit_price}) with volume {buy_limit_volume}")
-                
-                # Wait for the sell stop to be activated
-                while True:
-                    current_price = get_current_price(forex_pair)
-                    if current_price <= sell_stop_price:
-                        # Sell stop activated, open buy limit
-                        buy_limit_response = open_trade(forex_pair, buy_limit_volume, stop_loss, 'buy')
-                        if buy_limit_response:
-                            contingency_trades.append({
-                                "ticket_id": buy_limit_response.order,
-                                "trade_type": "buy",
-                                "volume": buy_limit_volume,
-                                "entry_price": buy_limit_price
-                            })
-                            num_contingency_trades += 1
-                            log_trade("CONTINGENCY", forex_pair, buy_limit_price, buy_limit_volume, "BUY", buy_limit_response.order)
-                        break
-                    time.sleep(1)
-        
-        # For sell signals
-        elif order_type == "sell":
-            # Step 1: Set a buy stop at the 21 moving average with lot size of (initial lot size x 2)
-            buy_stop_volume = volume * 2
-            buy_stop_price = latest['21_SMA']
-            logger.info(f"Setting buy stop at 21 SMA ({buy_stop_price}) with volume {buy_stop_volume}")
+            # Step 1: Set a counter stop at the 21 moving average with lot size of (initial lot size x 2)
+            stop_volume = volume * 2
+            stop_price = state.sma(21)
+            logger.info("Setting %s stop at 21 SMA (%s) with volume %s", counter_type, stop_price, stop_volume)
             
-            # Open the buy stop order
-            buy_stop_response = open_trade(forex_pair, buy_stop_volume, stop_loss, 'buy')
-            if buy_stop_response:
-                contingency_trades.append({
-                    "ticket_id": buy_stop_response.order,
-                    "trade_type": "buy",
-                    "volume": buy_stop_volume,
-                    "entry_price": buy_stop_price
-                })
-                num_contingency_trades += 1
-                log_trade("CONTINGENCY", forex_pair, buy_stop_price, buy_stop_volume, "BUY", buy_stop_response.order)
+            # Open the counter stop order
+            stop_response = open_trade(forex_pair, stop_volume, stop_loss, counter_type, tick=tick)
+            if stop_response:
+                contingency_trades.add(stop_response.order, counter_type, stop_volume, stop_price)
+                log_trade("CONTINGENCY", forex_pair, stop_price, stop_volume, counter_type_upper, stop_response.order)
                 
-                # Step 2: If buy stop is activated, set a sell limit at the entry point with lot size of (initial lot size x 3)
-                sell_limit_volume = volume * 3
-                sell_limit_price = entry_price
-                logger.info(f"Setting sell limit at entry point ({sell_limit_price}) with volume {sell_limit_volume}")
+                # Step 2: If the stop is activated, set a limit at the entry point with lot size of (initial lot size x 3)
+                limit_volume = volume * 3
+                limit_price = entry_price
+                logger.info("Setting %s limit at entry point (%s) with volume %s", order_type, limit_price, limit_volume)
                 
-                # Wait for the buy stop to be activated
+                # Wait for the counter stop to be activated
                 while True:
-                    current_price = get_current_price(forex_pair)
-                    if current_price >= buy_stop_price:
-                        # Buy stop activated, open sell limit
-                        sell_limit_response = open_trade(forex_pair, sell_limit_volume, stop_loss, 'sell')
-                        if sell_limit_response:
-                            contingency_trades.append({
-                                "ticket_id": sell_limit_response.order,
-                                "trade_type": "sell",
-                                "volume": sell_limit_volume,
-                                "entry_price": sell_limit_price
-                            })
-                            num_contingency_trades += 1
-                            log_trade("CONTINGENCY", forex_pair, sell_limit_price, sell_limit_volume, "SELL", sell_limit_response.order)
+                    tick = _next_tick(tick_queue)
+                    if tick is None:
+                        continue
+                    current_price = (tick.bid + tick.ask) / 2
+                    # Keep the indicators current for the contingency ladder
+                    state, _ = _refresh_state(forex_pair, state, tick, bar_period)
+                    if stop_activated(current_price, stop_price):
+                        # Stop activated, open the limit in the original direction
+                        limit_response = open_trade(forex_pair, limit_volume, stop_loss, order_type, tick=tick)
+                        if limit_response:
+                            contingency_trades.add(limit_response.order, order_type, limit_volume, limit_price)
+                            log_trade("CONTINGENCY", forex_pair, limit_price, limit_volume, order_type_upper, limit_response.order)
                         break
-                    time.sleep(1)
         
         # Continue with contingency trading
-        while num_contingency_trades < 10:  # Limit to 10 contingency trades
+        error_streak = 0
+        while len(contingency_trades) < MAX_CONTINGENCY_TRADES:
             try:
-                current_price = get_current_price(forex_pair)
+                tick = _next_tick(tick_queue)
+                if tick is None:
+                    continue
+                current_price = (tick.bid + tick.ask) / 2
+                
+                # Keep the 21 SMA the new limits are placed at current
+                state, _ = _refresh_state(forex_pair, state, tick, bar_period)
                 
                 # Check for any activated contingency trades
-                for i, trade in enumerate(contingency_trades):
-                    if trade["trade_type"] == "buy" and current_price >= trade["entry_price"]:
-                        # Buy limit activated, set a sell limit at the 21 SMA
-                        new_volume = volume * (num_contingency_trades + 1)
-                        sell_limit_price = latest['21_SMA']
-                        logger.info(f"Setting sell limit at 21 SMA ({sell_limit_price}) with volume {new_volume}")
-                        
-                        sell_limit_response = open_trade(forex_pair, new_volume, stop_loss, 'sell')
-                        if sell_limit_response:
-                            contingency_trades.append({
-                                "ticket_id": sell_limit_response.order,
-                                "trade_type": "sell",
-                                "volume": new_volume,
-                                "entry_price": sell_limit_price
-                            })
-                            num_contingency_trades += 1
-                            log_trade("CONTINGENCY", forex_pair, sell_limit_price, new_volume, "SELL", sell_limit_response.order)
+                for i in contingency_trades.activated(current_price):
+                    if len(contingency_trades) >= MAX_CONTINGENCY_TRADES:
+                        break
+                    # An activated limit is answered with the opposite limit at the 21 SMA
+                    new_type = "sell" if contingency_trades.sides[i] > 0 else "buy"
+                    new_volume = volume * (len(contingency_trades) + 1)
+                    limit_price = state.sma(21)
+                    logger.info("Setting %s limit at 21 SMA (%s) with volume %s", new_type, limit_price, new_volume)
                     
-                    elif trade["trade_type"] == "sell" and current_price <= trade["entry_price"]:
-                        # Sell limit activated, set a buy limit at the 21 SMA
-                        new_volume = volume * (num_contingency_trades + 1)
-                        buy_limit_price = latest['21_SMA']
-                        logger.info(f"Setting buy limit at 21 SMA ({buy_limit_price}) with volume {new_volume}")
-                        
-                        buy_limit_response = open_trade(forex_pair, new_volume, stop_loss, 'buy')
-                        if buy_limit_response:
-                            contingency_trades.append({
-                                "ticket_id": buy_limit_response.order,
-                                "trade_type": "buy",
-                                "volume": new_volume,
-                                "entry_price": buy_limit_price
-                            })
-                            num_contingency_trades += 1
-                            log_trade("CONTINGENCY", forex_pair, buy_limit_price, new_volume, "BUY", buy_limit_response.order)
+                    limit_response = open_trade(forex_pair, new_volume, stop_loss, new_type, tick=tick)
+                    if limit_response:
+                        contingency_trades.add(limit_response.order, new_type, new_volume, limit_price)
+                        log_trade("CONTINGENCY", forex_pair, limit_price, new_volume, new_type.upper(), limit_response.order)
                 
-                # Sleep to avoid excessive API calls
-                time.sleep(1)
+                error_streak = 0
                 
             except Exception as e:
                 log_error(f"Error in contingency loop: {str(e)}")
-                time.sleep(5)  # Wait a bit longer on error
+                error_streak += 1
+                time.sleep(_error_backoff(error_streak))
         
         logger.info("Contingency trading completed")
         return 0
         
     except Exception as e:
         log_error(f"Error in monitor_trade: {str(e)}")
-        return -1 
\ No newline at end of file
+        return -1
+    finally:
+        _tick_feed.unsubscribe(forex_pair, tick_queue) 
\ No newline at end of file
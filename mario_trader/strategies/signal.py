@@ -1,13 +1,22 @@
 """
 Trading signal generation
 """
-import numpy as np
-from mario_trader.indicators.technical import calculate_indicators
-from mario_trader.utils.logger import logger
+from mario_trader.config import TRADING_SETTINGS
 from mario_trader.strategies.sma_crossover_strategy import generate_sma_crossover_signal
 
+# Signal generators by TRADING_SETTINGS["strategy"] name
+STRATEGIES = {
+    "sma_crossover": generate_sma_crossover_signal,
+}
 
-def generate_signal(df, currency_pair, debug_mode=False):
+if TRADING_SETTINGS["strategy"] not in STRATEGIES:
+    raise ValueError(f"Unknown strategy {TRADING_SETTINGS['strategy']!r}, expected one of {sorted(STRATEGIES)}")
+
+# Resolved once at import, so a call is a direct function call
+_strategy = STRATEGIES[TRADING_SETTINGS["strategy"]]
+
+
+def generate_signal(df, currency_pair, debug_mode=False, *, indicators_ready=False):
     """
     Generate trading signals based on technical indicators
     
@@ -15,10 +24,10 @@ def generate_signal(df, currency_pair, debug_mode=False):
         df: DataFrame with price data
         currency_pair: Currency pair symbol
         debug_mode: If True, relaxes some conditions for testing
+        indicators_ready: True if `df` already carries up-to-date indicator columns
         
     Returns:
         Tuple of (signal, stop_loss, current_market_price)
         signal: 1 for buy, -1 for sell, 0 for no action
     """
-    # Use the SMA crossover strategy
-    return generate_sma_crossover_signal(df, currency_pair, debug_mode) 
\ No newline at end of file
+    return _strategy(df, currency_pair, debug_mode, indicators_ready=indicators_ready)
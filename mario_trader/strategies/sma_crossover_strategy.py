@@ -15,8 +15,10 @@ For a SELL signal:
 - There must be 3 or more consecutive buy candles and a sell candle
 - RSI must be below 50
 """
+import logging
 import numpy as np
-from mario_trader.indicators.technical import calculate_indicators
+from mario_trader.config import TRADING_SETTINGS
+from mario_trader.indicators.technical import calculate_indicators, calculate_indicators_batch
 from mario_trader.utils.logger import logger
 
 
@@ -31,21 +33,59 @@ def check_price_crossed_200sma_recently(df, lookback=10):
     Returns:
         True if price crossed 200 SMA recently, False otherwise
     """
-    for i in range(1, min(lookback, len(df))):
-        prev_candle = df.iloc[-i-1]
-        curr_candle = df.iloc[-i]
+    crossed = df['200_SMA_cross'].to_numpy() if '200_SMA_cross' in df.columns else None
+    return _crossed_recently(df['close'].to_numpy(), df['200_SMA'].to_numpy(), lookback, crossed)
+
+
+def _crossed_recently(close, sma_200, lookback=10, crossed=None):
+    """
+    Check the close and 200 SMA arrays for a cross in the last `lookback` candles
+    
+    Args:
+        close: Close prices, oldest first
+        sma_200: 200 SMA values, oldest first
+        lookback: Number of candles to look back
+        crossed: Crosses from calculate_indicators' '200_SMA_cross' column (optional)
         
-        # Check if price crossed above 200 SMA
-        if (prev_candle['close'] < prev_candle['200_SMA'] and 
-            curr_candle['close'] > curr_candle['200_SMA']):
-            return True
-            
-        # Check if price crossed below 200 SMA
-        if (prev_candle['close'] > prev_candle['200_SMA'] and 
-            curr_candle['close'] < curr_candle['200_SMA']):
-            return True
-            
-    return False
+    Returns:
+        True if price crossed 200 SMA recently, False otherwise
+    """
+    n = min(lookback, len(close))
+    if n < 2:
+        return False
+    if crossed is not None:
+        # Each cross is marked on the later of its two candles, so only the
+        # last n - 1 marks fall inside the window
+        return bool(crossed[len(crossed) - n + 1:].any())
+    close = close[-n:]
+    sma_200 = sma_200[-n:]
+    above = close > sma_200
+    below = close < sma_200
+    
+    # Crossed above (below -> above) or below (above -> below) between two candles
+    crossed = (below[:-1] & above[1:]) | (above[:-1] & below[1:])
+    return bool(crossed.any())
+
+
+def _candle_directions(df, count):
+    """
+    Get the direction of the last candles (1 for bullish, -1 for bearish)
+    
+    Args:
+        df: DataFrame with price data
+        count: Number of most recent candles
+        
+    Returns:
+        NumPy array of directions, oldest first
+    """
+    if 'direction' in df.columns:
+        return df['direction'].to_numpy()[-count:]
+    return _directions(df['close'].to_numpy()[-count:], df['open'].to_numpy()[-count:])
+
+
+def _directions(close, open_):
+    """Candle directions as int8: 1 bullish, -1 bearish, 0 doji (or missing prices)"""
+    return (close > open_).astype(np.int8) - (close < open_).astype(np.int8)
 
 
 def check_consecutive_candles(df, direction, count=3):
@@ -60,75 +100,165 @@ def check_consecutive_candles(df, direction, count=3):
     Returns:
         True if the pattern is detected, False otherwise
     """
-    # Add candle direction (1 for bullish, -1 for bearish) if not already present
-    if 'direction' not in df.columns:
-        df['direction'] = np.sign(df['close'] - df['open'])
-    
     if len(df) < count + 1:
         # Not enough data
         return False
     
-    # Get the current candle direction (most recent)
-    current_direction = df['direction'].iloc[-1]
+    # Only the current candle and the 'count' before it matter
+    return _reversal_after_run(_candle_directions(df, count + 1), direction, count)
+
+
+def _reversal_after_run(directions, direction, count=3):
+    """
+    Check candle directions for 'count' candles in `direction` followed by
+    one opposite (current) candle
+    
+    Args:
+        directions: Array of candle directions, oldest first
+        direction: 1 for buy candles followed by sell, -1 for sell candles followed by buy
+        count: Number of consecutive candles required for a signal
+        
+    Returns:
+        True if the pattern is detected, False otherwise
+    """
+    if len(directions) < count + 1:
+        return False
+    directions = directions[-(count + 1):]
+    current_direction = directions[-1]
     
     # For a buy signal (direction=-1), we need:
     # 1. Current candle is bullish (direction=1)
     # 2. Previous 'count' candles are all bearish (direction=-1)
-    if direction == -1 and current_direction == 1:
-        # Check if previous 'count' candles are all bearish
-        for i in range(2, count+2):  # Starting from 2nd most recent candle
-            if i > len(df) or df['direction'].iloc[-i] != -1:
-                return False
-        return True
-    
+    #
     # For a sell signal (direction=1), we need:
     # 1. Current candle is bearish (direction=-1)
     # 2. Previous 'count' candles are all bullish (direction=1)
-    elif direction == 1 and current_direction == -1:
-        # Check if previous 'count' candles are all bullish
-        for i in range(2, count+2):  # Starting from 2nd most recent candle
-            if i > len(df) or df['direction'].iloc[-i] != 1:
-                return False
-        return True
+    if direction in (1, -1) and current_direction == -direction:
+        return bool((directions[:-1] == direction).all())
     
     return False
 
 
-def log_candle_pattern(df, currency_pair):
+def log_candle_pattern(df, currency_pair, directions=None):
     """
     Log the recent candle pattern for debugging
     
     Args:
         df: DataFrame with price data
         currency_pair: Currency pair symbol
+        directions: Directions of the last 10 (or more) candles if the caller
+            already has them (optional)
     """
-    if 'direction' not in df.columns:
-        df['direction'] = np.sign(df['close'] - df['open'])
-    
-    # Create a visual representation of recent candles
+    # Create a visual representation of recent candles (up to the last 10,
+    # never the very first one)
     # + for bullish (buy) candles, - for bearish (sell) candles
-    pattern = ""
-    for i in range(10, 0, -1):
-        if i >= len(df):
-            continue
-        
-        if df['direction'].iloc[-i] == 1:
-            pattern += "+"
-        else:
-            pattern += "-"
+    count = min(10, len(df) - 1)
+    if count <= 0:
+        directions = np.empty(0)
+    elif directions is None:
+        directions = _candle_directions(df, count)
+    else:
+        directions = directions[-count:]
+    bullish = directions == 1
+    pattern = "".join(np.where(bullish, "+", "-"))
     
     # The rightmost character represents the most recent candle
-    logger.debug(f"{currency_pair} - Recent candle pattern (right=newest): {pattern}")
+    logger.debug("%s - Recent candle pattern (right=newest): %s", currency_pair, pattern)
     
-    # Check and log specific patterns
+    # Check and log specific patterns on the last 4 candles ("---+" / "+++-")
     # Modified to match our actual requirements better
-    if pattern.endswith("---+"):
-        logger.debug(f"{currency_pair} - Detected 3 sell candles followed by a buy candle")
-    if pattern.endswith("+++-"):
-        logger.debug(f"{currency_pair} - Detected 3 buy candles followed by a sell candle")
+    if len(bullish) < 4:
+        return
+    previous_bullish = bullish[-4:-1]
+    if bullish[-1] and not previous_bullish.any():
+        logger.debug("%s - Detected 3 sell candles followed by a buy candle", currency_pair)
+    if not bullish[-1] and previous_bullish.all():
+        logger.debug("%s - Detected 3 buy candles followed by a sell candle", currency_pair)
 
 
-def generate_sma_crossover_signal(df, currency_pair, debug_mode=False):
+def _detect_signal(close, open_, sma_200, sma_21, sma_50, rsi, lookback=10):
+    """
+    Evaluate the strategy on the latest bar straight from the raw arrays
+    
+    Makes the same decision as generate_sma_crossover_signal (without debug
+    mode) in one pass over the trailing values, with no pandas access or
+    temporary arrays.
+    
+    Args:
+        close, open_, sma_200, sma_21, sma_50, rsi: NumPy arrays, oldest first
+        lookback: Number of candles to look back for a 200 SMA cross
+        
+    Returns:
+        Tuple of (signal, stop_loss)
+        signal: 1 for buy, -1 for sell, 0 for no action
+    """
+    n = len(close)
+    price = float(close[-1])
+    if not price > sma_200[-1]:
+        return 0, 0
+    
+    # RSI picks the only pattern that can still signal: a run of sell candles
+    # (-1) for a buy above 50, a run of buy candles (1) for a sell below 50
+    last_rsi = rsi[-1]
+    if last_rsi > 50:
+        run = -1
+    elif last_rsi < 50:
+        run = 1
+    else:
+        return 0, 0
+    
+    if n < 4:
+        return 0, 0
+    
+    # 3 candles in the run direction, then the current candle against it;
+    # most bars already fail on the current candle
+    if not (open_[-1] - price) * run > 0:
+        return 0, 0
+    
+    # The loops below only read the trailing candles; convert those to Python
+    # floats in one go instead of boxing a NumPy scalar per element read
+    m = min(max(lookback, 4), n)
+    close = close[-m:].tolist()
+    open_ = open_[-m:].tolist()
+    for i in range(m - 4, m - 1):
+        if not (close[i] - open_[i]) * run > 0:
+            return 0, 0
+    
+    # Squared distance against 0.0001 squared: no abs() call, and the same
+    # outcome as abs(separation) > 0.0001 around the boundary
+    separation = float(sma_21[-1] - sma_50[-1])
+    sufficient_separation = separation * separation > 1e-8
+    if not sufficient_separation:
+        # A recent 200 SMA cross stands in for the separation
+        sma_200 = sma_200[-m:].tolist()
+        for i in range(m - min(lookback, n) + 1, m):
+            if ((close[i - 1] < sma_200[i - 1] and close[i] > sma_200[i])
+                    or (close[i - 1] > sma_200[i - 1] and close[i] < sma_200[i])):
+                sufficient_separation = True
+                break
+        if not sufficient_separation:
+            return 0, 0
+    
+    stop_loss_distance = abs(float(sma_21[-1]) - price)
+    return -run, price + run * stop_loss_distance
+
+
+def _log_signal(currency_pair, signal, rsi, current_market_price, sma_200):
+    """Log a generated BUY (1) or SELL (-1) signal"""
+    if signal == 1:
+        logger.info("BUY SIGNAL GENERATED: %s", currency_pair)
+        logger.info("Buy pattern found: %s", True)
+        logger.info("Current candle is buy: %s", True)
+        logger.info("RSI > 50: %.2f", rsi)
+    else:
+        logger.info("SELL SIGNAL GENERATED: %s", currency_pair)
+        logger.info("Sell pattern found: %s", True)
+        logger.info("Current candle is sell: %s", True)
+        logger.info("RSI < 50: %.2f", rsi)
+    logger.info("Price > 200 SMA: %.5f > %.5f", current_market_price, sma_200)
+
+
+def generate_sma_crossover_signal(df, currency_pair, debug_mode=False, *, indicators_ready=False):
     """
     Generate trading signals based on SMA crossover strategy with RSI confirmation
     
@@ -136,135 +266,296 @@ def generate_sma_crossover_signal(df, currency_pair, debug_mode=False):
         df: DataFrame with price data
         currency_pair: Currency pair symbol
         debug_mode: If True, relaxes some conditions for testing purposes
+        indicators_ready: True if `df` already carries up-to-date indicator
+            columns (e.g. calculated once when the bar closed)
         
     Returns:
         Tuple of (signal, stop_loss, current_market_price)
         signal: 1 for buy, -1 for sell, 0 for no action
     """
-    df = calculate_indicators(df)
-    latest = df.iloc[-1]
-    current_market_price = latest['close']
-    
-    # Add candle direction (1 for bullish, -1 for bearish)
-    df['direction'] = np.sign(df['close'] - df['open'])
-    
-    # Check if price recently crossed 200 SMA
-    recently_crossed_200sma = check_price_crossed_200sma_recently(df)
-    
-    # Check for sufficient separation between 21 and 50 SMAs
-    sma_separation = abs(latest['21_SMA'] - latest['50_SMA'])
+    # calculate_indicators itself skips frames whose candles are unchanged;
+    # callers that refresh the indicators themselves can skip even that check
+    if not indicators_ready:
+        df = calculate_indicators(df)
+    
+    # The per-condition log is opt-in (log_signal_checks): the default DEBUG
+    # level alone does not pay for formatting it on every check
+    _dbg = TRADING_SETTINGS.get("log_signal_checks", False) and logger.isEnabledFor(logging.DEBUG)
+    
+    # Everything below reads a handful of trailing values: bind each column
+    # array once (the helpers take these arrays too) and take the latest
+    # values as plain scalars instead of building a row Series
+    close = df['close'].to_numpy()
+    sma_200_values = df['200_SMA'].to_numpy()
+    sma_21_values = df['21_SMA'].to_numpy()
+    sma_50_values = df['50_SMA'].to_numpy()
+    rsi_values = df['RSI'].to_numpy()
+    current_market_price = float(close[-1])
+    sma_200 = float(sma_200_values[-1])
+    sma_21 = float(sma_21_values[-1])
+    sma_50 = float(sma_50_values[-1])
+    rsi = float(rsi_values[-1])
+    
+    # Without debug output or forced signals only the decision matters, so
+    # evaluate it in one pass over the raw arrays
+    if not (_dbg or debug_mode) and 'direction' not in df.columns:
+        signal, stop_loss = _detect_signal(close, df['open'].to_numpy(), sma_200_values,
+                                           sma_21_values, sma_50_values, rsi_values)
+        if signal:
+            _log_signal(currency_pair, signal, rsi, current_market_price, sma_200)
+        return signal, stop_loss, current_market_price
+    
+    # Both signals (debug mode included) need the price above the 200 SMA,
+    # so skip the candle checks in the common no-signal case
+    price_above_200sma = current_market_price > sma_200
+    if not price_above_200sma:
+        if _dbg:
+            logger.debug("%s - Price %.5f not above 200 SMA %.5f, no signal", currency_pair, current_market_price, sma_200)
+        return 0, 0, current_market_price
+    
+    # A buy needs RSI above 50 and a sell RSI below 50; at exactly 50 (or
+    # without an RSI) nothing can signal, so skip the candle checks unless
+    # they are logged
+    rsi_above_50 = rsi > 50
+    rsi_below_50 = rsi < 50
+    if not (rsi_above_50 or rsi_below_50 or _dbg):
+        return 0, 0, current_market_price
+    
+    # Directions of the last 10 candles, computed once for both candle
+    # pattern checks and the debug pattern log
+    directions = _candle_directions(df, 10)
+    current_direction = directions[-1]
+    
+    # Check for sufficient separation between 21 and 50 SMAs; the 200 SMA
+    # cross scan only matters when the separation alone is not enough
+    sma_separation = abs(sma_21 - sma_50)
+    recently_crossed_200sma = ((_dbg or not sma_separation > 0.0001)
+                               and check_price_crossed_200sma_recently(df))
     sufficient_separation = sma_separation > 0.0001 or recently_crossed_200sma
     
-    # Log market conditions
-    logger.debug(f"{currency_pair} - Price: {latest['close']:.5f}, 200 SMA: {latest['200_SMA']:.5f}")
-    logger.debug(f"{currency_pair} - 21 SMA: {latest['21_SMA']:.5f}, 50 SMA: {latest['50_SMA']:.5f}")
-    logger.debug(f"{currency_pair} - RSI: {latest['RSI']:.2f}")
-    logger.debug(f"{currency_pair} - SMA Separation: {sma_separation:.5f}")
-    logger.debug(f"{currency_pair} - Recently crossed 200 SMA: {recently_crossed_200sma}")
+    # Both directions place the stop loss the price-to-21 SMA distance away
+    stop_loss_distance = abs(sma_21 - current_market_price)
     
-    # Log candle pattern
-    log_candle_pattern(df, currency_pair)
+    # Log market conditions and the candle pattern
+    if _dbg:
+        logger.debug("%s - Price: %.5f, 200 SMA: %.5f", currency_pair, current_market_price, sma_200)
+        logger.debug("%s - 21 SMA: %.5f, 50 SMA: %.5f", currency_pair, sma_21, sma_50)
+        logger.debug("%s - RSI: %.2f", currency_pair, rsi)
+        logger.debug("%s - SMA Separation: %.5f", currency_pair, sma_separation)
+        logger.debug("%s - Recently crossed 200 SMA: %s", currency_pair, recently_crossed_200sma)
+        log_candle_pattern(df, currency_pair, directions)
     
     # Check for consecutive candles pattern
     # For a buy signal: 3+ consecutive SELL candles followed by a BUY candle
-    buy_pattern = check_consecutive_candles(df, -1, 3)
+    buy_pattern = _reversal_after_run(directions, -1, 3)
     
     # For a sell signal: 3+ consecutive BUY candles followed by a SELL candle
-    sell_pattern = check_consecutive_candles(df, 1, 3)
+    sell_pattern = _reversal_after_run(directions, 1, 3)
     
     # Current candle direction
-    current_candle_is_buy = df['direction'].iloc[-1] == 1
-    current_candle_is_sell = df['direction'].iloc[-1] == -1
+    current_candle_is_buy = current_direction == 1
+    current_candle_is_sell = current_direction == -1
     
     # Log consecutive candle checks
-    logger.debug(f"{currency_pair} - Buy pattern (3+ sell candles followed by buy): {buy_pattern}")
-    logger.debug(f"{currency_pair} - Sell pattern (3+ buy candles followed by sell): {sell_pattern}")
-    logger.debug(f"{currency_pair} - Current candle is buy: {current_candle_is_buy}")
-    logger.debug(f"{currency_pair} - Current candle is sell: {current_candle_is_sell}")
+    if _dbg:
+        logger.debug("%s - Buy pattern (3+ sell candles followed by buy): %s", currency_pair, buy_pattern)
+        logger.debug("%s - Sell pattern (3+ buy candles followed by sell): %s", currency_pair, sell_pattern)
+        logger.debug("%s - Current candle is buy: %s", currency_pair, current_candle_is_buy)
+        logger.debug("%s - Current candle is sell: %s", currency_pair, current_candle_is_sell)
     
     # BUY SIGNAL CONDITIONS
-    # The closing price must be above the 200-day SMA
-    price_above_200sma = latest['close'] > latest['200_SMA']
-    # RSI must be above 50
-    rsi_above_50 = latest['RSI'] > 50
+    # The closing price must be above the 200-day SMA (checked above, so
+    # price_above_200sma holds from here on)
+    # RSI must be above 50 (rsi_above_50 above)
     
     # Log individual conditions for BUY signal
-    logger.debug(f"{currency_pair} - Price > 200 SMA: {price_above_200sma}")
-    logger.debug(f"{currency_pair} - Sufficient SMA separation: {sufficient_separation}")
-    logger.debug(f"{currency_pair} - RSI > 50: {rsi_above_50}")
+    if _dbg:
+        logger.debug("%s - Price > 200 SMA: %s", currency_pair, price_above_200sma)
+        logger.debug("%s - Sufficient SMA separation: %s", currency_pair, sufficient_separation)
+        logger.debug("%s - RSI > 50: %s", currency_pair, rsi_above_50)
     
     # In debug mode, we'll relax some conditions to force signals for testing
     if debug_mode:
         # If price and RSI conditions are met but other conditions aren't,
         # still generate a buy signal for testing
-        if price_above_200sma and rsi_above_50:
-            logger.info(f"DEBUG MODE: Forcing BUY signal for {currency_pair} for testing")
-            stop_loss_distance = abs(latest['21_SMA'] - current_market_price)
+        if rsi_above_50:
+            logger.info("DEBUG MODE: Forcing BUY signal for %s for testing", currency_pair)
             stop_loss = current_market_price - stop_loss_distance
             return 1, stop_loss, current_market_price
     
     # Check for BUY signal with all conditions
-    if price_above_200sma and sufficient_separation and buy_pattern and rsi_above_50:
+    if sufficient_separation and buy_pattern and rsi_above_50:
         # Calculate stop loss based on recent swing low or a percentage of price
-        stop_loss_distance = abs(latest['21_SMA'] - current_market_price)
         stop_loss = current_market_price - stop_loss_distance
         
         # Log signal information
-        logger.info(f"BUY SIGNAL GENERATED: {currency_pair}")
-        logger.info(f"Buy pattern found: {buy_pattern}")
-        logger.info(f"Current candle is buy: {current_candle_is_buy}")
-        logger.info(f"RSI > 50: {latest['RSI']:.2f}")
-        logger.info(f"Price > 200 SMA: {latest['close']:.5f} > {latest['200_SMA']:.5f}")
+        _log_signal(currency_pair, 1, rsi, current_market_price, sma_200)
         
         return 1, stop_loss, current_market_price
     
     # SELL SIGNAL CONDITIONS
     # The closing price must be above the 200-day SMA (same as buy)
-    price_above_200sma = latest['close'] > latest['200_SMA']
-    # RSI must be below 50
-    rsi_below_50 = latest['RSI'] < 50
+    # RSI must be below 50 (rsi_below_50 above)
     
-    # Log individual conditions for SELL signal
-    logger.debug(f"{currency_pair} - Price > 200 SMA: {price_above_200sma}")
-    logger.debug(f"{currency_pair} - Sufficient SMA separation: {sufficient_separation}")
-    logger.debug(f"{currency_pair} - RSI < 50: {rsi_below_50}")
+    # Log individual conditions for SELL signal (price and separation are
+    # shared with the BUY signal and logged above)
+    if _dbg:
+        logger.debug("%s - RSI < 50: %s", currency_pair, rsi_below_50)
     
     # In debug mode, we'll relax some conditions to force signals for testing
     if debug_mode:
         # If price and RSI conditions are met but other conditions aren't,
         # still generate a sell signal for testing
-        if price_above_200sma and rsi_below_50:
-            logger.info(f"DEBUG MODE: Forcing SELL signal for {currency_pair} for testing")
-            stop_loss_distance = abs(latest['21_SMA'] - current_market_price)
+        if rsi_below_50:
+            logger.info("DEBUG MODE: Forcing SELL signal for %s for testing", currency_pair)
             stop_loss = current_market_price + stop_loss_distance
             return -1, stop_loss, current_market_price
     
     # Check for SELL signal with all conditions
-    if price_above_200sma and sufficient_separation and sell_pattern and rsi_below_50:
+    if sufficient_separation and sell_pattern and rsi_below_50:
         # Calculate stop loss based on recent swing high or a percentage of price
-        stop_loss_distance = abs(latest['21_SMA'] - current_market_price)
         stop_loss = current_market_price + stop_loss_distance
         
         # Log signal information
-        logger.info(f"SELL SIGNAL GENERATED: {currency_pair}")
-        logger.info(f"Sell pattern found: {sell_pattern}")
-        logger.info(f"Current candle is sell: {current_candle_is_sell}")
-        logger.info(f"RSI < 50: {latest['RSI']:.2f}")
-        logger.info(f"Price > 200 SMA: {latest['close']:.5f} > {latest['200_SMA']:.5f}")
+        _log_signal(currency_pair, -1, rsi, current_market_price, sma_200)
         
         return -1, stop_loss, current_market_price
     
     # If any conditions were close but not met, log them for debugging
-    if price_above_200sma and sufficient_separation and current_candle_is_buy and not rsi_above_50:
-        logger.debug(f"{currency_pair} - Almost BUY signal but RSI not > 50: {latest['RSI']:.2f}")
+    if not _dbg:
+        return 0, 0, current_market_price
+    
+    if sufficient_separation and current_candle_is_buy and not rsi_above_50:
+        logger.debug("%s - Almost BUY signal but RSI not > 50: %.2f", currency_pair, rsi)
     
-    if price_above_200sma and sufficient_separation and rsi_above_50 and not buy_pattern:
-        logger.debug(f"{currency_pair} - Almost BUY signal but missing correct candle pattern")
+    if sufficient_separation and rsi_above_50 and not buy_pattern:
+        logger.debug("%s - Almost BUY signal but missing correct candle pattern", currency_pair)
     
-    if price_above_200sma and sufficient_separation and current_candle_is_sell and not rsi_below_50:
-        logger.debug(f"{currency_pair} - Almost SELL signal but RSI not < 50: {latest['RSI']:.2f}")
+    if sufficient_separation and current_candle_is_sell and not rsi_below_50:
+        logger.debug("%s - Almost SELL signal but RSI not < 50: %.2f", currency_pair, rsi)
     
-    if price_above_200sma and sufficient_separation and rsi_below_50 and not sell_pattern:
-        logger.debug(f"{currency_pair} - Almost SELL signal but missing correct candle pattern")
+    if sufficient_separation and rsi_below_50 and not sell_pattern:
+        logger.debug("%s - Almost SELL signal but missing correct candle pattern", currency_pair)
     
-    return 0, 0, current_market_price 
\ No newline at end of file
+    return 0, 0, current_market_price 
+
+def sma_crossover_signals(df, lookback=10):
+    """
+    Evaluate the SMA crossover strategy on every bar at once, for backtests
+    and parameter sweeps
+    
+    Gives the same signal and stop loss at each bar as calling
+    generate_sma_crossover_signal on the candles up to that bar (without
+    debug mode), from a few whole-array NumPy operations instead of one
+    Python call per bar.
+    
+    Args:
+        df: DataFrame with price data
+        lookback: Number of candles to look back for a 200 SMA cross
+        
+    Returns:
+        Tuple of (signals, stop_losses) arrays, one value per bar
+        signals: 1 for buy, -1 for sell, 0 for no action (int8)
+        stop_losses: Stop loss price where a signal was generated, else 0
+    """
+    df = calculate_indicators(df)
+    close = df['close'].to_numpy(dtype=np.float64)
+    sma_200 = df['200_SMA'].to_numpy(dtype=np.float64)
+    sma_21 = df['21_SMA'].to_numpy(dtype=np.float64)
+    sma_50 = df['50_SMA'].to_numpy(dtype=np.float64)
+    rsi = df['RSI'].to_numpy(dtype=np.float64)
+    n = len(close)
+    
+    # 200 SMA crosses, marked on the candle that closed on the other side;
+    # a bar sees the crosses among its last `lookback` candles
+    above = close > sma_200
+    crossed = df['200_SMA_cross'].to_numpy()
+    window = max(lookback - 1, 0)
+    csum = np.concatenate(([0], np.cumsum(crossed)))
+    recent_crosses = csum[1:] - csum[np.maximum(np.arange(n) - window + 1, 0)]
+    recently_crossed = recent_crosses > 0
+    
+    sufficient_separation = (np.abs(sma_21 - sma_50) > 0.0001) | recently_crossed
+    
+    # Current candle against the 3 before it
+    directions = _directions(close, df['open'].to_numpy(dtype=np.float64))
+    previous = []
+    for k in (1, 2, 3):
+        # Direction k candles back (0 where there is none, also for frames
+        # shorter than k candles)
+        shifted = np.zeros(n, dtype=np.int8)
+        if k < n:
+            shifted[k:] = directions[:-k]
+        previous.append(shifted)
+    buy_pattern = (directions == 1) & (previous[0] == -1) & (previous[1] == -1) & (previous[2] == -1)
+    sell_pattern = (directions == -1) & (previous[0] == 1) & (previous[1] == 1) & (previous[2] == 1)
+    
+    setup = above & sufficient_separation
+    buy = setup & buy_pattern & (rsi > 50)
+    sell = setup & sell_pattern & (rsi < 50) & ~buy
+    
+    signals = buy.astype(np.int8) - sell.astype(np.int8)
+    stop_loss_distance = np.abs(sma_21 - close)
+    stop_losses = np.where(buy, close - stop_loss_distance, np.where(sell, close + stop_loss_distance, 0.0))
+    return signals, stop_losses
+
+
+def sma_crossover_signal_batch(frames, lookback=10):
+    """
+    Evaluate the SMA crossover strategy on the latest bar of several
+    DataFrames (e.g. one per currency pair) together
+    
+    The trailing candles of every frame are stacked into 2-D (pair x candle)
+    arrays, so all pairs are checked with one set of NumPy operations instead
+    of one generate_sma_crossover_signal call each. Gives the same signal and
+    stop loss per frame as generate_sma_crossover_signal (without debug mode),
+    but logs nothing.
+    
+    Args:
+        frames: List of DataFrames with price data
+        lookback: Number of candles to look back for a 200 SMA cross
+        
+    Returns:
+        Tuple of (signals, stop_losses) arrays, one value per frame
+        signals: 1 for buy, -1 for sell, 0 for no action (int8)
+        stop_losses: Stop loss price where a signal was generated, else 0
+    """
+    calculate_indicators_batch(frames)
+    
+    # Frames shorter than the window are padded with NaN at the front, which
+    # fails every comparison just like a missing candle
+    width = max(lookback, 4)
+    columns = ('close', '200_SMA', '21_SMA', '50_SMA', 'RSI')
+    window = np.full((len(columns), len(frames), width), np.nan)
+    directions = np.full((len(frames), 4), np.nan)
+    for row, df in enumerate(frames):
+        tail = min(width, len(df))
+        if tail == 0:
+            continue
+        for k, column in enumerate(columns):
+            window[k, row, width - tail:] = df[column].to_numpy()[-tail:]
+        directions[row, 4 - min(4, tail):] = _candle_directions(df, min(4, tail))
+    close, sma_200, sma_21, sma_50, rsi = window
+    price = close[:, -1]
+    
+    # 200 SMA crosses between consecutive candles of the last `lookback`
+    recent_close = close[:, width - lookback:]
+    recent_sma_200 = sma_200[:, width - lookback:]
+    above = recent_close > recent_sma_200
+    below = recent_close < recent_sma_200
+    recently_crossed = ((below[:, :-1] & above[:, 1:]) | (above[:, :-1] & below[:, 1:])).any(axis=1)
+    
+    sufficient_separation = (np.abs(sma_21[:, -1] - sma_50[:, -1]) > 0.0001) | recently_crossed
+    
+    # Current candle against the 3 before it
+    buy_pattern = (directions[:, -1] == 1) & (directions[:, :-1] == -1).all(axis=1)
+    sell_pattern = (directions[:, -1] == -1) & (directions[:, :-1] == 1).all(axis=1)
+    
+    setup = (price > sma_200[:, -1]) & sufficient_separation
+    buy = setup & buy_pattern & (rsi[:, -1] > 50)
+    sell = setup & sell_pattern & (rsi[:, -1] < 50)
+    
+    signals = buy.astype(np.int8) - sell.astype(np.int8)
+    stop_loss_distance = np.abs(sma_21[:, -1] - price)
+    stop_losses = np.where(buy, price - stop_loss_distance, np.where(sell, price + stop_loss_distance, 0.0))
+    return signals, stop_losses
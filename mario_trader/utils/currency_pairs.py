@@ -2,10 +2,26 @@
 Currency pairs utility functions
 """
 import os
+import re
 import json
 from mario_trader.utils.logger import logger
 import MetaTrader5 as mt5
 
+# Symbol filters applied to every broker symbol (hashed lookups for the currency codes)
+_MAJOR_CURRENCIES = frozenset(['EUR', 'USD', 'GBP', 'JPY', 'AUD', 'NZD', 'CAD', 'CHF'])
+_METAL_PREFIXES = ('XAU', 'XAG', 'XPD', 'XPT')
+_INDEX_NAMES = ('US30', 'SPX', 'NAS', 'UK100', 'GER30', 'DJ30')
+_INDEX_PATTERN = re.compile('|'.join(_INDEX_NAMES))
+_CRYPTO_PREFIXES = ('BTC', 'ETH')
+
+# Preferred default pairs, in order
+_PRIORITY_PAIRS = ("EURUSD", "GBPUSD", "USDJPY", "XAUUSD")
+
+# Broker symbols from the last successful load (and as a set for membership
+# checks); fallback lists are never cached, so the next call asks the broker again
+_broker_pairs = None
+_broker_pairs_set = frozenset()
+
 
 def get_available_broker_symbols():
     """
@@ -32,19 +48,20 @@ def get_available_broker_symbols():
     # Filter for common forex, indices, metals, and energy symbols
     filtered_symbols = []
     for symbol in symbol_names:
-        # Include all major and minor currency pairs
-        if (len(symbol) == 6 and symbol[:3] != symbol[3:] and 
-            symbol[:3] in ['EUR', 'USD', 'GBP', 'JPY', 'AUD', 'NZD', 'CAD', 'CHF'] and
-            symbol[3:] in ['EUR', 'USD', 'GBP', 'JPY', 'AUD', 'NZD', 'CAD', 'CHF']):
-            filtered_symbols.append(symbol)
+        # Include all major and minor currency pairs (slicing only 6-letter symbols, once)
+        if len(symbol) == 6:
+            base, quote = symbol[:3], symbol[3:]
+            if base != quote and base in _MAJOR_CURRENCIES and quote in _MAJOR_CURRENCIES:
+                filtered_symbols.append(symbol)
+                continue
         # Include common metals and energies
-        elif symbol.startswith(('XAU', 'XAG', 'XPD', 'XPT')):
+        if symbol.startswith(_METAL_PREFIXES):
             filtered_symbols.append(symbol)
         # Include major indices that might have different names
-        elif any(index in symbol for index in ['US30', 'SPX', 'NAS', 'UK100', 'GER30', 'DJ30']):
+        elif _INDEX_PATTERN.search(symbol):
             filtered_symbols.append(symbol)
         # Include major cryptocurrencies
-        elif symbol.startswith(('BTC', 'ETH')) and 'USD' in symbol:
+        elif symbol.startswith(_CRYPTO_PREFIXES) and 'USD' in symbol:
             filtered_symbols.append(symbol)
     
     logger.info(f"Filtered to {len(filtered_symbols)} tradable symbols")
@@ -55,9 +72,16 @@ def load_currency_pairs():
     """
     Load the list of currency pairs to trade
     
+    The broker's symbols are fetched once and reused until
+    clear_currency_pairs_cache is called.
+    
     Returns:
         List of currency pairs
     """
+    global _broker_pairs, _broker_pairs_set
+    if _broker_pairs is not None:
+        return list(_broker_pairs)
+    
     try:
         # First try to get symbols directly from the broker
         available_symbols = get_available_broker_symbols()
@@ -65,7 +89,9 @@ def load_currency_pairs():
         # If we got symbols from the broker, use those
         if available_symbols:
             logger.info(f"Using {len(available_symbols)} symbols from broker")
-            return available_symbols
+            _broker_pairs = available_symbols
+            _broker_pairs_set = frozenset(available_symbols)
+            return list(available_symbols)
         
         # Fallback to default list if broker connection fails
         default_pairs = [
@@ -82,6 +108,13 @@ def load_currency_pairs():
         return ["EURUSD", "GBPUSD", "USDJPY", "XAUUSD"]
 
 
+def clear_currency_pairs_cache():
+    """Forget the cached broker symbols (e.g. after the MT5 connection was lost)"""
+    global _broker_pairs, _broker_pairs_set
+    _broker_pairs = None
+    _broker_pairs_set = frozenset()
+
+
 def validate_currency_pair(pair, available_pairs=None):
     """
     Validate if a currency pair is available for trading
@@ -94,7 +127,11 @@ def validate_currency_pair(pair, available_pairs=None):
         True if valid, False otherwise
     """
     if available_pairs is None:
-        available_pairs = load_currency_pairs()
+        if _broker_pairs is None:
+            available_pairs = load_currency_pairs()
+        if _broker_pairs is not None:
+            # Hashed lookup in the cached broker symbols (no list copy)
+            return pair in _broker_pairs_set
     
     return pair in available_pairs
 
@@ -110,12 +147,19 @@ def get_default_pair(available_pairs=None):
         Default currency pair
     """
     if available_pairs is None:
-        available_pairs = load_currency_pairs()
-    
-    priority_pairs = ["EURUSD", "GBPUSD", "USDJPY", "XAUUSD"]
+        if _broker_pairs is None:
+            available_pairs = load_currency_pairs()
+        if _broker_pairs is not None:
+            # Cached broker symbols: hashed lookups and no list copy
+            available_pairs = _broker_pairs
+            pair_set = _broker_pairs_set
+        else:
+            pair_set = available_pairs
+    else:
+        pair_set = available_pairs
     
-    for pair in priority_pairs:
-        if pair in available_pairs:
+    for pair in _PRIORITY_PAIRS:
+        if pair in pair_set:
             return pair
     
     # If none of the priority pairs are available, return the first available pair
@@ -7,6 +7,7 @@ This module uses Google's Gemini API to:
 3. Provide AI-assisted analysis of market conditions
 """
 import os
+import re
 import json
 import requests
 from typing import Dict, List, Optional, Tuple, Union
@@ -15,6 +16,37 @@ import numpy as np
 from mario_trader.utils.logger import logger
 from mario_trader.config import GEMINI_SETTINGS
 
+# Fenced ```json blocks in Gemini's replies, and any leftover fence markers
+_JSON_BLOCK_RE = re.compile(r'```json\n(.*?)\n```', re.DOTALL)
+_FENCE_RE = re.compile(r'```(json)?')
+
+
+def _extract_json(response: Dict) -> Dict:
+    """
+    Decode the JSON object in the text of a Gemini API response
+    
+    Args:
+        response: Gemini API response
+        
+    Returns:
+        Decoded JSON object
+    """
+    # Extract the text from Gemini's response
+    text = response["candidates"][0]["content"]["parts"][0]["text"]
+    
+    # Use the fenced JSON block if there is one
+    json_match = _JSON_BLOCK_RE.search(text)
+    if json_match:
+        json_text = json_match.group(1)
+    else:
+        json_text = text
+        
+    # Clean up the JSON text
+    json_text = _FENCE_RE.sub('', json_text).strip()
+    
+    return json.loads(json_text)
+
+
 class GeminiEngine:
     """
     Handles integration with Google's Gemini API for trade verification and monitoring
@@ -151,35 +183,32 @@ class GeminiEngine:
             forex_pair: Currency pair symbol
             signal_type: "BUY" or "SELL"
             data: DataFrame with recent price data
-            indicators: Dictionary with current indicator values
+            indicators: Dictionary with current 200_SMA, 50_SMA, 21_SMA and RSI values
             
         Returns:
             Dictionary with market context
         """
-        # Get the most recent candles (last 10)
-        recent_candles = data.iloc[-10:].copy()
+        # Views of the most recent candles (last 10), no copy of the frame
+        recent_open = data['open'].to_numpy()[-10:]
+        recent_close = data['close'].to_numpy()[-10:]
+        recent_high = data['high'].to_numpy()[-10:]
+        recent_low = data['low'].to_numpy()[-10:]
         
-        # Calculate candle patterns
-        candle_pattern = ""
-        for i in range(len(recent_candles)):
-            candle = recent_candles.iloc[i]
-            if candle['close'] > candle['open']:
-                candle_pattern += "+"  # Bullish candle
-            else:
-                candle_pattern += "-"  # Bearish candle
+        # Calculate candle patterns: "+" bullish, "-" bearish
+        candle_pattern = "".join(np.where(recent_close > recent_open, "+", "-"))
         
         # Prepare market context
         context = {
             "forex_pair": forex_pair,
             "signal_type": signal_type,
-            "current_price": data.iloc[-1]['close'],
-            "sma_200": indicators.get("200_SMA", data.iloc[-1].get('200_SMA', 0)),
-            "sma_50": indicators.get("50_SMA", data.iloc[-1].get('50_SMA', 0)),
-            "sma_21": indicators.get("21_SMA", data.iloc[-1].get('21_SMA', 0)),
-            "rsi": indicators.get("RSI", data.iloc[-1].get('RSI', 0)),
+            "current_price": recent_close[-1],
+            "sma_200": indicators["200_SMA"],
+            "sma_50": indicators["50_SMA"],
+            "sma_21": indicators["21_SMA"],
+            "rsi": indicators["RSI"],
             "candle_pattern": candle_pattern,
-            "market_volatility": data['high'].iloc[-10:].max() - data['low'].iloc[-10:].min(),
-            "daily_range_pips": (data['high'].iloc[-1] - data['low'].iloc[-1]) * 10000,
+            "market_volatility": recent_high.max() - recent_low.min(),
+            "daily_range_pips": (recent_high[-1] - recent_low[-1]) * 10000,
             "market_session": self._determine_market_session(),
         }
         
@@ -361,21 +390,7 @@ Please respond in the following JSON format:
             Tuple of (approved, reason, confidence_score)
         """
         try:
-            # Extract the text from Gemini's response
-            text = response["candidates"][0]["content"]["parts"][0]["text"]
-            
-            # Parse the JSON response
-            import re
-            json_match = re.search(r'```json\n(.*?)\n```', text, re.DOTALL)
-            if json_match:
-                json_text = json_match.group(1)
-            else:
-                json_text = text
-                
-            # Clean up the JSON text
-            json_text = re.sub(r'```(json)?', '', json_text).strip()
-            
-            result = json.loads(json_text)
+            result = _extract_json(response)
             
             approved = result.get("approved", False)
             confidence = float(result.get("confidence", 0.0))
@@ -404,21 +419,7 @@ Please respond in the following JSON format:
             Tuple of (should_exit, reason, confidence_score)
         """
         try:
-            # Extract the text from Gemini's response
-            text = response["candidates"][0]["content"]["parts"][0]["text"]
-            
-            # Parse the JSON response
-            import re
-            json_match = re.search(r'```json\n(.*?)\n```', text, re.DOTALL)
-            if json_match:
-                json_text = json_match.group(1)
-            else:
-                json_text = text
-                
-            # Clean up the JSON text
-            json_text = re.sub(r'```(json)?', '', json_text).strip()
-            
-            result = json.loads(json_text)
+            result = _extract_json(response)
             
             should_exit = result.get("should_exit", False)
             confidence = float(result.get("confidence", 0.0))
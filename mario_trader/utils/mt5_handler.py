@@ -4,6 +4,7 @@ MetaTrader 5 operations handler
 import MetaTrader5 as mt5
 import pandas as pd
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from mario_trader.config import TRADING_SETTINGS, ORDER_SETTINGS
 from mario_trader.utils.logger import logger, log_error
@@ -28,13 +29,13 @@ def initialize_mt5(login, password, server):
     max_retries = 3
     for attempt in range(1, max_retries + 1):
         try:
-            logger.info(f"Attempting to initialize MT5 (attempt {attempt}/{max_retries})")
-            logger.info(f"Login: {login}, Server: {server}")
+            logger.info("Attempting to initialize MT5 (attempt %s/%s)", attempt, max_retries)
+            logger.info("Login: %s, Server: %s", login, server)
             
             # Try to initialize without login first to check terminal
             if not mt5.initialize():
                 error = mt5.last_error()
-                logger.error(f"Failed to initialize MT5 terminal: {error}")
+                logger.error("Failed to initialize MT5 terminal: %s", error)
                 
                 # Check if the error is related to MT5 not being found
                 if error[0] == -10003 and "MetaTrader 5 x64 not found" in error[1]:
@@ -54,31 +55,31 @@ def initialize_mt5(login, password, server):
             # Now try to initialize with login credentials
             if not mt5.initialize(login=login, password=password, server=server):
                 error = mt5.last_error()
-                logger.error(f"Failed to initialize MT5 with credentials (attempt {attempt}/{max_retries}): {error}")
+                logger.error("Failed to initialize MT5 with credentials (attempt %s/%s): %s", attempt, max_retries, error)
                 
                 if attempt < max_retries:
                     time.sleep(2)  # Wait before retrying
                     continue
                 return False
             
-            logger.info(f"MT5 initialized successfully. Version: {mt5.version()}")
+            logger.info("MT5 initialized successfully. Version: %s", mt5.version())
             
             # Verify account connection
             account_info = mt5.account_info()
             if account_info is None:
                 error = mt5.last_error()
-                logger.error(f"Failed to get account info (attempt {attempt}/{max_retries}): {error}")
+                logger.error("Failed to get account info (attempt %s/%s): %s", attempt, max_retries, error)
                 if attempt < max_retries:
                     time.sleep(2)  # Wait before retrying
                     continue
                 return False
                 
-            logger.info(f"Connected to account: {account_info.login} ({account_info.name})")
-            logger.info(f"Balance: {account_info.balance} {account_info.currency}")
+            logger.info("Connected to account: %s (%s)", account_info.login, account_info.name)
+            logger.info("Balance: %s %s", account_info.balance, account_info.currency)
             return True
             
         except Exception as e:
-            logger.error(f"Error initializing MT5 (attempt {attempt}/{max_retries})", e)
+            log_error(f"Error initializing MT5 (attempt {attempt}/{max_retries})", e)
             if attempt < max_retries:
                 time.sleep(2)  # Wait before retrying
                 continue
@@ -99,9 +100,81 @@ def shutdown_mt5():
         log_error("Error shutting down MT5", e)
 
 
-def fetch_data(pair, timeframe=None, count=None):
+def _resolve_timeframe(timeframe=None):
     """
-    Fetch price data from MetaTrader 5
+    Resolve the MT5 timeframe constant used for fetching candles
+    
+    Args:
+        timeframe: Timeframe string such as "M5" (optional)
+        
+    Returns:
+        MT5 timeframe constant
+    """
+    # Map timeframe string to MT5 timeframe constant
+    timeframe_map = {
+        "M1": mt5.TIMEFRAME_M1,
+        "M5": mt5.TIMEFRAME_M5,
+        "M15": mt5.TIMEFRAME_M15,
+        "M30": mt5.TIMEFRAME_M30,
+        "H1": mt5.TIMEFRAME_H1,
+        "H4": mt5.TIMEFRAME_H4,
+        "D1": mt5.TIMEFRAME_D1,
+        "W1": mt5.TIMEFRAME_W1,
+        "MN1": mt5.TIMEFRAME_MN1
+    }
+    
+    tf = timeframe_map.get(TRADING_SETTINGS["timeframe"], mt5.TIMEFRAME_M5)
+    if timeframe:
+        tf = timeframe_map.get(timeframe, tf)
+    return tf
+
+
+def get_last_bar_time(pair, timeframe=None):
+    """
+    Get the open time of the current (latest) candle
+    
+    Args:
+        pair: Currency pair symbol
+        timeframe: Timeframe string such as "M5" (optional)
+        
+    Returns:
+        Bar open time in seconds since the epoch, or None on failure
+    """
+    rates = mt5.copy_rates_from_pos(pair, _resolve_timeframe(timeframe), 0, 1)
+    if rates is None or len(rates) == 0:
+        return None
+    return int(rates[0]['time'])
+
+
+# Symbols already confirmed to be in Market Watch
+_available_symbols = set()
+
+
+def ensure_symbol(pair):
+    """
+    Make sure a symbol is selected in Market Watch, asking MT5 only the
+    first time (it stays selected)
+    
+    Args:
+        pair: Currency pair symbol
+        
+    Returns:
+        True if the symbol is available, False otherwise
+    """
+    if pair in _available_symbols:
+        return True
+    if mt5.symbol_info(pair) is None:
+        logger.warning("Symbol %s not found, trying to enable it", pair)
+        if not mt5.symbol_select(pair, True):
+            log_error(f"Failed to enable symbol {pair}")
+            return False
+    _available_symbols.add(pair)
+    return True
+
+
+def fetch_rates(pair, timeframe=None, count=None):
+    """
+    Fetch raw candles from MetaTrader 5
     
     Args:
         pair: Currency pair symbol
@@ -109,48 +182,53 @@ def fetch_data(pair, timeframe=None, count=None):
         count: Number of candles to fetch (optional)
         
     Returns:
-        DataFrame with price data
+        NumPy structured array of candles (time, open, high, low, close,
+        tick_volume, spread, real_volume), or None on failure
     """
     try:
-        # Map timeframe string to MT5 timeframe constant
-        timeframe_map = {
-            "M1": mt5.TIMEFRAME_M1,
-            "M5": mt5.TIMEFRAME_M5,
-            "M15": mt5.TIMEFRAME_M15,
-            "M30": mt5.TIMEFRAME_M30,
-            "H1": mt5.TIMEFRAME_H1,
-            "H4": mt5.TIMEFRAME_H4,
-            "D1": mt5.TIMEFRAME_D1,
-            "W1": mt5.TIMEFRAME_W1,
-            "MN1": mt5.TIMEFRAME_MN1
-        }
-        
-        tf = timeframe_map.get(TRADING_SETTINGS["timeframe"], mt5.TIMEFRAME_M5)
-        if timeframe:
-            tf = timeframe_map.get(timeframe, tf)
+        tf = _resolve_timeframe(timeframe)
             
         candles_count = count or TRADING_SETTINGS["candles_count"]
         
         # Ensure the symbol is available
-        symbol_info = mt5.symbol_info(pair)
-        if symbol_info is None:
-            logger.warning(f"Symbol {pair} not found, trying to enable it")
-            if not mt5.symbol_select(pair, True):
-                log_error(f"Failed to enable symbol {pair}")
-                return None
+        if not ensure_symbol(pair):
+            return None
         
         # Fetch the data
         rates = mt5.copy_rates_from_pos(pair, tf, 0, candles_count)
         if rates is None or len(rates) == 0:
+            # Check the symbol again next time
+            _available_symbols.discard(pair)
             log_error(f"Failed to fetch data for {pair}")
             return None
-            
-        # Convert to DataFrame
-        df = pd.DataFrame(rates)
-        df['time'] = pd.to_datetime(df['time'], unit='s')
-        df.set_index('time', inplace=True)
         
-        return df
+        return rates
+        
+    except Exception as e:
+        log_error(f"Error fetching data for {pair}", e)
+        return None
+
+
+def fetch_data(pair, timeframe=None, count=None):
+    """
+    Fetch price data from MetaTrader 5
+    
+    Args:
+        pair: Currency pair symbol
+        timeframe: MT5 timeframe constant (optional)
+        count: Number of candles to fetch (optional)
+        
+    Returns:
+        DataFrame with price data
+    """
+    rates = fetch_rates(pair, timeframe, count)
+    if rates is None:
+        return None
+    
+    try:
+        # Build the columns straight from the record array, indexed by bar time
+        index = pd.DatetimeIndex(pd.to_datetime(rates['time'], unit='s'), name='time')
+        return pd.DataFrame({name: rates[name] for name in rates.dtype.names if name != 'time'}, index=index)
         
     except Exception as e:
         log_error(f"Error fetching data for {pair}", e)
@@ -232,7 +310,7 @@ def get_current_price(symbol, price_type='close'):
         return None
 
 
-def open_trade(symbol, volume, stop_loss, trade_type, price=None):
+def open_trade(symbol, volume, stop_loss, trade_type, price=None, tick=None):
     """
     Open a trade
     
@@ -242,17 +320,12 @@ def open_trade(symbol, volume, stop_loss, trade_type, price=None):
         stop_loss: Stop loss price
         trade_type: Trade type ('buy', 'sell', 'buy_stop', 'sell_stop')
         price: Price for pending orders (required for buy_stop and sell_stop)
+        tick: Latest tick if the caller already has it (optional, market orders only)
         
     Returns:
         Trade result
     """
     try:
-        # Get current price for market orders
-        tick = mt5.symbol_info_tick(symbol)
-        if tick is None:
-            log_error(f"Failed to get tick for {symbol}")
-            return None
-            
         # Determine order type and price
         if trade_type in ['buy_stop', 'sell_stop']:
             if price is None:
@@ -262,6 +335,12 @@ def open_trade(symbol, volume, stop_loss, trade_type, price=None):
             order_type = mt5.ORDER_TYPE_BUY_STOP if trade_type == 'buy_stop' else mt5.ORDER_TYPE_SELL_STOP
             order_price = price
         else:
+            # Market orders fill at the current price
+            if tick is None:
+                tick = mt5.symbol_info_tick(symbol)
+                if tick is None:
+                    log_error(f"Failed to get tick for {symbol}")
+                    return None
             action = mt5.TRADE_ACTION_DEAL
             order_type = mt5.ORDER_TYPE_BUY if trade_type == 'buy' else mt5.ORDER_TYPE_SELL
             order_price = tick.ask if trade_type == 'buy' else tick.bid
@@ -428,4 +507,78 @@ def close_trade(position_id):
         
     except Exception as e:
         log_error(f"Error closing position {position_id}", e)
-        return False 
\ No newline at end of file
+        return False
+
+
+def close_trades(position_ids):
+    """
+    Close several trades at once
+    
+    Looks the positions up with one positions_get call and one tick per
+    symbol, then sends the close requests concurrently so the round trips
+    to the terminal overlap instead of running one after another.
+    
+    Args:
+        position_ids: Position IDs to close
+        
+    Returns:
+        List of booleans (True if closed) in the order of position_ids
+    """
+    position_ids = [int(position_id) for position_id in position_ids]
+    if not position_ids:
+        return []
+    
+    try:
+        positions = mt5.positions_get()
+        if positions is None:
+            log_error("Failed to get positions for closing")
+            return [False] * len(position_ids)
+        by_ticket = {position.ticket: position for position in positions}
+        
+        ticks = {}
+        requests = []
+        for position_id in position_ids:
+            position = by_ticket.get(position_id)
+            if position is None:
+                log_error(f"Position {position_id} not found")
+                requests.append(None)
+                continue
+            if position.symbol not in ticks:
+                ticks[position.symbol] = mt5.symbol_info_tick(position.symbol)
+            tick = ticks[position.symbol]
+            is_buy = position.type == mt5.ORDER_TYPE_BUY
+            requests.append({
+                "action": mt5.TRADE_ACTION_DEAL,
+                "position": position_id,
+                "symbol": position.symbol,
+                "volume": position.volume,
+                "type": mt5.ORDER_TYPE_SELL if is_buy else mt5.ORDER_TYPE_BUY,
+                "price": tick.bid if is_buy else tick.ask,
+                "deviation": ORDER_SETTINGS["deviation"],
+                "magic": ORDER_SETTINGS["magic_number"],
+                "comment": f"Close {ORDER_SETTINGS['comment']}",
+                "type_time": mt5.ORDER_TIME_GTC,
+                "type_filling": mt5.ORDER_FILLING_IOC,
+            })
+    except Exception as e:
+        log_error("Error preparing close requests", e)
+        return [False] * len(position_ids)
+    
+    def send(request):
+        if request is None:
+            return False
+        try:
+            result = mt5.order_send(request)
+        except Exception as e:
+            log_error(f"Error closing position {request['position']}", e)
+            return False
+        if result is None:
+            log_error(f"Failed to close position {request['position']}")
+            return False
+        if result.retcode != mt5.TRADE_RETCODE_DONE:
+            log_error(f"Close failed: {result.comment} (code: {result.retcode})")
+            return False
+        return True
+    
+    with ThreadPoolExecutor(max_workers=min(len(requests), 8)) as executor:
+        return list(executor.map(send, requests))
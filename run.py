@@ -43,7 +43,10 @@ def run():
     elif args.command == 'test':
         # Run the test script
         import unittest
-        from test_bot import TestCurrencyPairs, TestIndicators, TestSignalGeneration
+        from test_bot import (
+            TestCurrencyPairs, TestIndicators, TestSignalGeneration, TestBars, TestTradeLevels,
+            TestModifyPositions, TestContingencyStopPrices
+        )
         
         # Create a test loader
         loader = unittest.TestLoader()
@@ -53,6 +56,10 @@ def run():
         suite.addTest(loader.loadTestsFromTestCase(TestCurrencyPairs))
         suite.addTest(loader.loadTestsFromTestCase(TestIndicators))
         suite.addTest(loader.loadTestsFromTestCase(TestSignalGeneration))
+        suite.addTest(loader.loadTestsFromTestCase(TestBars))
+        suite.addTest(loader.loadTestsFromTestCase(TestTradeLevels))
+        suite.addTest(loader.loadTestsFromTestCase(TestModifyPositions))
+        suite.addTest(loader.loadTestsFromTestCase(TestContingencyStopPrices))
         
         # Run the tests
         runner = unittest.TextTestRunner()
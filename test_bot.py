@@ -19,9 +19,26 @@ except ImportError:
     sys.modules['MetaTrader5'] = MagicMock()
     print("Warning: MetaTrader5 module not found. Using mock module for testing.")
 
-from mario_trader.utils.currency_pairs import load_currency_pairs, validate_currency_pair
-from mario_trader.indicators.technical import calculate_rsi, calculate_indicators
+from mario_trader.config import INDICATOR_SETTINGS, TRADING_SETTINGS
+from mario_trader.utils.currency_pairs import (
+    clear_currency_pairs_cache, get_default_pair, load_currency_pairs, validate_currency_pair
+)
+from mario_trader.utils.mt5_handler import close_trades
+from mario_trader.indicators.technical import (
+    _crossed_200, calculate_rsi, calculate_indicators, calculate_indicators_batch, detect_support_resistance,
+    detect_rsi_divergence, find_nearest_level, find_support_levels, find_resistance_levels,
+    reuse_indicators, IndicatorState, RSIState, SRState
+)
 from mario_trader.strategies.signal import generate_signal
+from mario_trader.strategies.sma_crossover_strategy import (
+    _detect_signal, check_consecutive_candles, check_price_crossed_200sma_recently,
+    generate_sma_crossover_signal, sma_crossover_signal_batch, sma_crossover_signals
+)
+from mario_trader.execution import (
+    _to_bars, _engulf_scan, _local_confidence, _trade_levels, check_rsi_divergence,
+    modify_positions_sl_tp, validate_and_adjust_price, _contingency_stop_prices, _adjust_stop_price,
+    _place_contingency_stop, _tradable_pairs
+)
 
 
 class TestCurrencyPairs(unittest.TestCase):
@@ -35,6 +52,26 @@ class TestCurrencyPairs(unittest.TestCase):
         self.assertIsInstance(pairs, list)
         self.assertGreater(len(pairs), 0)
         
+    @patch('mario_trader.utils.currency_pairs.get_available_broker_symbols')
+    def test_load_currency_pairs_cached(self, mock_broker_symbols):
+        """Test that broker symbols are fetched once and fallback lists are not cached"""
+        clear_currency_pairs_cache()
+        self.addCleanup(clear_currency_pairs_cache)
+        
+        mock_broker_symbols.return_value = []
+        self.assertIn("EURUSD", load_currency_pairs())
+        mock_broker_symbols.return_value = ["EURUSD", "GBPUSD"]
+        self.assertEqual(load_currency_pairs(), ["EURUSD", "GBPUSD"])
+        self.assertEqual(load_currency_pairs(), ["EURUSD", "GBPUSD"])
+        self.assertEqual(mock_broker_symbols.call_count, 2)
+        self.assertTrue(validate_currency_pair("GBPUSD"))
+        self.assertFalse(validate_currency_pair("USDJPY"))
+        self.assertEqual(get_default_pair(), "EURUSD")
+        
+        clear_currency_pairs_cache()
+        load_currency_pairs()
+        self.assertEqual(mock_broker_symbols.call_count, 3)
+    
     def test_validate_currency_pair(self):
         """Test validating currency pairs"""
         pairs = ["EURUSD", "GBPUSD", "USDJPY"]
@@ -42,6 +79,31 @@ class TestCurrencyPairs(unittest.TestCase):
         self.assertTrue(validate_currency_pair("EURUSD", pairs))
         # Test an invalid pair
         self.assertFalse(validate_currency_pair("INVALID", pairs))
+    
+    @patch.dict('mario_trader.execution._disabled_until', clear=True)
+    @patch('mario_trader.utils.mt5_handler._available_symbols', new_callable=set)
+    @patch('mario_trader.utils.mt5_handler.mt5')
+    def test_tradable_pairs(self, mock_mt5, available_symbols):
+        """Test that pair filtering shares ensure_symbol's cache and backs off failed symbols"""
+        mock_mt5.symbol_info.side_effect = lambda pair: None if pair == "BADPAIR" else MagicMock()
+        mock_mt5.symbol_select.return_value = False
+        pairs = ["EURUSD", "BADPAIR", "GBPUSD"]
+        
+        self.assertEqual(_tradable_pairs(pairs, 1000), ["EURUSD", "GBPUSD"])
+        self.assertEqual(available_symbols, {"EURUSD", "GBPUSD"})
+        
+        # A failed symbol is not retried before symbol_retry_delay passes
+        self.assertEqual(_tradable_pairs(pairs, 1001), ["EURUSD", "GBPUSD"])
+        self.assertEqual(mock_mt5.symbol_select.call_count, 1)
+        
+        # A symbol dropped by a failed fetch is checked again
+        available_symbols.discard("GBPUSD")
+        mock_mt5.symbol_info.reset_mock()
+        _tradable_pairs(pairs, 1002)
+        mock_mt5.symbol_info.assert_called_once_with("GBPUSD")
+        
+        mock_mt5.symbol_select.return_value = True
+        self.assertEqual(_tradable_pairs(pairs, 1000 + TRADING_SETTINGS["symbol_retry_delay"]), pairs)
 
 
 class TestIndicators(unittest.TestCase):
@@ -80,6 +142,159 @@ class TestIndicators(unittest.TestCase):
         self.assertIn('21_SMA', df_with_indicators.columns)
         self.assertIn('50_SMA', df_with_indicators.columns)
         self.assertIn('RSI', df_with_indicators.columns)
+    
+    def test_calculate_indicators_batch(self):
+        """Test that batched indicators match per-frame calculation"""
+        frames = [self.df.copy(), (self.df * 1.5).copy(), self.df.iloc[:60].copy(), None]
+        expected = [calculate_indicators(df.copy()) for df in frames if df is not None]
+        calculate_indicators_batch(frames)
+        for actual, df in zip(frames, expected):
+            for column in ('200_SMA', '21_SMA', '50_SMA', 'RSI'):
+                np.testing.assert_allclose(actual[column], df[column])
+    
+    def test_calculate_indicators_reuses_computed_columns(self):
+        """Test that indicators are only recomputed when the candles change"""
+        df = calculate_indicators(self.df.copy())
+        with patch('mario_trader.indicators.technical._rsi_array') as mock_rsi:
+            self.assertIs(calculate_indicators(df), df)
+            mock_rsi.assert_not_called()
+        
+        df.iloc[-1, df.columns.get_loc('close')] += 1.0
+        expected = calculate_rsi(df)
+        np.testing.assert_allclose(calculate_indicators(df)['RSI'], expected)
+    
+    def test_reuse_indicators(self):
+        """Test that indicators carried over from the previous cycle match a full calculation"""
+        previous = calculate_indicators(self.df.copy())
+        df = self.df.copy()
+        df.iloc[-1, df.columns.get_loc('close')] += 1.0
+        self.assertTrue(reuse_indicators(df, previous))
+        expected = calculate_indicators(self.df.copy().assign(close=df['close']))
+        for column in ('200_SMA', '21_SMA', '50_SMA', 'RSI'):
+            np.testing.assert_allclose(df[column], expected[column])
+        np.testing.assert_array_equal(df['200_SMA_cross'], expected['200_SMA_cross'])
+        
+        # A new bar slides the window by one candle
+        previous = calculate_indicators(self.df.iloc[:-1].copy())
+        df = self.df.iloc[1:].copy()
+        self.assertTrue(reuse_indicators(df, previous))
+        expected = calculate_indicators(self.df.iloc[1:].copy())
+        for column in ('200_SMA', '21_SMA', '50_SMA', 'RSI'):
+            np.testing.assert_allclose(df[column], expected[column])
+        np.testing.assert_array_equal(df['200_SMA_cross'], expected['200_SMA_cross'])
+        
+        # Missed bars need a full calculation
+        previous = calculate_indicators(self.df.iloc[:-2].copy())
+        self.assertFalse(reuse_indicators(self.df.iloc[2:].copy(), previous))
+    
+    def test_calculate_indicators_float32(self):
+        """Test that float32 indicators stay close to the float64 ones"""
+        expected = calculate_indicators(self.df.copy())
+        with patch.dict(INDICATOR_SETTINGS, {"float32": True}):
+            actual = calculate_indicators(self.df.copy())
+        for column in ('close', '21_SMA', '50_SMA', 'RSI'):
+            self.assertEqual(actual[column].dtype, np.float32)
+            np.testing.assert_allclose(actual[column], expected[column], rtol=1e-5)
+    
+    def test_support_resistance_levels_sorted(self):
+        """Test that support/resistance finders return ascending arrays"""
+        wave = 100 + 5 * np.sin(np.linspace(0, 12 * np.pi, 100))
+        df = self.df.assign(high=wave + 1, low=wave - 1, close=wave)
+        levels = detect_support_resistance(df)
+        support = find_support_levels(df)
+        resistance = find_resistance_levels(df)
+        self.assertIsInstance(support, np.ndarray)
+        self.assertTrue(len(support) > 0 and len(resistance) > 0)
+        np.testing.assert_array_equal(support, sorted(levels['support']))
+        np.testing.assert_array_equal(resistance, sorted(levels['resistance']))
+        # Nearest support below a price via searchsorted
+        price = 100.0
+        idx = np.searchsorted(support, price) - 1
+        self.assertEqual(support[idx], max(l for l in support if l < price))
+        self.assertEqual(find_nearest_level(price, levels, "BUY"), support[idx])
+        self.assertEqual(find_nearest_level(price, levels, "SELL"),
+                         min(l for l in resistance if l > price))
+    
+    def test_sr_state_matches_full_recompute(self):
+        """Test that incrementally maintained levels match the full detection"""
+        dates = pd.date_range('2023-01-01', periods=300, freq='5min')
+        base = np.round(1.1 + np.random.normal(0, 0.0005, 300).cumsum(), 4)
+        df = pd.DataFrame({'high': base + 0.0003, 'low': base - 0.0003}, index=dates)
+        
+        state = SRState.from_frame(df.iloc[:120], window=5)
+        for end in range(121, 301):
+            # Forming bar first, then the closed bar
+            forming = df.iloc[end - 2:end].copy()
+            forming.iloc[-1] += [0.0004, -0.0004]
+            self.assertTrue(state.update_from_frame(forming))
+            self.assertTrue(state.update_from_frame(df.iloc[end - 2:end]))
+            
+            window = df.iloc[end - 120:end]
+            np.testing.assert_array_equal(state.support, find_support_levels(window, window=5))
+            np.testing.assert_array_equal(state.resistance, find_resistance_levels(window, window=5))
+        
+        levels = state.levels()
+        expected = detect_support_resistance(df.iloc[-120:], window=5)
+        np.testing.assert_array_equal(levels['support'], expected['support'])
+        np.testing.assert_array_equal(levels['resistance'], expected['resistance'])
+    
+    def test_indicator_state_matches_full_recompute(self):
+        """Test that incremental indicator updates match calculate_indicators"""
+        dates = pd.date_range('2023-01-01', periods=260, freq='5min')
+        closes = 1.1 + np.random.normal(0, 0.001, 260).cumsum()
+        df = pd.DataFrame({'close': closes}, index=dates)
+        
+        state = IndicatorState.from_frame(df.iloc[:220])
+        for end in range(221, 261):
+            # Forming bar ticks first, then the bar closes at its final price
+            forming = df.iloc[end - 2:end].copy()
+            forming.iloc[-1, 0] += 0.0005
+            self.assertTrue(state.update_from_frame(forming))
+            self.assertTrue(state.update_from_frame(df.iloc[end - 2:end]))
+            
+            expected = calculate_indicators(df.iloc[end - 200:end].copy())
+            latest = expected.iloc[-1]
+            for period in (21, 50, 200):
+                self.assertAlmostEqual(state.sma(period), latest[f'{period}_SMA'], places=10)
+            self.assertAlmostEqual(state.rsi, latest['RSI'], places=8)
+            self.assertEqual(state.rsi_divergence(), detect_rsi_divergence(df.iloc[end - 200:end].copy()))
+        
+        # A gap in the bars means the state has to be rebuilt
+        self.assertFalse(state.update_from_frame(df.iloc[-1:].set_axis(dates[-1:] + pd.Timedelta('1h'))))
+    
+    def test_rsi_divergence_ignores_open_bar(self):
+        """Test that divergence only depends on closed bars, so it can be computed once per bar"""
+        dates = pd.date_range('2023-01-01', periods=60, freq='5min')
+        closes = 1.1 + np.random.normal(0, 0.001, 60).cumsum()
+        df = pd.DataFrame({'close': closes}, index=dates)
+        state = IndicatorState.from_frame(df)
+        expected = state.rsi_divergence()
+        for move in (-0.01, 0.01):
+            state.update(state.bar_time, closes[-1] + move)
+            self.assertEqual(state.rsi_divergence(), expected)
+            moved = df.copy()
+            moved.iloc[-1, 0] += move
+            self.assertEqual(detect_rsi_divergence(moved), expected)
+    
+    def test_wilder_rsi_state_matches_full_recompute(self):
+        """Test that the Wilder RSI state matches the vectorized Wilder RSI"""
+        closes = self.df['close'].to_numpy()
+        with patch.dict(INDICATOR_SETTINGS, {"rsi_method": "wilder"}):
+            expected = calculate_rsi(self.df).to_numpy()
+            state = IndicatorState.from_frame(self.df)
+        
+        rsi_state = RSIState(14)
+        values = [rsi_state.update(close) for close in closes]
+        np.testing.assert_allclose(values, expected)
+        self.assertAlmostEqual(state.rsi, expected[-1])
+        
+        # Replacing the forming bar's close is the same as updating with it
+        rsi_state.update(closes[-1] + 3.0)
+        replaced = rsi_state.replace_last(closes[-1] - 2.0)
+        fresh = RSIState(14)
+        for close in list(closes) + [closes[-1] - 2.0]:
+            fresh.update(close)
+        self.assertAlmostEqual(replaced, fresh.value)
 
 
 class TestSignalGeneration(unittest.TestCase):
@@ -121,6 +336,304 @@ class TestSignalGeneration(unittest.TestCase):
         
         # Price should be the last close price
         self.assertEqual(price, df['close'].iloc[-1])
+    
+    def test_price_crossed_200sma_recently(self):
+        """Test 200 SMA cross detection within the lookback window"""
+        sma = np.full(12, 100.0)
+        cases = [
+            (np.r_[np.full(8, 99.0), np.full(4, 101.0)], True),   # crossed above
+            (np.r_[np.full(8, 101.0), np.full(4, 99.0)], True),   # crossed below
+            (np.full(12, 101.0), False),                           # stayed above
+            (np.r_[np.full(8, 99.0), 100.0, np.full(3, 99.0)], False),  # touched, no cross
+            (np.r_[99.0, np.full(11, 101.0)], False),              # crossed before the window
+            (np.r_[99.0, 99.0, np.full(10, 101.0)], False),        # crossed into the window's first candle
+            (np.r_[np.full(3, 99.0), np.full(9, 101.0)], True),    # crossed between its first two candles
+        ]
+        for closes, expected in cases:
+            df = pd.DataFrame({'close': closes, '200_SMA': sma})
+            self.assertEqual(check_price_crossed_200sma_recently(df), expected)
+            
+            # Crosses precomputed by calculate_indicators give the same answer
+            df['200_SMA_cross'] = _crossed_200(closes, sma)
+            self.assertEqual(check_price_crossed_200sma_recently(df), expected)
+    
+    def test_check_consecutive_candles(self):
+        """Test the run-then-reversal candle pattern"""
+        cases = [
+            ([-1, -1, -1, 1], -1, True),      # 3 sells then a buy
+            ([1, 1, 1, -1], 1, True),         # 3 buys then a sell
+            ([-1, -1, -1, -1, 1], -1, True),  # longer runs count too
+            ([1, -1, -1, 1], -1, False),      # run too short
+            ([-1, -1, -1, 1], 1, False),      # wrong direction
+            ([-1, -1, 1], -1, False),         # not enough candles
+        ]
+        for directions, direction, expected in cases:
+            closes = np.array(directions, dtype=float)
+            df = pd.DataFrame({'open': np.zeros(len(closes)), 'close': closes})
+            self.assertEqual(check_consecutive_candles(df, direction, 3), expected)
+            self.assertNotIn('direction', df.columns)
+    
+    def test_sma_crossover_signals_match_per_bar(self):
+        """Test that the vectorized signals match the signal of each bar"""
+        np.random.seed(1)
+        close_prices = 100 + np.random.normal(0, 0.3, 260).cumsum()
+        open_prices = close_prices - np.sign(np.sin(np.arange(260) * 1.3)) * 0.1
+        df = pd.DataFrame({
+            'open': open_prices,
+            'high': np.maximum(open_prices, close_prices) + 0.1,
+            'low': np.minimum(open_prices, close_prices) - 0.1,
+            'close': close_prices
+        }, index=pd.date_range('2023-01-01', periods=260, freq='5min'))
+        
+        signals, stop_losses = sma_crossover_signals(df.copy())
+        self.assertTrue(np.any(signals == 1) and np.any(signals == -1))
+        for end in range(200, len(df) + 1):
+            signal, stop_loss, _ = generate_sma_crossover_signal(df.iloc[:end].copy(), "EURUSD")
+            self.assertEqual(signal, signals[end - 1])
+            self.assertAlmostEqual(stop_loss, stop_losses[end - 1])
+        
+        # The logged per-condition path makes the same decisions
+        with patch.dict(TRADING_SETTINGS, {"log_signal_checks": True}):
+            for end in range(200, len(df) + 1):
+                signal, stop_loss, _ = generate_sma_crossover_signal(df.iloc[:end].copy(), "EURUSD")
+                self.assertEqual(signal, signals[end - 1])
+                self.assertAlmostEqual(stop_loss, stop_losses[end - 1])
+        
+        # Indicators calculated up front give the same signal
+        ready = calculate_indicators(df.copy())
+        self.assertEqual(generate_sma_crossover_signal(ready, "EURUSD", indicators_ready=True),
+                         generate_sma_crossover_signal(df.copy(), "EURUSD"))
+    
+    def test_sma_crossover_signals_short_input(self):
+        """Test that frames of 1-3 bars give no signals instead of failing"""
+        for n in (1, 2, 3):
+            df = pd.DataFrame({
+                'open': np.full(n, 100.0),
+                'high': np.full(n, 101.0),
+                'low': np.full(n, 99.0),
+                'close': np.full(n, 100.5)
+            }, index=pd.date_range('2023-01-01', periods=n, freq='5min'))
+            signals, stop_losses = sma_crossover_signals(df.copy())
+            np.testing.assert_array_equal(signals, np.zeros(n))
+            np.testing.assert_array_equal(stop_losses, np.zeros(n))
+            self.assertEqual(generate_sma_crossover_signal(df.copy(), "EURUSD")[:2], (0, 0))
+    
+    def test_detect_signal_matches_vectorized_signals(self):
+        """Test that the single-pass signal kernel matches the vectorized signals"""
+        np.random.seed(1)
+        close_prices = 100 + np.random.normal(0, 0.3, 260).cumsum()
+        open_prices = close_prices - np.sign(np.sin(np.arange(260) * 1.3)) * 0.1
+        df = calculate_indicators(pd.DataFrame({
+            'open': open_prices,
+            'high': np.maximum(open_prices, close_prices) + 0.1,
+            'low': np.minimum(open_prices, close_prices) - 0.1,
+            'close': close_prices
+        }, index=pd.date_range('2023-01-01', periods=260, freq='5min')))
+        
+        signals, stop_losses = sma_crossover_signals(df)
+        columns = [df[column].to_numpy() for column in ('close', 'open', '200_SMA', '21_SMA', '50_SMA', 'RSI')]
+        for end in range(1, len(df) + 1):
+            signal, stop_loss = _detect_signal(*(values[:end] for values in columns))
+            self.assertEqual(signal, signals[end - 1])
+            self.assertAlmostEqual(stop_loss, stop_losses[end - 1])
+    
+    def test_sma_crossover_signal_batch(self):
+        """Test that the batched latest-bar signals match each frame's signal"""
+        np.random.seed(1)
+        close_prices = 100 + np.random.normal(0, 0.3, 260).cumsum()
+        open_prices = close_prices - np.sign(np.sin(np.arange(260) * 1.3)) * 0.1
+        df = pd.DataFrame({
+            'open': open_prices,
+            'high': np.maximum(open_prices, close_prices) + 0.1,
+            'low': np.minimum(open_prices, close_prices) - 0.1,
+            'close': close_prices
+        }, index=pd.date_range('2023-01-01', periods=260, freq='5min'))
+        
+        signals, stop_losses = sma_crossover_signals(df.copy())
+        ends = [2] + list(range(200, len(df) + 1))
+        batch_signals, batch_stop_losses = sma_crossover_signal_batch([df.iloc[:end].copy() for end in ends])
+        np.testing.assert_array_equal(batch_signals, signals[np.array(ends) - 1])
+        np.testing.assert_allclose(batch_stop_losses, stop_losses[np.array(ends) - 1])
+
+
+class TestBars(unittest.TestCase):
+    """Test the struct-of-arrays view used by the execution module"""
+    
+    def setUp(self):
+        """Set up test data"""
+        np.random.seed(42)
+        dates = pd.date_range('2023-01-01', periods=250)
+        close_prices = 100 + np.random.normal(0, 1, 250).cumsum()
+        self.df = calculate_indicators(pd.DataFrame({
+            'open': close_prices - np.random.normal(0, 1, 250),
+            'high': close_prices + np.random.normal(1, 0.5, 250),
+            'low': close_prices - np.random.normal(1, 0.5, 250),
+            'close': close_prices,
+        }, index=dates))
+    
+    def test_to_bars(self):
+        """Test that Bars mirrors the DataFrame columns"""
+        bars = _to_bars(self.df)
+        self.assertEqual(len(bars), len(self.df))
+        self.assertEqual(bars.close[-1], self.df['close'].iloc[-1])
+        self.assertEqual(bars.sma21[-1], self.df['21_SMA'].iloc[-1])
+        self.assertEqual(bars.rsi[-1], self.df['RSI'].iloc[-1])
+        # Passing a Bars object through again is a no-op
+        self.assertIs(_to_bars(bars), bars)
+    
+    def test_to_bars_requires_indicators(self):
+        """Test that Bars cannot be built before calculate_indicators"""
+        with self.assertRaises(ValueError):
+            _to_bars(self.df[['open', 'high', 'low', 'close']])
+    
+    def test_rsi_divergence_accepts_dataframe_and_bars(self):
+        """Test that RSI divergence gives the same answer for both inputs"""
+        bars = _to_bars(self.df)
+        for position_type in ("BUY", "SELL"):
+            self.assertEqual(check_rsi_divergence(self.df, position_type),
+                             check_rsi_divergence(bars, position_type))
+    
+    def test_engulf_scan(self):
+        """Test the entry pattern scan on a hand-built bullish setup"""
+        df = self.df.iloc[-4:].copy()
+        df['high'] = [1.12, 1.11, 1.10, 1.09]
+        df['low'] = [1.05, 1.04, 1.03, 1.02]
+        df['open'] = [1.09, 1.08, 1.07, 1.03]
+        df['close'] = [1.08, 1.07, 1.04, 1.08]
+        df['RSI'] = 60.0
+        self.assertEqual(_engulf_scan(_to_bars(df)), 1)
+        df['RSI'] = 40.0
+        self.assertEqual(_engulf_scan(_to_bars(df)), 0)
+    
+    def test_local_confidence(self):
+        """Test the local pre-verification score"""
+        df = self.df.copy()
+        df['RSI'] = 75.0
+        df['21_SMA'] = np.linspace(1.0, 2.0, len(df))
+        df['50_SMA'] = np.linspace(1.0, 1.5, len(df))
+        self.assertEqual(_local_confidence(_to_bars(df), 1), 1.0)
+        self.assertEqual(_local_confidence(_to_bars(df), -1), 0.0)
+
+
+
+class TestTradeLevels(unittest.TestCase):
+    """Test trade level arithmetic"""
+    
+    def test_trade_levels_match_original_formulas(self):
+        """Test that the cached distance gives the same levels as the inline formulas"""
+        entry, sma_21 = 1.10250, 1.10100
+        
+        buy = _trade_levels(entry, sma_21, 1)
+        self.assertEqual(buy["take_profit"], entry + abs(entry - sma_21) * 2)
+        self.assertEqual(buy["pending_stop_loss"], sma_21 + (abs(entry - sma_21) * 3))
+        self.assertEqual(buy["pending_take_profit"], sma_21 - (abs(entry - sma_21) * 2))
+        
+        sell = _trade_levels(sma_21, entry, -1)
+        self.assertEqual(sell["take_profit"], sma_21 - abs(sma_21 - entry) * 2)
+        self.assertEqual(sell["pending_stop_loss"], entry - (abs(sma_21 - entry) * 3))
+        self.assertEqual(sell["pending_take_profit"], entry + (abs(sma_21 - entry) * 2))
+
+
+class TestModifyPositions(unittest.TestCase):
+    """Test batched SL/TP modification and closing"""
+    
+    @patch('mario_trader.execution.mt5')
+    def test_modify_positions_sl_tp(self, mock_mt5):
+        """Test that positions are looked up once and results keep their order"""
+        mock_mt5.positions_get.return_value = [
+            MagicMock(ticket=1, magic=234000),
+            MagicMock(ticket=2, magic=234000),
+        ]
+        mock_mt5.order_send.side_effect = lambda request: MagicMock(
+            retcode=mock_mt5.TRADE_RETCODE_DONE if request["position"] == 1 else -1,
+            comment="rejected"
+        )
+        
+        results = modify_positions_sl_tp("EURUSD", [(1, 1.1, 1.2), (2, 1.1, None), (3, None, 1.2)])
+        
+        self.assertEqual(results, [True, False, False])
+        mock_mt5.positions_get.assert_called_once_with(symbol="EURUSD")
+        self.assertEqual(mock_mt5.order_send.call_count, 2)
+        for call in mock_mt5.order_send.call_args_list:
+            request = call.args[0]
+            if request["position"] == 2:
+                self.assertNotIn("tp", request)
+
+    
+    @patch('mario_trader.utils.mt5_handler.mt5')
+    def test_close_trades(self, mock_mt5):
+        """Test that trades are closed with one position lookup and results keep their order"""
+        mock_mt5.ORDER_TYPE_BUY = 0
+        mock_mt5.ORDER_TYPE_SELL = 1
+        mock_mt5.positions_get.return_value = [
+            MagicMock(ticket=1, symbol="EURUSD", type=0, volume=0.1),
+            MagicMock(ticket=2, symbol="EURUSD", type=1, volume=0.2),
+        ]
+        mock_mt5.symbol_info_tick.return_value = MagicMock(bid=1.1, ask=1.2)
+        mock_mt5.order_send.return_value = MagicMock(retcode=mock_mt5.TRADE_RETCODE_DONE)
+        
+        self.assertEqual(close_trades([2, 3, 1]), [True, False, True])
+        mock_mt5.positions_get.assert_called_once_with()
+        mock_mt5.symbol_info_tick.assert_called_once_with("EURUSD")
+        requests = {call.args[0]["position"]: call.args[0] for call in mock_mt5.order_send.call_args_list}
+        self.assertEqual(requests[1]["type"], mock_mt5.ORDER_TYPE_SELL)
+        self.assertEqual(requests[2]["price"], 1.2)
+
+class TestContingencyStopPrices(unittest.TestCase):
+    """Test the fused contingency price validation"""
+    
+    @patch('mario_trader.execution.mt5')
+    def test_matches_validate_and_adjust_price(self, mock_mt5):
+        """Test that the fused path gives the same prices as three separate validations"""
+        cases = [
+            ("EURUSD", 1.10253, 0.00123, MagicMock(trade_tick_size=0.00001, trade_stops_level=10, point=0.00001)),
+            ("USDJPY", 151.237, 0.154, MagicMock(trade_tick_size=0.001, trade_stops_level=10, point=0.001)),
+            ("XAUUSD", 2351.37, 0.05, MagicMock(trade_tick_size=0.01, trade_stops_level=50, point=0.01)),
+        ]
+        for forex_pair, entry, distance, symbol_info in cases:
+            mock_mt5.symbol_info.return_value = symbol_info
+            mock_mt5.symbol_info_tick.return_value = MagicMock(bid=entry)
+            for order_type, direction in (("BUY_STOP", 1), ("SELL_STOP", -1)):
+                _, expected_entry = validate_and_adjust_price(forex_pair, entry, "ENTRY")
+                _, expected_sl = validate_and_adjust_price(
+                    forex_pair, entry - direction * (distance * 3), "STOP_LOSS", expected_entry, order_type)
+                _, expected_tp = validate_and_adjust_price(
+                    forex_pair, entry + direction * (distance * 2), "TAKE_PROFIT", expected_entry, order_type)
+                
+                prices = _contingency_stop_prices(forex_pair, order_type, entry, distance, symbol_info)
+                np.testing.assert_allclose(prices, (expected_entry, expected_sl, expected_tp), rtol=0, atol=1e-9)
+    
+    @patch('mario_trader.execution.mt5')
+    def test_adjust_stop_price_matches_validator(self, mock_mt5):
+        """Test the inline SL/TP rounding against validate_and_adjust_price"""
+        symbol_info = MagicMock(trade_tick_size=0.01, trade_stops_level=50, point=0.01, digits=2)
+        mock_mt5.symbol_info.return_value = symbol_info
+        base = 2351.37
+        # Far from the base price (fast path) and too close (validator fallback)
+        for offset in (5.123, 0.2):
+            for price_type, order_type, sign in (("STOP_LOSS", "BUY", -1), ("TAKE_PROFIT", "BUY", 1),
+                                                 ("STOP_LOSS", "SELL", 1), ("TAKE_PROFIT", "SELL", -1)):
+                price = base + sign * offset
+                expected = validate_and_adjust_price("XAUUSD", price, price_type, base, order_type)
+                actual = _adjust_stop_price("XAUUSD", price, price_type, base, order_type, symbol_info)
+                self.assertEqual(actual[0], expected[0])
+                self.assertAlmostEqual(actual[1], expected[1], places=9)
+    
+    @patch('mario_trader.execution.set_pending_order')
+    @patch('mario_trader.execution._contingency_stop_prices', return_value=(1.1, 1.09, 1.12))
+    @patch('mario_trader.execution.mt5')
+    def test_entry_stop_placed_beside_21sma_stop(self, mock_mt5, mock_prices, mock_set_pending_order):
+        """Test that the pending 21 SMA contingency order does not block the stop at the entry"""
+        contingency_info = {"initial_entry": 1.1, "initial_lot_size": 0.1, "total_trades": 1}
+        mock_mt5.orders_get.return_value = [MagicMock(comment="Contingency SELL STOP")]
+        self.assertTrue(_place_contingency_stop("EURUSD", "SELL_STOP", contingency_info, 0.001, MagicMock()))
+        self.assertEqual(mock_set_pending_order.call_args.kwargs["comment"], "Contingency SELL STOP @entry")
+        self.assertEqual(contingency_info["total_trades"], 2)
+        
+        # The same order is not placed twice
+        mock_mt5.orders_get.return_value.append(MagicMock(comment="Contingency SELL STOP @entry"))
+        self.assertFalse(_place_contingency_stop("EURUSD", "SELL_STOP", contingency_info, 0.001, MagicMock()))
+        self.assertEqual(mock_set_pending_order.call_count, 1)
 
 
 if __name__ == '__main__':
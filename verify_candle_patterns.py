@@ -27,7 +27,7 @@ def create_test_data(pattern):
         'close': np.zeros(len(pattern)),
         'high': np.zeros(len(pattern)),
         'low': np.zeros(len(pattern)),
-        'direction': pattern
+        'direction': np.array(pattern, dtype=np.int8)
     })
     
     # Set open/close values based on direction